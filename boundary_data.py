@@ -0,0 +1,240 @@
+"""행정구역 경계 GeoJSON을 줌 단계별로 미리 단순화해 작은 바이너리(.npz)로 저장하는 유틸리티.
+
+원본 경계 파일은 수십 MB라서 그대로 st_folium에 넘기면 브라우저로 가는 데이터가 너무 커집니다.
+처음 한 번만 줌 단계마다 Douglas-Peucker로 단순화하고, 좌표는 1e-5도(약 1 m) 정수로 양자화한 뒤
+이전 점과의 차이만 저장합니다. 이후에는 현재 줌에 맞는 단계에서 필요한 지역만 GeoJSON으로 만듭니다.
+"""
+import glob
+import json
+import os
+
+import numpy as np
+
+from population_data import file_hash
+
+# 캐시 파일 저장 위치 (저장소 루트의 .cache/boundaries)
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "boundaries")
+# 저장 형식이 바뀌면 올려서 예전 캐시를 무효화
+FORMAT_VERSION = 2
+# 좌표 양자화 단위 (1e-5도 ≈ 1 m)
+COORD_SCALE = 100_000
+# 미리 만들어 두는 줌 단계와, 단계별 허용 오차 (화면 픽셀 수)
+ZOOM_LEVELS = (7, 9, 11, 13)
+TOLERANCE_PIXELS = 1.0
+# 행정안전부 행정구역코드가 들어 있는 속성 이름 후보 (앞쪽이 우선)
+# adm_cd2: 행정동 경계(10자리), SIG_CD: 시군구 5자리, code: 직접 만든 파일용 (2/5/8/10자리 행정구역코드)
+# 통계청 코드(sgg, adm_cd)나 법정동 코드(EMD_CD)는 자릿수가 같아도 다른 체계라 잘못된 지역에 붙으므로 쓰지 않음
+CODE_PROPERTIES = ("adm_cd2", "SIG_CD", "code")
+
+
+def zoom_tolerance(zoom):
+    """줌 단계에서 TOLERANCE_PIXELS 픽셀에 해당하는 경위도 크기 (도)를 반환합니다."""
+    return 360.0 / (256 * 2 ** zoom) * TOLERANCE_PIXELS
+
+
+def pick_zoom_level(zoom):
+    """현재 지도 줌에 쓸 미리 만든 단계를 고릅니다 (현재 줌 이하 중 가장 자세한 단계)."""
+    lower = [level for level in ZOOM_LEVELS if level <= zoom]
+    return lower[-1] if lower else ZOOM_LEVELS[0]
+
+
+def normalize_code(value):
+    """경계 파일의 지역 코드를 인구 CSV와 같은 10자리 행정구역코드로 맞춥니다."""
+    digits = str(value).strip()
+    if not digits.isdigit():
+        return None
+    width = {2: 8, 5: 5, 8: 2, 10: 0}.get(len(digits))
+    return None if width is None else int(digits) * 10 ** width
+
+
+def simplify_ring(points, tolerance):
+    """닫힌 고리 (n × 2 배열, 처음 점 = 마지막 점)를 Douglas-Peucker로 단순화합니다."""
+    n = len(points)
+    if n <= 4:
+        return points
+    keep = np.zeros(n, dtype=bool)
+    keep[[0, n - 1]] = True
+    stack = [(0, n - 1)]
+    while stack:
+        a, b = stack.pop()
+        if b - a < 2:
+            continue
+        start, end = points[a], points[b]
+        seg = points[a + 1:b]
+        dx, dy = end - start
+        norm = np.hypot(dx, dy)
+        if norm == 0:
+            dist = np.hypot(seg[:, 0] - start[0], seg[:, 1] - start[1])
+        else:
+            dist = np.abs(dx * (seg[:, 1] - start[1]) - dy * (seg[:, 0] - start[0])) / norm
+        i = int(dist.argmax())
+        if dist[i] > tolerance:
+            k = a + 1 + i
+            keep[k] = True
+            stack.extend(((a, k), (k, b)))
+    simplified = points[keep]
+    if len(simplified) < 4:
+        # 너무 작아 고리가 사라지면 삼각형 하나로 남김 (지역이 통째로 빠지지 않도록)
+        simplified = points[[0, n // 3, 2 * n // 3, n - 1]]
+    return simplified
+
+
+def iter_polygons(geometry):
+    """Polygon/MultiPolygon 도형을 [고리 좌표 배열, ...] 목록으로 차례로 돌려줍니다."""
+    if geometry is None:
+        return
+    if geometry["type"] == "Polygon":
+        polygons = [geometry["coordinates"]]
+    elif geometry["type"] == "MultiPolygon":
+        polygons = geometry["coordinates"]
+    else:
+        return
+    for rings in polygons:
+        yield [np.asarray(ring, dtype=np.float64)[:, :2] for ring in rings if len(ring) >= 4]
+
+
+def read_features(geojson_path):
+    """GeoJSON에서 (10자리 행정구역코드, 도형) 목록을 읽습니다. 코드를 못 찾은 지역은 건너뜁니다."""
+    with open(geojson_path, encoding="utf-8") as f:
+        collection = json.load(f)
+    features = []
+    for feature in collection.get("features", []):
+        props = feature.get("properties") or {}
+        key = next((name for name in CODE_PROPERTIES if props.get(name) not in (None, "")), None)
+        code = normalize_code(props[key]) if key else None
+        if code is not None:
+            features.append((code, feature.get("geometry")))
+    return features
+
+
+def encode_level(features, tolerance):
+    """한 줌 단계의 지역들을 오프셋 배열과 양자화한 좌표 차분 배열로 만듭니다.
+
+    feature_polys[i]:feature_polys[i+1] → 지역 i의 다각형, poly_rings → 다각형의 고리,
+    ring_points → 고리의 점 범위입니다. 좌표는 파일 전체를 한 줄로 이어 이전 점과의 차이로 저장하므로
+    읽을 때 누적합 한 번으로 복원됩니다.
+    """
+    codes, bboxes, feature_polys, poly_rings, ring_points, chunks = [], [], [0], [0], [0], []
+    for code, geometry in features:
+        n_polys = 0
+        lo = np.array([np.inf, np.inf])
+        hi = -lo
+        for rings in iter_polygons(geometry):
+            if not rings:
+                continue
+            for ring in rings:
+                quantized = np.round(simplify_ring(ring, tolerance) * COORD_SCALE).astype(np.int32)
+                chunks.append(quantized)
+                ring_points.append(ring_points[-1] + len(quantized))
+                lo = np.minimum(lo, quantized.min(axis=0))
+                hi = np.maximum(hi, quantized.max(axis=0))
+            poly_rings.append(poly_rings[-1] + len(rings))
+            n_polys += 1
+        if n_polys:
+            codes.append(code)
+            bboxes.append(np.concatenate((lo, hi)))
+            feature_polys.append(feature_polys[-1] + n_polys)
+
+    points = np.concatenate(chunks) if chunks else np.zeros((0, 2), dtype=np.int32)
+    deltas = np.diff(points, axis=0, prepend=np.zeros((1, 2), dtype=np.int32))
+    return {
+        "codes": np.asarray(codes, dtype=np.int64),
+        "bbox": np.asarray(bboxes, dtype=np.int32).reshape(-1, 4),
+        "feature_polys": np.asarray(feature_polys, dtype=np.int32),
+        "poly_rings": np.asarray(poly_rings, dtype=np.int32),
+        "ring_points": np.asarray(ring_points, dtype=np.int64),
+        "deltas": deltas.astype(np.int32),
+    }
+
+
+def cache_path_for(geojson_path, digest=None):
+    """원본 경계 파일에 대응하는 캐시 파일 경로를 반환합니다."""
+    digest = digest or file_hash(geojson_path)
+    stem = os.path.splitext(os.path.basename(geojson_path))[0]
+    return os.path.join(CACHE_DIR, f"{stem}.v{FORMAT_VERSION}.{digest[:16]}.npz")
+
+
+def build_boundary_cache(geojson_path):
+    """경계 파일을 모든 줌 단계로 단순화해 .npz로 저장하고 그 경로를 반환합니다 (이미 있으면 그대로)."""
+    cache_path = cache_path_for(geojson_path)
+    if os.path.exists(cache_path):
+        return cache_path
+
+    features = read_features(geojson_path)
+    arrays = {}
+    for zoom in ZOOM_LEVELS:
+        for name, array in encode_level(features, zoom_tolerance(zoom)).items():
+            arrays[f"z{zoom}_{name}"] = array
+
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp.npz"
+    np.savez_compressed(tmp_path, **arrays)
+    os.replace(tmp_path, cache_path)
+
+    # 같은 원본의 예전 캐시 정리
+    stem = os.path.splitext(os.path.basename(geojson_path))[0]
+    for old in glob.glob(os.path.join(CACHE_DIR, f"{stem}.v*.npz")):
+        if old != cache_path:
+            os.remove(old)
+    return cache_path
+
+
+class BoundaryLayers:
+    """줌 단계별로 단순화된 경계를 들고 있다가 필요한 지역만 GeoJSON으로 만들어 줍니다."""
+
+    def __init__(self, cache_path):
+        self.levels = {}
+        with np.load(cache_path) as data:
+            for zoom in ZOOM_LEVELS:
+                level = {name: data[f"z{zoom}_{name}"] for name in
+                         ("codes", "bbox", "feature_polys", "poly_rings", "ring_points", "deltas")}
+                level["points"] = np.cumsum(level.pop("deltas"), axis=0, dtype=np.int32)
+                level["row_of"] = {int(code): i for i, code in enumerate(level["codes"])}
+                self.levels[zoom] = level
+
+    @classmethod
+    def from_geojson(cls, geojson_path):
+        return cls(build_boundary_cache(geojson_path))
+
+    def codes(self):
+        """경계가 있는 행정구역코드 목록을 반환합니다."""
+        return self.levels[ZOOM_LEVELS[0]]["codes"].tolist()
+
+    def bounds(self, codes):
+        """지역들을 모두 담는 [[남, 서], [북, 동]] 경위도 범위를 반환합니다 (folium fit_bounds 형식)."""
+        level = self.levels[ZOOM_LEVELS[0]]
+        rows = [level["row_of"][c] for c in codes if c in level["row_of"]]
+        if not rows:
+            return None
+        box = level["bbox"][rows]
+        west, south = box[:, :2].min(axis=0) / COORD_SCALE
+        east, north = box[:, 2:].max(axis=0) / COORD_SCALE
+        return [[float(south), float(west)], [float(north), float(east)]]
+
+    def feature_collection(self, zoom, codes, properties=None):
+        """현재 줌에 맞는 단계에서 codes 지역만 골라 GeoJSON FeatureCollection(dict)을 만듭니다.
+
+        properties는 {코드: {속성 이름: 값}} 형태로, 툴팁 등에 쓸 값을 각 지역에 붙입니다.
+        """
+        level = self.levels[pick_zoom_level(zoom)]
+        points = level["points"]
+        features = []
+        for code in codes:
+            row = level["row_of"].get(int(code))
+            if row is None:
+                continue
+            polygons = []
+            for p in range(level["feature_polys"][row], level["feature_polys"][row + 1]):
+                rings = []
+                for r in range(level["poly_rings"][p], level["poly_rings"][p + 1]):
+                    ring = points[level["ring_points"][r]:level["ring_points"][r + 1]] / COORD_SCALE
+                    rings.append(np.round(ring, 5).tolist())
+                polygons.append(rings)
+            props = {"code": int(code)}
+            props.update((properties or {}).get(int(code), {}))
+            features.append({
+                "type": "Feature",
+                "properties": props,
+                "geometry": {"type": "MultiPolygon", "coordinates": polygons},
+            })
+        return {"type": "FeatureCollection", "features": features}
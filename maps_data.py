@@ -0,0 +1,504 @@
+"""Google Maps 웹 서비스(길찾기, 장소, 지오코딩) 호출을 한곳에서 처리하는 유틸리티.
+
+모든 요청은 연결을 재사용하는 requests.Session 하나로 보내므로 매번 TLS 연결을 새로 맺지 않습니다.
+요청마다 연결/응답 제한 시간을 두고, 5xx 응답이나 OVER_QUERY_LIMIT 같은 일시적 오류는 간격을 늘려 가며 다시 시도하며,
+엔드포인트별 호출 수와 응답 시간을 기록합니다.
+지오코딩 결과와 길찾기 결과는 .cache/maps 아래 SQLite 캐시에 보관해 같은 주소(또는 가까운 좌표)나
+같은 출발지/도착지/옵션을 다시 찾을 때 API를 부르지 않습니다.
+여러 지점 사이의 이동 시간 행렬(Distance Matrix)을 나눠 받아 방문 순서(외판원 문제)를 근사로 풀며,
+API를 쓸 수 없으면 직선거리(하버사인)로 어림한 행렬을 대신 씁니다.
+GOOGLE_MAPS_BASE_URL 환경 변수로 접속 주소를 바꾸면 로컬 스텁 서버를 상대로 시험할 수 있습니다.
+"""
+import json
+import os
+import random
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import polyline
+import requests
+from requests.adapters import HTTPAdapter
+
+# 설정하면 Google 대신 이 주소로 요청을 보냄 (예: http://127.0.0.1:8000, 로컬 스텁 서버)
+BASE_URL_ENV = "GOOGLE_MAPS_BASE_URL"
+DEFAULT_BASE_URL = "https://maps.googleapis.com"
+# (연결, 응답) 제한 시간 (초). 느린 서버 때문에 화면 스레드가 멈추지 않도록 함
+TIMEOUT = (3.05, 10)
+# 처음 요청 뒤에 다시 시도하는 최대 횟수와 대기 시간 (초, 시도마다 두 배, 최대 BACKOFF_MAX)
+MAX_RETRIES = 3
+BACKOFF_BASE = 0.5
+BACKOFF_MAX = 8.0
+# 세션이 호스트마다 열어 두는 최대 연결 수 (여러 사용자가 동시에 불러도 연결을 재사용)
+POOL_SIZE = 16
+# 다시 시도할 응답: HTTP 상태 코드와 API status 값
+RETRY_HTTP_STATUSES = {429, 500, 502, 503, 504}
+RETRY_API_STATUSES = {"OVER_QUERY_LIMIT", "UNKNOWN_ERROR"}
+# 엔드포인트별로 응답 시간 분위수를 계산할 때 쓰는 최근 요청 수
+LATENCY_WINDOW = 500
+# 캐시 파일 저장 위치 (저장소 루트의 .cache/maps)
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "maps")
+# 지오코딩 결과 보관 기간 (초)과 최대 항목 수 (넘으면 가장 오래 안 쓴 항목부터 지움)
+GEOCODE_TTL = 30 * 24 * 3600
+GEOCODE_MAX_ENTRIES = 50_000
+# 역지오코딩 좌표를 묶는 격자 크기 (도). 2e-4도 ≈ 20 m 안의 클릭은 같은 주소로 봄
+REVERSE_GRID_DEG = 2e-4
+# 길찾기 결과 보관 기간 (초)과 최대 항목 수. 교통 상황을 반영하는 결과는 출발 시각 구간이 끝나면 만료
+ROUTE_TTL = 7 * 24 * 3600
+ROUTE_MAX_ENTRIES = 5_000
+TRAFFIC_BUCKET_SECONDS = 15 * 60
+# 길찾기 캐시 키와 요청에 쓰는 좌표 자릿수 (소수 4자리 ≈ 11 m)
+ROUTE_COORD_DECIMALS = 4
+# Distance Matrix 요청 한 번의 한도 (출발지/도착지 각각 최대 25곳, 원소 최대 100개)와 동시에 보낼 요청 수
+MATRIX_MAX_SIDE = 25
+MATRIX_MAX_ELEMENTS = 100
+MATRIX_WORKERS = 4
+# API 없이 어림할 때 쓰는 이동 수단별 평균 속도 (m/s)와 도로 우회 계수 (실제 경로 / 직선거리)
+MODE_SPEEDS = {"driving": 8.3, "walking": 1.3, "bicycling": 4.2, "transit": 5.5}
+DETOUR_FACTOR = 1.3
+EARTH_RADIUS_M = 6_371_000
+# put을 이만큼 할 때마다 만료/초과 항목을 정리
+EVICT_EVERY = 64
+
+
+def default_base_url():
+    return os.environ.get(BASE_URL_ENV, DEFAULT_BASE_URL).rstrip("/")
+
+
+def backoff_delay(attempt, base=BACKOFF_BASE, cap=BACKOFF_MAX):
+    """attempt번째 재시도 전에 기다릴 시간 (초). 여러 요청이 한꺼번에 다시 몰리지 않도록 흔들어 줌."""
+    return min(cap, base * 2 ** attempt) * random.uniform(0.5, 1.0)
+
+
+class EndpointStats:
+    """한 엔드포인트의 호출 수, 재시도/오류 수, 최근 응답 시간을 모읍니다."""
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self.calls = 0
+        self.retries = 0
+        self.errors = 0
+        self.latencies = deque(maxlen=window)
+
+    def summary(self):
+        latencies = np.asarray(self.latencies) * 1000
+        p50, p95 = np.percentile(latencies, [50, 95]) if len(latencies) else (np.nan, np.nan)
+        return {"호출 수": self.calls, "재시도": self.retries, "오류": self.errors,
+                "p50(ms)": round(float(p50), 1), "p95(ms)": round(float(p95), 1)}
+
+
+class MapsClient:
+    """Google Maps 웹 서비스를 부르는 공용 클라이언트 (스레드 안전, 앱 전체에서 하나를 같이 씀).
+
+    get_json은 API가 돌려준 JSON(dict)을 그대로 반환합니다. 재시도 후에도 실패한 HTTP 오류나 연결 오류는
+    requests.RequestException으로 올라가고, OVER_QUERY_LIMIT 등 API status 오류는 마지막 응답을 그대로 돌려줍니다.
+    """
+
+    def __init__(self, api_key, base_url=None, timeout=TIMEOUT, max_retries=MAX_RETRIES, sleep=time.sleep):
+        self.api_key = api_key
+        self.base_url = (base_url or default_base_url()).rstrip("/")
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.sleep = sleep
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def _record(self, endpoint, seconds=None, retried=False, failed=False):
+        with self._lock:
+            stats = self._stats.setdefault(endpoint, EndpointStats())
+            if seconds is not None:
+                stats.calls += 1
+                stats.latencies.append(seconds)
+            stats.retries += retried
+            stats.errors += failed
+
+    def get_json(self, endpoint, params):
+        """endpoint (예: "directions")에 params로 GET 요청을 보내고 JSON을 반환합니다."""
+        url = f"{self.base_url}/maps/api/{endpoint}/json"
+        params = dict(params, key=self.api_key)
+        for attempt in range(self.max_retries + 1):
+            last_try = attempt == self.max_retries
+            started = time.perf_counter()
+            try:
+                response = self.session.get(url, params=params, timeout=self.timeout)
+            except requests.exceptions.ConnectionError:
+                # 연결 자체가 안 된 경우만 다시 시도 (응답 제한 시간 초과는 더 기다리지 않음)
+                self._record(endpoint, time.perf_counter() - started, failed=last_try)
+                if last_try:
+                    raise
+                self._wait(endpoint, attempt)
+                continue
+            except requests.exceptions.RequestException:
+                self._record(endpoint, time.perf_counter() - started, failed=True)
+                raise
+            self._record(endpoint, time.perf_counter() - started)
+
+            if response.status_code in RETRY_HTTP_STATUSES and not last_try:
+                self._wait(endpoint, attempt, response.headers.get("Retry-After"))
+                continue
+            try:
+                response.raise_for_status()
+                data = response.json()
+            except (requests.exceptions.RequestException, ValueError):
+                self._record(endpoint, failed=True)
+                raise
+            if data.get("status") in RETRY_API_STATUSES and not last_try:
+                self._wait(endpoint, attempt)
+                continue
+            if data.get("status") not in ("OK", "ZERO_RESULTS", None):
+                self._record(endpoint, failed=True)
+            return data
+
+    def _wait(self, endpoint, attempt, retry_after=None):
+        self._record(endpoint, retried=True)
+        delay = backoff_delay(attempt)
+        if retry_after and retry_after.isdigit():
+            delay = min(BACKOFF_MAX, max(delay, float(retry_after)))
+        self.sleep(delay)
+
+    def metrics(self):
+        """엔드포인트별 호출 통계를 DataFrame으로 반환합니다."""
+        with self._lock:
+            rows = [{"엔드포인트": endpoint, **stats.summary()} for endpoint, stats in sorted(self._stats.items())]
+        return pd.DataFrame(rows)
+
+    def close(self):
+        self.session.close()
+
+
+class SQLiteCache:
+    """JSON 값을 SQLite 파일 하나에 보관하는 키-값 캐시 (여러 스레드와 프로세스가 같이 써도 됨).
+
+    항목마다 만료 시각을 두어 ttl초가 지나면 없는 것으로 보고, 항목이 max_entries를 넘으면
+    가장 오래 안 쓴 항목부터 지웁니다 (정리는 put을 EVICT_EVERY번 할 때마다 한 번).
+    """
+
+    def __init__(self, path, ttl, max_entries):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._puts = 0
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value TEXT, "
+                           "expires_at REAL, last_used REAL)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used)")
+
+    def get(self, key, now=None):
+        """key의 값을 반환합니다. 없거나 만료됐으면 None."""
+        now = time.time() if now is None else now
+        with self._lock:
+            row = self._conn.execute("SELECT value, expires_at FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is None or row[1] <= now:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE entries SET last_used = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, key, value, ttl=None, now=None):
+        """key에 value를 저장합니다. ttl을 주면 기본 보관 기간 대신 그 시간 (초)만 보관합니다."""
+        now = time.time() if now is None else now
+        expires_at = now + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)",
+                               (key, json.dumps(value, ensure_ascii=False, separators=(",", ":")), expires_at, now))
+            self._puts += 1
+            if self._puts % EVICT_EVERY == 0:
+                self._evict(now)
+
+    def _evict(self, now):
+        self._conn.execute("DELETE FROM entries WHERE expires_at <= ?", (now,))
+        excess = self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0] - self.max_entries
+        if excess > 0:
+            self._conn.execute("DELETE FROM entries WHERE key IN "
+                               "(SELECT key FROM entries ORDER BY last_used LIMIT ?)", (excess,))
+
+    def evict(self, now=None):
+        """만료된 항목과 max_entries를 넘는 항목을 지금 지웁니다."""
+        with self._lock:
+            self._evict(time.time() if now is None else now)
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {"항목 수": len(self), "적중": self.hits, "실패": self.misses,
+                "적중률(%)": round(100 * self.hits / total, 1) if total else None}
+
+
+def geocode_cache(path=None):
+    """지오코딩 결과용 캐시를 엽니다 (기본 위치: .cache/maps/geocode.sqlite)."""
+    return SQLiteCache(path or os.path.join(CACHE_DIR, "geocode.sqlite"), GEOCODE_TTL, GEOCODE_MAX_ENTRIES)
+
+
+def normalize_address(address):
+    """같은 주소를 다르게 적은 검색어가 같은 키가 되도록 정리합니다 (전각/반각, 대소문자, 공백, 쉼표)."""
+    text = unicodedata.normalize("NFKC", address).casefold()
+    return re.sub(r"[\s,]+", " ", text).strip()
+
+
+def address_key(address, language="ko", region="kr"):
+    return f"geocode:{language}:{region}:{normalize_address(address)}"
+
+
+def snap_to_grid(lat, lng, grid=REVERSE_GRID_DEG):
+    """좌표를 격자 칸의 대표점으로 맞춥니다 (격자 번호, 대표 좌표)를 반환."""
+    cell = (round(lat / grid), round(lng / grid))
+    return cell, (round(cell[0] * grid, 6), round(cell[1] * grid, 6))
+
+
+def latlng_key(lat, lng, language="ko", grid=REVERSE_GRID_DEG):
+    cell, _ = snap_to_grid(lat, lng, grid)
+    return f"reverse:{language}:{grid:g}:{cell[0]}:{cell[1]}"
+
+
+def route_cache(path=None):
+    """길찾기 결과용 캐시를 엽니다 (기본 위치: .cache/maps/routes.sqlite)."""
+    return SQLiteCache(path or os.path.join(CACHE_DIR, "routes.sqlite"), ROUTE_TTL, ROUTE_MAX_ENTRIES)
+
+
+def round_coord(lat, lng, decimals=ROUTE_COORD_DECIMALS):
+    return round(float(lat), decimals), round(float(lng), decimals)
+
+
+def departure_bucket(departure_time, now=None, bucket_seconds=TRAFFIC_BUCKET_SECONDS):
+    """출발 시각 ("now" 또는 UNIX 초)이 속한 구간 번호를 반환합니다. 출발 시각이 없으면 None."""
+    if departure_time is None:
+        return None
+    if departure_time == "now":
+        departure_time = time.time() if now is None else now
+    return int(float(departure_time) // bucket_seconds)
+
+
+def route_key(origin, destination, mode, options, now=None):
+    """길찾기 요청의 캐시 키와 보관 기간 (초)을 반환합니다.
+
+    origin/destination은 round_coord로 맞춘 좌표, options는 API에 보내는 추가 파라미터입니다.
+    출발 시각은 TRAFFIC_BUCKET_SECONDS 구간 번호로 바꿔 키에 넣으므로, 교통 상황이 반영되는 결과는
+    같은 구간 안에서만 재사용되고 "now"로 받은 결과는 그 구간이 끝날 때 만료됩니다.
+    """
+    now = time.time() if now is None else now
+    bucket = departure_bucket(options.get("departure_time"), now)
+    avoid = "|".join(sorted(filter(None, str(options.get("avoid", "")).split("|"))))
+    key = json.dumps([list(origin), list(destination), mode, avoid, str(options.get("alternatives", "false")),
+                      options.get("traffic_model"), options.get("transit_mode"), bucket], separators=(",", ":"))
+    if bucket is None:
+        return f"route:{key}", ROUTE_TTL
+    if options.get("departure_time") == "now":
+        return f"route:{key}", max(1.0, (bucket + 1) * TRAFFIC_BUCKET_SECONDS - now)
+    return f"route:{key}", TRAFFIC_BUCKET_SECONDS
+
+
+def compact_route(route_info, encoded_polyline):
+    """길찾기 결과를 캐시에 넣기 좋게 줄입니다.
+
+    좌표 목록 대신 API가 준 인코딩된 폴리라인 문자열(차분 + 가변 길이 문자)을 보관하고,
+    단계별 안내는 화면에 쓰는 필드(안내 문구, 거리/시간 글자)만 남깁니다.
+    """
+    compact = {key: value for key, value in route_info.items() if key != "polyline"}
+    compact["encoded_polyline"] = encoded_polyline
+    compact["steps"] = [{"html_instructions": step.get("html_instructions", ""),
+                         "distance": {"text": step.get("distance", {}).get("text", "")},
+                         "duration": {"text": step.get("duration", {}).get("text", "")}}
+                        for step in route_info.get("steps", [])]
+    return compact
+
+
+def expand_route(compact):
+    """compact_route로 줄인 결과를 다시 화면에서 쓰는 형태 (좌표 목록 포함)로 되돌립니다."""
+    route_info = {key: value for key, value in compact.items() if key != "encoded_polyline"}
+    route_info["polyline"] = polyline.decode(compact["encoded_polyline"])
+    return route_info
+
+
+# --- 여러 지점 방문 순서 ---
+def haversine_matrix(lats, lons):
+    """지점들 사이의 직선 (대권) 거리 n × n 행렬 (m)을 반환합니다."""
+    lat = np.radians(np.asarray(lats, dtype=np.float64))
+    lon = np.radians(np.asarray(lons, dtype=np.float64))
+    dlat = lat[:, None] - lat[None, :]
+    dlon = lon[:, None] - lon[None, :]
+    h = np.sin(dlat / 2) ** 2 + np.cos(lat[:, None]) * np.cos(lat[None, :]) * np.sin(dlon / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(h, 0, 1)))
+
+
+def estimate_matrix(points, mode="driving"):
+    """직선거리에 우회 계수와 평균 속도를 곱해 어림한 (이동 시간(초), 거리(m)) 행렬을 반환합니다."""
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    distances = haversine_matrix(points[:, 0], points[:, 1]) * DETOUR_FACTOR
+    return distances / MODE_SPEEDS.get(mode, MODE_SPEEDS["driving"]), distances
+
+
+def matrix_key(origin, destination, mode):
+    return f"matrix:{mode}:{origin[0]},{origin[1]}:{destination[0]},{destination[1]}"
+
+
+def matrix_blocks(missing, max_side=MATRIX_MAX_SIDE, max_elements=MATRIX_MAX_ELEMENTS):
+    """받아야 할 칸 (n × n bool)을 덮는 (출발지 번호들, 도착지 번호들) 요청 목록을 만듭니다.
+
+    빠진 칸이 행/열 범위의 절반 이상이면 그 범위 전체를 한 직사각형으로 받고 (처음 만들 때),
+    아니면 빠진 도착지 집합이 같은 출발지끼리 묶으므로 지점 하나를 추가하면 그 지점의 행과 열만 새로 받습니다.
+    각 요청은 API 한도 (변 max_side, 원소 max_elements) 안으로 자릅니다.
+    """
+    rows, cols = np.flatnonzero(missing.any(axis=1)), np.flatnonzero(missing.any(axis=0))
+    groups = {}
+    if not len(rows):
+        return []
+    if len(rows) * len(cols) <= 2 * missing.sum():
+        groups[tuple(cols.tolist())] = rows.tolist()
+    else:
+        for i in rows:
+            groups.setdefault(tuple(np.flatnonzero(missing[i]).tolist()), []).append(int(i))
+    blocks = []
+    for destinations, origins in groups.items():
+        cols = min(len(destinations), max_side)
+        rows = max(1, min(max_side, max_elements // cols))
+        for c in range(0, len(destinations), cols):
+            for r in range(0, len(origins), rows):
+                blocks.append((origins[r:r + rows], list(destinations[c:c + cols])))
+    return blocks
+
+
+def travel_matrix(points, mode="driving", client=None, cache=None):
+    """지점들 사이의 (이동 시간(초), 거리(m), 출처) n × n 행렬을 만듭니다.
+
+    client가 있으면 캐시에 없는 칸만 Distance Matrix API로 나눠 (동시에) 받고, 받은 칸은 cache에 저장합니다.
+    API를 쓸 수 없거나 요청/칸이 실패하면 그 칸은 estimate_matrix 값으로 채웁니다.
+    출처는 "api" (모두 API 또는 캐시), "estimate" (모두 어림값), "mixed" 중 하나입니다.
+    """
+    points = [round_coord(lat, lng) for lat, lng in points]
+    n = len(points)
+    durations, distances = estimate_matrix(points, mode)
+    known = np.eye(n, dtype=bool)
+    if client is None or n < 2:
+        return durations, distances, "estimate" if n > 1 else "api"
+
+    if cache is not None:
+        for i in range(n):
+            for j in range(n):
+                if i != j:
+                    cached = cache.get(matrix_key(points[i], points[j], mode))
+                    if cached is not None:
+                        durations[i, j], distances[i, j] = cached
+                        known[i, j] = True
+
+    def fetch(block):
+        origins, destinations = block
+        params = {
+            "origins": "|".join(f"{points[i][0]},{points[i][1]}" for i in origins),
+            "destinations": "|".join(f"{points[j][0]},{points[j][1]}" for j in destinations),
+            "mode": mode,
+            "language": "ko",
+            "region": "kr",
+        }
+        try:
+            data = client.get_json("distancematrix", params)
+        except requests.exceptions.RequestException:
+            return block, None
+        return block, data if data.get("status") == "OK" else None
+
+    blocks = matrix_blocks(~known)
+    if blocks:
+        with ThreadPoolExecutor(max_workers=min(MATRIX_WORKERS, len(blocks)), thread_name_prefix="matrix") as pool:
+            for (origins, destinations), data in pool.map(fetch, blocks):
+                if data is None:
+                    continue
+                for i, row in zip(origins, data.get("rows", [])):
+                    for j, element in zip(destinations, row.get("elements", [])):
+                        if i == j or element.get("status") != "OK":
+                            continue
+                        value = [float(element["duration"]["value"]), float(element["distance"]["value"])]
+                        durations[i, j], distances[i, j] = value
+                        known[i, j] = True
+                        if cache is not None:
+                            cache.put(matrix_key(points[i], points[j], mode), value)
+    source = "api" if known.all() else ("estimate" if not known[~np.eye(n, dtype=bool)].any() else "mixed")
+    return durations, distances, source
+
+
+def nearest_neighbor_tour(cost, start=0):
+    """start에서 출발해 매번 가장 가까운 미방문 지점으로 가는 순서를 만듭니다."""
+    n = len(cost)
+    tour = np.empty(n, dtype=np.int64)
+    tour[0] = start
+    visited = np.zeros(n, dtype=bool)
+    visited[start] = True
+    for k in range(1, n):
+        row = np.where(visited, np.inf, cost[tour[k - 1]])
+        tour[k] = row.argmin()
+        visited[tour[k]] = True
+    return tour
+
+
+def two_opt(cost, tour, max_rounds=10_000):
+    """순환 순서를 2-opt로 개선합니다 (첫 지점은 고정, 비대칭 행렬도 처리).
+
+    한 번에 모든 (i, j) 쌍에 대해 t[i+1..j] 구간을 뒤집었을 때의 비용 변화를 배열 연산으로 구하고,
+    가장 많이 줄어드는 쌍을 적용하기를 더 줄어들지 않을 때까지 반복합니다.
+    뒤집힌 구간 안쪽 간선은 방향이 바뀌므로, 정방향/역방향 간선 비용의 누적합 차이로 반영합니다.
+    """
+    tour = np.array(tour, dtype=np.int64)
+    n = len(tour)
+    if n < 4:
+        return tour
+    first, second = np.triu_indices(n, k=2)
+    for _ in range(max_rounds):
+        nxt = np.roll(tour, -1)
+        forward = np.concatenate(([0.0], np.cumsum(cost[tour, nxt])))
+        backward = np.concatenate(([0.0], np.cumsum(cost[nxt, tour])))
+        a, b, c, d = tour[first], tour[first + 1], tour[second], nxt[second]
+        inner = (backward[second] - backward[first + 1]) - (forward[second] - forward[first + 1])
+        delta = cost[a, c] + cost[b, d] - cost[a, b] - cost[c, d] + inner
+        best = int(delta.argmin())
+        if delta[best] >= -1e-9:
+            break
+        i, j = first[best], second[best]
+        tour[i + 1:j + 1] = tour[i + 1:j + 1][::-1].copy()
+    return tour
+
+
+def tour_cost(cost, order, round_trip=True):
+    """순서대로 이동할 때의 총비용을 반환합니다 (round_trip이면 마지막에 출발지로 돌아옴)."""
+    order = np.asarray(order, dtype=np.int64)
+    legs = cost[order[:-1], order[1:]].sum()
+    return float(legs + (cost[order[-1], order[0]] if round_trip and len(order) > 1 else 0.0))
+
+
+def solve_tour(cost, start=0, round_trip=True):
+    """모든 지점을 한 번씩 방문하는 순서를 최근접 이웃 + 2-opt로 근사해 (순서, 총비용)을 반환합니다.
+
+    round_trip이 아니면 start에서 출발해 아무 곳에서나 끝나는 경로를 풉니다. 이때는 끝 지점에서
+    start로 비용 0에 돌아오는 가상 지점을 하나 더해 순환 문제로 바꿔 풉니다.
+    """
+    cost = np.asarray(cost, dtype=np.float64)
+    n = len(cost)
+    if n <= 2:
+        order = [start] + [i for i in range(n) if i != start]
+        return order, tour_cost(cost, order, round_trip)
+    if round_trip:
+        order = two_opt(cost, nearest_neighbor_tour(cost, start))
+    else:
+        # 가상 지점 → start만 비용 0, 다른 지점으로는 갈 수 없을 만큼 큰 비용; 모든 지점 → 가상 지점은 0
+        augmented = np.zeros((n + 1, n + 1))
+        augmented[:n, :n] = cost
+        augmented[n, :n] = cost.sum() + 1
+        augmented[n, start] = 0
+        order = two_opt(augmented, nearest_neighbor_tour(augmented, n))[1:]
+    order = order.tolist()
+    return order, tour_cost(cost, order, round_trip)
@@ -1,85 +1,294 @@
+import glob
 import streamlit as st
-import pandas as pd
 import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+from population_data import (PopulationStore, load_dataset, LEVEL_SIDO, LEVEL_SIGUNGU, LEVEL_EMD,
+                             aggregate_regions, aggregate_union, AgeRollup)
 
-# 파일 경로
-mf_path = "202504_202504_연령별인구현황_월간_남녀구분.csv"
-total_path = "202504_202504_연령별인구현황_월간_남녀합계.csv"
+# 파일 경로: 월별로 내려받은 CSV를 모두 찾음 (예: 202504_202504_연령별인구현황_월간_남녀구분.csv)
+mf_paths = sorted(glob.glob("*_연령별인구현황_월간_남녀구분.csv"))
+total_paths = sorted(glob.glob("*_연령별인구현황_월간_남녀합계.csv"))
+if not mf_paths or not total_paths:
+    st.error("연령별 인구현황 CSV(남녀구분, 남녀합계)를 찾을 수 없습니다.")
+    st.stop()
 
-# CSV 불러오기
-mf_df = pd.read_csv(mf_path, encoding='cp949')
-total_df = pd.read_csv(total_path, encoding='cp949')
+# 월별 저장소에 새로 들어온 파일만 추가하고, 최신 달 파티션을 메모리 맵으로 로딩
+store = PopulationStore()
+store.sync(mf_paths + total_paths)
+store_months = store.months("남녀구분")
+latest_month = store_months[-1]
 
-# 컬럼 정리
-mf_df.columns = mf_df.columns.str.strip()
-total_df.columns = total_df.columns.str.strip()
+# 달마다 한 번만 배열/인덱스/누적합을 만들어 서버의 모든 페이지와 세션이 같은 객체를 함께 씀
+with st.spinner("인구 데이터를 불러오는 중..."):
+    dataset = load_dataset(store, latest_month)
 
-# 연령 컬럼만 추출
-age_cols_mf = [col for col in mf_df.columns if "세" in col]
-age_cols_total = [col for col in total_df.columns if "세" in col]
+# (지역 × 연령 × 성별) int32 배열, 행정구역코드 계층 인덱스, 말단 지역 누적합, 연령 축 누적합
+mf_data_key = dataset.data_key
+mf_index = dataset.index
+mf_prefix = dataset.prefix
+mf_rollup = dataset.rollup
+mf_indicators = dataset.indicators
 
-# 수치형으로 변환
-def clean_numeric(df, cols):
-    for col in cols:
-        if df[col].dtype == object:
-            df[col] = df[col].str.replace(",", "").astype(int)
-    return df
+# 남녀합계가 남 + 여와 같으면 남녀구분 데이터를 그대로 씀 (PopulationDataset 참고)
+sex_check = dataset.sex_check
+total_data_key = dataset.total_data_key
+total_index = dataset.total_index
+total_rollup = dataset.total_rollup
 
-mf_df = clean_numeric(mf_df, age_cols_mf)
-total_df = clean_numeric(total_df, age_cols_total)
+def region_picker(index, key):
+    """시도부터 차례로 하위 지역을 골라 선택된 행정구역코드를 반환합니다."""
+    cols = st.columns(4)
+    with cols[0]:
+        code = st.selectbox("시도", index.children(), format_func=index.short_name, key=f"{key}_0")
+    depth = 1
+    while index.children(code) and depth < len(cols):
+        children = index.children(code)
+        level_name = "읍면동" if index.level[index.row(children[0])] == LEVEL_EMD else "시군구"
+        with cols[depth]:
+            child = st.selectbox(level_name, [None] + children,
+                                 format_func=lambda c: "전체" if c is None else index.short_name(c),
+                                 key=f"{key}_{depth}")
+        if child is None:
+            break
+        code = child
+        depth += 1
+    return code
 
-# 지역 리스트 추출
-mf_df['지역'] = mf_df['행정구역'].str.extract(r"([\uAC00-\uD7AF\s]+구|\w+시|\w+군|\w+읍|\w+면)")
-region_options = mf_df['지역'].dropna().unique().tolist()
-region_options.sort()
+# 그림 캐시: 지역 코드별로 완성된 Figure를 보관 (data_key가 바뀌면 새로 만듦)
+FIGURE_CACHE_SIZE = 256
+
+@st.cache_data(max_entries=FIGURE_CACHE_SIZE, show_spinner=False)
+def pyramid_figure(data_key, region_code, bucket_width=1):
+    """지역의 남녀 인구 피라미드 Figure를 만듭니다."""
+    values = mf_rollup.buckets(bucket_width, rows=[mf_index.row(region_code)])[0]
+    labels = mf_rollup.bucket_labels(bucket_width)
+    male = values[:, 0] * -1  # 좌측으로 뒤집기
+    female = values[:, 1]
+
+    fig = go.Figure()
+    fig.add_trace(go.Bar(x=male, y=labels, orientation='h', name='남성', marker_color='blue'))
+    fig.add_trace(go.Bar(x=female, y=labels, orientation='h', name='여성', marker_color='red'))
+
+    fig.update_layout(
+        title=f"{mf_index.label(region_code)} 인구 피라미드",
+        barmode='relative',
+        xaxis=dict(title='인구 수', tickvals=[-2000, 0, 2000]),
+        yaxis=dict(title='연령'),
+        height=700
+    )
+    return fig
+
+@st.cache_data(max_entries=FIGURE_CACHE_SIZE, show_spinner=False)
+def age_structure_figure(data_key, region_code, bucket_width=1):
+    """지역의 연령별 전체 인구 구조 Figure를 만듭니다."""
+    # 성별 축을 더하므로 남녀합계(계)와 남녀구분(남, 여) 어느 쪽 데이터든 그대로 쓸 수 있음
+    total_pop = total_rollup.buckets(bucket_width, rows=[total_index.row(region_code)])[0].sum(axis=1)
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=total_rollup.bucket_labels(bucket_width), y=total_pop, mode='lines+markers', name='총인구'))
+    fig.update_layout(
+        title=f"{total_index.label(region_code)} 연령별 인구 구조",
+        xaxis_title='연령',
+        yaxis_title='인구 수',
+        height=600
+    )
+    return fig
+
+COMPARE_COLORS = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd',
+                  '#8c564b', '#e377c2', '#7f7f7f', '#bcbd22', '#17becf']
+SMALL_MULTIPLE_COLS = 4
+
+def comparison_figure(codes, values, labels, mode, as_share):
+    """여러 지역의 피라미드를 겹쳐 보기 또는 작은 그림 여러 개로 그립니다.
+
+    values는 (지역 수 × 연령 구간 × 성별) 배열, labels는 연령 구간 이름입니다.
+    """
+    if as_share:
+        totals = values.sum(axis=(1, 2), keepdims=True)
+        values = values / totals.clip(min=1) * 100
+    x_title = '인구 비율 (%)' if as_share else '인구 수'
+
+    if mode == "겹쳐 보기":
+        fig = go.Figure()
+        for i, code in enumerate(codes):
+            color = COMPARE_COLORS[i % len(COMPARE_COLORS)]
+            name = mf_index.label(code)
+            fig.add_trace(go.Scatter(x=-values[i, :, 0], y=labels, mode='lines', name=name,
+                                     legendgroup=str(code), line=dict(color=color)))
+            fig.add_trace(go.Scatter(x=values[i, :, 1], y=labels, mode='lines', name=name,
+                                     legendgroup=str(code), showlegend=False, line=dict(color=color)))
+        fig.update_layout(title="지역별 인구 피라미드 비교 (왼쪽: 남성, 오른쪽: 여성)",
+                          xaxis=dict(title=x_title), yaxis=dict(title='연령'), height=700)
+        return fig
+
+    n_rows = -(-len(codes) // SMALL_MULTIPLE_COLS)
+    fig = make_subplots(rows=n_rows, cols=SMALL_MULTIPLE_COLS, shared_yaxes=True,
+                        subplot_titles=[mf_index.short_name(code) for code in codes],
+                        horizontal_spacing=0.02, vertical_spacing=min(0.08, 0.3 / n_rows))
+    for i in range(len(codes)):
+        r, c = i // SMALL_MULTIPLE_COLS + 1, i % SMALL_MULTIPLE_COLS + 1
+        fig.add_trace(go.Bar(x=-values[i, :, 0], y=labels, orientation='h', marker_color='blue',
+                             name='남성', showlegend=(i == 0)), row=r, col=c)
+        fig.add_trace(go.Bar(x=values[i, :, 1], y=labels, orientation='h', marker_color='red',
+                             name='여성', showlegend=(i == 0)), row=r, col=c)
+    fig.update_layout(barmode='relative', bargap=0, height=max(400, 280 * n_rows),
+                      title=f"지역별 인구 피라미드 ({x_title})")
+    fig.update_yaxes(showticklabels=False)
+    return fig
+
+def format_month(month):
+    return f"{month // 100}년 {month % 100:02d}월"
+
+@st.cache_data(max_entries=FIGURE_CACHE_SIZE, show_spinner=False)
+def monthly_pyramid_figure(store_version, region_code, bucket_width=1):
+    """지역의 월별 인구 피라미드를 슬라이더/재생 버튼이 달린 애니메이션 Figure로 만듭니다.
+
+    모든 달의 데이터를 프레임으로 한 번에 넣어 두므로 슬라이더를 움직여도 파일을 다시 읽지 않습니다.
+    """
+    months, values = store.region_series("남녀구분", region_code)
+    values = AgeRollup(values).buckets(bucket_width)
+    labels = mf_rollup.bucket_labels(bucket_width)
+    x_max = max(int(values.max()), 1) * 1.05
+
+    frames = [
+        go.Frame(
+            name=str(month),
+            data=[go.Bar(x=-values[i, :, 0], y=labels, orientation='h', name='남성', marker_color='blue'),
+                  go.Bar(x=values[i, :, 1], y=labels, orientation='h', name='여성', marker_color='red')],
+            layout=dict(title=f"{mf_index.label(region_code)} 인구 피라미드 ({format_month(month)})"),
+        )
+        for i, month in enumerate(months)
+    ]
+    fig = go.Figure(data=frames[-1].data, frames=frames)
+    fig.update_layout(
+        title=frames[-1].layout.title,
+        barmode='relative',
+        xaxis=dict(title='인구 수', range=[-x_max, x_max]),
+        yaxis=dict(title='연령'),
+        height=700,
+        updatemenus=[dict(type='buttons', showactive=False, x=0, y=-0.08, xanchor='left', buttons=[
+            dict(label='▶ 재생', method='animate',
+                 args=[None, dict(frame=dict(duration=600, redraw=True), fromcurrent=True)]),
+            dict(label='⏸ 정지', method='animate',
+                 args=[[None], dict(mode='immediate', frame=dict(duration=0, redraw=False))]),
+        ])],
+        sliders=[dict(active=len(months) - 1, x=0.15, len=0.85, y=-0.05, steps=[
+            dict(label=format_month(month), method='animate',
+                 args=[[str(month)], dict(mode='immediate', frame=dict(duration=0, redraw=True))])
+            for month in months
+        ])],
+    )
+    return fig
 
 # Streamlit UI
 st.title("🧭 연령별 인구 시각화 대시보드")
-tab1, tab2 = st.tabs(["👫 남녀 인구 피라미드", "👥 전체 인구 구조"])
+st.caption(f"기준: {format_month(latest_month)} · 저장된 기간: {format_month(store_months[0])} ~ {format_month(latest_month)} ({len(store_months)}개월)")
+if sex_check is not None and not sex_check["derivable"]:
+    st.warning(f"남녀합계와 남녀구분(남 + 여)이 맞지 않는 지역이 있습니다: "
+               f"값 불일치 {len(sex_check['mismatched_codes'])}곳, 남녀구분에 없는 지역 {len(sex_check['missing_codes'])}곳")
+bucket_width = st.radio("연령 구간", [1, 5, 10], format_func=lambda w: f"{w}세 단위", horizontal=True)
+tab1, tab2, tab3, tab4, tab5 = st.tabs(["👫 남녀 인구 피라미드", "👥 전체 인구 구조", "🔀 지역 비교", "📈 인구 지표", "⏱️ 월별 추이"])
 
 with tab1:
-    region = st.selectbox("지역 선택 (남녀 피라미드)", region_options, key="tab1")
-    filtered = mf_df[mf_df['지역'] == region]
+    region_code = region_picker(mf_index, key="tab1")
 
-    if not filtered.empty:
-        male_cols = [col for col in age_cols_mf if "_남_" in col]
-        female_cols = [col for col in age_cols_mf if "_여_" in col]
-        age_labels = [col.split("_")[-1] for col in male_cols]
+    if mf_index.row(region_code) is not None:
+        st.plotly_chart(pyramid_figure(mf_data_key, region_code, bucket_width), use_container_width=True)
 
-        male = filtered.iloc[0][male_cols].values * -1  # 좌측으로 뒤집기
-        female = filtered.iloc[0][female_cols].values
+        stats = mf_indicators.iloc[mf_index.row(region_code)]
+        m1, m2, m3, m4 = st.columns(4)
+        m1.metric("총인구", f"{int(stats['총인구']):,}")
+        m2.metric("고령인구비율", f"{stats['고령인구비율(%)']:.1f}%")
+        m3.metric("총부양비", f"{stats['총부양비']:.1f}")
+        m4.metric("노령화지수", f"{stats['노령화지수']:.1f}")
+    else:
+        st.warning("해당 지역 데이터가 없습니다.")
 
-        fig = go.Figure()
-        fig.add_trace(go.Bar(x=male, y=age_labels, orientation='h', name='남성', marker_color='blue'))
-        fig.add_trace(go.Bar(x=female, y=age_labels, orientation='h', name='여성', marker_color='red'))
+with tab2:
+    region2_code = region_picker(total_index, key="tab2")
 
-        fig.update_layout(
-            title=f"{region} 인구 피라미드",
+    if total_index.row(region2_code) is not None:
+        st.plotly_chart(age_structure_figure(total_data_key, region2_code, bucket_width), use_container_width=True)
+    else:
+        st.warning("해당 지역 데이터가 없습니다.")
+
+with tab3:
+    pick_mode = st.radio("비교 대상", ["지역 직접 선택", "시도 전체"], horizontal=True, key="tab3_pick")
+    if pick_mode == "지역 직접 선택":
+        compare_codes = st.multiselect("비교할 지역 (여러 개 선택 가능)", [int(c) for c in mf_index.codes],
+                                       default=mf_index.children()[:4], format_func=mf_index.label,
+                                       key="tab3_regions")
+    else:
+        sido_code = st.selectbox("시도", mf_index.children(), format_func=mf_index.short_name, key="tab3_sido")
+        compare_codes = mf_index.children(sido_code)
+
+    view_mode = st.radio("표시 방식", ["겹쳐 보기", "작은 그림 여러 개", "합산 피라미드"], horizontal=True, key="tab3_view")
+    as_share = st.checkbox("인구 비율(%)로 보기", value=True, key="tab3_share")
+
+    if not compare_codes:
+        st.info("비교할 지역을 하나 이상 선택하세요.")
+    elif view_mode == "합산 피라미드":
+        combined = AgeRollup(aggregate_union(mf_index, mf_prefix, compare_codes)[None]).buckets(bucket_width)[0]
+        labels = mf_rollup.bucket_labels(bucket_width)
+        if as_share:
+            combined = combined / max(combined.sum(), 1) * 100
+
+        fig3 = go.Figure()
+        fig3.add_trace(go.Bar(x=-combined[:, 0], y=labels, orientation='h', name='남성', marker_color='blue'))
+        fig3.add_trace(go.Bar(x=combined[:, 1], y=labels, orientation='h', name='여성', marker_color='red'))
+        fig3.update_layout(
+            title=f"선택한 {len(compare_codes)}개 지역 합산 인구 피라미드",
             barmode='relative',
-            xaxis=dict(title='인구 수', tickvals=[-2000, 0, 2000]),
+            xaxis=dict(title='인구 비율 (%)' if as_share else '인구 수'),
             yaxis=dict(title='연령'),
             height=700
         )
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(fig3, use_container_width=True)
     else:
-        st.warning("해당 지역 데이터가 없습니다.")
+        values = AgeRollup(aggregate_regions(mf_index, mf_prefix, compare_codes)).buckets(bucket_width)
+        labels = mf_rollup.bucket_labels(bucket_width)
+        st.plotly_chart(comparison_figure(compare_codes, values, labels, view_mode, as_share), use_container_width=True)
 
-with tab2:
-    region2 = st.selectbox("지역 선택 (전체 인구)", region_options, key="tab2")
-    filtered2 = total_df[total_df['행정구역'].str.contains(region2)]
-
-    if not filtered2.empty:
-        age_labels = [col.split("_")[-1] for col in age_cols_total]
-        total_pop = filtered2.iloc[0][age_cols_total].values
-
-        fig2 = go.Figure()
-        fig2.add_trace(go.Scatter(x=age_labels, y=total_pop, mode='lines+markers', name='총인구'))
-        fig2.update_layout(
-            title=f"{region2} 연령별 인구 구조",
-            xaxis_title='연령',
-            yaxis_title='인구 수',
-            height=600
-        )
-        st.plotly_chart(fig2, use_container_width=True)
-    else:
-        st.warning("해당 지역 데이터가 없습니다.")
+with tab4:
+    level_names = {LEVEL_SIDO: "시도", LEVEL_SIGUNGU: "시군구", LEVEL_EMD: "읍면동"}
+    col_level, col_sido, col_metric = st.columns(3)
+    with col_level:
+        level = st.radio("행정구역 단위", list(level_names), format_func=level_names.get, horizontal=True, key="tab4_level")
+    with col_sido:
+        sido_filter = st.selectbox("시도 범위", [None] + mf_index.children(),
+                                   format_func=lambda c: "전국" if c is None else mf_index.short_name(c),
+                                   key="tab4_sido", disabled=(level == LEVEL_SIDO))
+    with col_metric:
+        metric = st.selectbox("정렬 기준 지표", ["노령화지수", "총부양비", "노년부양비", "유소년부양비", "고령인구비율(%)"],
+                              key="tab4_metric")
+
+    mask = (mf_index.level == level) & (mf_indicators["총인구"].to_numpy() > 0)
+    if sido_filter is not None and level != LEVEL_SIDO:
+        mask &= mf_index.codes // 10**8 == sido_filter // 10**8
+    table = mf_indicators[mask].copy()
+    table.insert(0, "지역", [mf_index.names[i] for i in table.index])
+    table = table.sort_values(metric, ascending=False)
+
+    top = table.head(20)
+    fig4 = go.Figure(go.Bar(x=top[metric], y=top["지역"], orientation='h'))
+    fig4.update_layout(title=f"{metric} 상위 {len(top)}개 지역", yaxis=dict(autorange='reversed'), height=600)
+    st.plotly_chart(fig4, use_container_width=True)
+    st.dataframe(table.set_index("지역").round(1), use_container_width=True)
+
+with tab5:
+    region5_code = region_picker(mf_index, key="tab5")
+    if len(store_months) < 2:
+        st.info("저장소에 한 달 치 데이터만 있습니다. 새 월별 CSV를 앱 폴더에 추가하면 자동으로 추이가 쌓입니다.")
+
+    st.plotly_chart(monthly_pyramid_figure(store.version("남녀구분"), region5_code, bucket_width), use_container_width=True)
+
+    series_months, series = store.region_series("남녀구분", region5_code)
+    series_rollup = AgeRollup(series)
+    trend = series_rollup.indicators()
+    trend.index = [format_month(m) for m in series_months]
+    fig5 = make_subplots(specs=[[{"secondary_y": True}]])
+    fig5.add_trace(go.Scatter(x=trend.index, y=trend["총인구"], mode='lines+markers', name='총인구'), secondary_y=False)
+    fig5.add_trace(go.Scatter(x=trend.index, y=trend["고령인구비율(%)"], mode='lines+markers', name='고령인구비율(%)'),
+                   secondary_y=True)
+    fig5.update_layout(title=f"{mf_index.label(region5_code)} 월별 인구 추이", height=400)
+    st.plotly_chart(fig5, use_container_width=True)
@@ -1,23 +1,38 @@
 import streamlit as st
-import yfinance as yf
 import matplotlib.pyplot as plt
 import koreanize_matplotlib
+from stock_data import OHLCVStore, period_start
 
 st.title("내가 좋아하는 주식 차트")
 
-ticker = st.text_input("종목 코드 입력 (예: 삼성전자 = 005930.KS)", value="005930.KS")
+@st.cache_resource
+def get_store():
+    """종목별 일봉 저장소 (받아 둔 기간은 디스크에서 읽고 빠진 기간만 새로 받음)."""
+    return OHLCVStore()
+
+tickers_text = st.text_input("종목 코드 입력 (예: 삼성전자 = 005930.KS, 여러 개는 쉼표로 구분)", value="005930.KS")
+tickers = [t.strip() for t in tickers_text.split(",") if t.strip()]
 
 if st.button("주가 불러오기"):
-    data = yf.download(ticker, period="3mo")
-    
-    if not data.empty:
-        st.write(f"최근 데이터: {data.index[-1].date()}")
-        fig, ax = plt.subplots(figsize=(10, 4))
-        ax.plot(data['Close'], label="종가")
+    store = get_store()
+    try:
+        all_data = store.bars_many(tickers, start=period_start("3mo"))
+    except Exception as e:
+        st.error(f"주가 데이터를 가져오는 중 오류 발생: {e}")
+        st.stop()
+
+    fig, ax = plt.subplots(figsize=(10, 4))
+    for ticker, data in all_data.items():
+        if not data.empty:
+            st.write(f"{ticker} 최근 데이터: {data.index[-1].date()}")
+            ax.plot(data['Close'], label=f"{ticker} 종가" if len(tickers) > 1 else "종가")
+        else:
+            st.error(f"{ticker} 데이터를 불러올 수 없습니다. 종목 코드를 확인해주세요.")
+
+    if any(not data.empty for data in all_data.values()):
         ax.set_title("3개월 주가 추이")
         ax.set_xlabel("날짜")
         ax.set_ylabel("종가 (원)")
         ax.legend()
         st.pyplot(fig)
-    else:
-        st.error("데이터를 불러올 수 없습니다. 종목 코드를 확인해주세요.")
+    plt.close(fig)
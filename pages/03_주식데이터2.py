@@ -1,11 +1,16 @@
 import streamlit as st
-import yfinance as yf
 import matplotlib.pyplot as plt
 import koreanize_matplotlib # 한글 폰트 설정을 위한 라이브러리
 import folium
 from streamlit_folium import st_folium
 import pandas as pd
+import plotly.graph_objects as go
+import os
 import random
+import numpy as np
+from stock_data import (OHLCVStore, Prefetcher, IndicatorEngine, PortfolioModel, LiveFeed, GridIndex, CompanySearch,
+                        COMPANIES_PATH, period_start, downsample_indices, points_for_width, close_matrix,
+                        default_quote_source, load_companies)
 
 # --- 페이지 설정 ---
 st.set_page_config(
@@ -15,17 +20,24 @@ st.set_page_config(
 )
 
 # --- 데이터 ---
-# 주요 기업 정보 (티커, 회사명, 본사 위도, 본사 경도)
+# 기업 정보 (티커, 회사명, 본사 위도, 본사 경도, 로고)는 companies.csv에서 읽음
 # 본사 위치는 예시이며, 정확한 최신 정보는 아닐 수 있습니다.
 # 로고 URL은 예시입니다. 실제 동작하는 URL로 교체하거나, 로고 기능을 제외할 수 있습니다.
-COMPANIES = {
-    "삼성전자": {"ticker": "005930.KS", "lat": 37.2390, "lon": 127.0708, "logo": "https://upload.wikimedia.org/wikipedia/commons/thumb/2/24/Samsung_Logo.svg/2560px-Samsung_Logo.svg.png"}, # 수원 삼성디지털시티
-    "SK하이닉스": {"ticker": "000660.KS", "lat": 37.2780, "lon": 127.1460, "logo": "https://upload.wikimedia.org/wikipedia/commons/thumb/c/ca/SK_Hynix_logo.svg/1200px-SK_Hynix_logo.svg.png"}, # 이천 본사
-    "LG에너지솔루션": {"ticker": "373220.KS", "lat": 37.5267, "lon": 126.9290, "logo": "https://www.lgensol.com/assets/images/common/logo_header.svg"}, # 서울 파크원 타워1
-    "현대자동차": {"ticker": "005380.KS", "lat": 37.5282, "lon": 127.0262, "logo": "https://upload.wikimedia.org/wikipedia/commons/thumb/2/27/Hyundai_Motor_Company_logo.svg/1920px-Hyundai_Motor_Company_logo.svg.png"}, # 서울 양재동
-    "NAVER": {"ticker": "035420.KS", "lat": 37.3948, "lon": 127.1112, "logo": "https://upload.wikimedia.org/wikipedia/commons/thumb/2/23/Naver_Logotype.svg/1200px-Naver_Logotype.svg.png"}, # 성남 그린팩토리
-    "카카오": {"ticker": "035720.KS", "lat": 33.4996, "lon": 126.5312, "logo": "https://upload.wikimedia.org/wikipedia/commons/thumb/e/e3/KakaoTalk_logo.svg/1024px-KakaoTalk_logo.svg.png"}  # 제주 스페이스닷원
-}
+# 지도에 한 번에 그리는 최대 마커 수 (화면 범위 안의 기업만 그림)
+MAX_MAP_MARKERS = 300
+MAP_WIDTH, MAP_HEIGHT, MAP_ZOOM = 700, 400, 7
+
+@st.cache_resource
+def load_universe(path, mtime):
+    """기업 목록과 본사 위치 공간 인덱스, 이름/종목코드 검색 인덱스를 만듭니다 (파일이 바뀔 때만 다시 만듦)."""
+    companies = load_companies(path)
+    return companies, GridIndex(companies["lat"], companies["lon"]), CompanySearch(companies["name"], companies["ticker"])
+
+companies_df, company_grid, company_search = load_universe(COMPANIES_PATH, os.path.getmtime(COMPANIES_PATH))
+COMPANIES = {row.name: {"ticker": row.ticker, "lat": row.lat, "lon": row.lon, "logo": row.logo}
+             for row in companies_df.itertuples(index=False)}
+# 주가 미리 불러오기, 실시간 시세, 포트폴리오에 쓰는 대표 기업
+FEATURED = list(companies_df.loc[companies_df["featured"], "name"]) or list(COMPANIES)[:6]
 
 # 투자 의견 (재미용)
 INVESTMENT_OPINIONS = [
@@ -38,20 +50,55 @@ INVESTMENT_OPINIONS = [
 ]
 
 # --- 함수 ---
-@st.cache_data(ttl=3600) # 1시간 동안 캐시
+@st.cache_resource
+def get_store():
+    """종목별 일봉 저장소 (지난 봉은 계속 보관하고 최근 봉만 한 시간마다 다시 확인)."""
+    return OHLCVStore()
+
+@st.cache_data(max_entries=64)
+def load_stock_frame(ticker_symbol, period, data_version):
+    """저장소에서 기간만큼 읽어 화면용 DataFrame으로 만듭니다 (data_version이 바뀔 때만 다시 읽음)."""
+    data = get_store().read(ticker_symbol, period_start(period))
+    # 날짜 형식을 'YYYY-MM-DD'로 통일 (시간 정보 제거)
+    data.index = data.index.strftime('%Y-%m-%d')
+    return data
+
 def get_stock_data(ticker_symbol, period="1y"):
-    """Yahoo Finance에서 주식 데이터를 가져옵니다."""
+    """Yahoo Finance에서 주식 데이터를 가져옵니다 (빠진 기간과 오래된 최근 봉만 새로 받음)."""
+    store = get_store()
     try:
-        stock = yf.Ticker(ticker_symbol)
-        data = stock.history(period=period)
-        # 날짜 형식을 'YYYY-MM-DD'로 통일 (시간 정보 제거)
-        data.index = data.index.strftime('%Y-%m-%d')
-        return data
+        store.update([ticker_symbol], period_start(period))
     except Exception as e:
-        st.error(f"{ticker_symbol} 주식 데이터를 가져오는 중 오류 발생: {e}")
-        return pd.DataFrame() # 빈 데이터프레임 반환
+        if store.covered(ticker_symbol) is None:
+            st.error(f"{ticker_symbol} 주식 데이터를 가져오는 중 오류 발생: {e}")
+            return pd.DataFrame() # 빈 데이터프레임 반환
+        st.warning(f"{ticker_symbol} 최신 주가를 가져오지 못해 저장된 데이터를 표시합니다: {e}")
+    return load_stock_frame(ticker_symbol, period, store.version(ticker_symbol))
+
+def prefetch_stock_data(ticker_symbol, period="1y"):
+    """미리 불러오기용: 저장소를 갱신하고 화면용 캐시를 채웁니다.
 
-def plot_stock_chart(data, company_name):
+    작업 스레드에서는 st.error/st.warning이 화면에 나오지 않으므로 오류를 그대로 올려 Prefetcher 보고에 원인이 남게 합니다.
+    """
+    store = get_store()
+    store.update([ticker_symbol], period_start(period))
+    return load_stock_frame(ticker_symbol, period, store.version(ticker_symbol))
+
+@st.cache_resource
+def start_prefetch():
+    """앱이 처음 뜰 때 대표 기업의 주가를 동시에 받아 저장소와 화면용 캐시를 미리 채웁니다 (서버당 한 번)."""
+    return Prefetcher(prefetch_stock_data, [COMPANIES[name]["ticker"] for name in FEATURED])
+
+@st.cache_resource
+def get_indicator_engine():
+    """기술적 지표 계산기 (종목별 마지막 봉이 바뀔 때만 다시 계산하며 서버 전체가 함께 씀)."""
+    return IndicatorEngine()
+
+def get_indicators(ticker, period):
+    """선택한 종목의 지표 DataFrame을 반환합니다 (데이터가 없으면 None). 마지막 봉이 그대로면 기억해 둔 결과를 씀."""
+    return get_indicator_engine().compute({ticker: get_stock_data(ticker, period)}).get(ticker)
+
+def plot_stock_chart(data, company_name, period_label="1년"):
     """주가 차트를 Matplotlib으로 그립니다."""
     if data.empty or 'Close' not in data.columns:
         st.warning(f"{company_name}의 주가 데이터를 표시할 수 없습니다.")
@@ -59,7 +106,7 @@ def plot_stock_chart(data, company_name):
 
     fig, ax = plt.subplots(figsize=(12, 6))
     ax.plot(data.index, data['Close'], label=f'{company_name} 종가', color='dodgerblue', linewidth=2)
-    ax.set_title(f'{company_name} 최근 1년 주가 추이', fontsize=18)
+    ax.set_title(f'{company_name} 최근 {period_label} 주가 추이', fontsize=18)
     ax.set_xlabel('날짜', fontsize=12)
     ax.set_ylabel('주가 (KRW)', fontsize=12)
     ax.legend(fontsize=10)
@@ -71,20 +118,156 @@ def plot_stock_chart(data, company_name):
     plt.tight_layout()
     return fig
 
+# 조회 기간 (yfinance period 문자열 → 화면 표시용 이름)
+PERIOD_LABELS = {"1y": "1년", "5y": "5년", "10y": "10년"}
+# 차트 너비 선택지 (픽셀). 너비에 맞춰 브라우저로 보내는 점 수를 정함
+CHART_WIDTHS = [600, 900, 1200, 1800, 2400]
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def stock_chart_figure(ticker_symbol, company_name, period, data_version, zoom_start, zoom_end, chart_width):
+    """주가 차트를 Plotly로 그립니다 (data_version과 확대 구간이 같으면 만들어 둔 Figure를 그대로 씀).
+
+    저장소에는 모든 봉이 그대로 있고, 확대 구간 안의 봉만 골라 차트 너비에 맞게 LTTB로 줄여서 보냅니다.
+    구간을 좁힐수록 원본 해상도에 가까워집니다.
+    """
+    data = load_stock_frame(ticker_symbol, period, data_version)
+    indicators = get_indicator_engine().compute({ticker_symbol: data})[ticker_symbol]
+    window = (data.index >= zoom_start) & (data.index <= zoom_end)
+    data, indicators = data[window], indicators[window]
+    idx = downsample_indices(data['Close'].to_numpy(), points_for_width(chart_width))
+    x = data.index[idx]
+
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=x, y=indicators['BB_upper'].to_numpy()[idx], name='볼린저 상단',
+                             line=dict(color='lightgray', width=1)))
+    fig.add_trace(go.Scatter(x=x, y=indicators['BB_lower'].to_numpy()[idx], name='볼린저 하단',
+                             line=dict(color='lightgray', width=1), fill='tonexty', fillcolor='rgba(200,200,200,0.2)'))
+    fig.add_trace(go.Scatter(x=x, y=indicators['SMA20'].to_numpy()[idx], name='20일 이동평균',
+                             line=dict(color='orange', width=1)))
+    fig.add_trace(go.Scatter(x=x, y=data['Close'].to_numpy()[idx], name=f'{company_name} 종가',
+                             line=dict(color='dodgerblue', width=2)))
+    fig.update_layout(
+        title=f'{company_name} 최근 {PERIOD_LABELS[period]} 주가 추이',
+        xaxis_title='날짜',
+        yaxis_title='주가 (KRW)',
+        hovermode='x unified',
+        height=500
+    )
+    return fig
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def portfolio_model(tickers, period, data_versions, start=None, end=None):
+    """기간 안의 모든 기업 종가로 수익률/공분산/효율적 투자선을 계산합니다 (같은 기간이면 캐시에서 바로 나옴)."""
+    frames = {t: load_stock_frame(t, period, v) for t, v in zip(tickers, data_versions)}
+    closes = close_matrix(frames)
+    if start is not None and end is not None:
+        closes = closes[(closes.index >= start) & (closes.index <= end)]
+    return PortfolioModel(closes)
+
+def portfolio_figures(model, weights, names):
+    """포트폴리오 평가액, 상관계수, 효율적 투자선 Figure를 만듭니다."""
+    value_fig = go.Figure(go.Scatter(x=model.closes.index, y=model.value(weights, 100), name='포트폴리오'))
+    value_fig.update_layout(title='포트폴리오 평가액 (시작 = 100)', xaxis_title='날짜', yaxis_title='평가액', height=400)
+
+    corr_fig = go.Figure(go.Heatmap(z=model.corr, x=names, y=names, zmin=-1, zmax=1, colorscale='RdBu_r',
+                                    text=model.corr.round(2), texttemplate='%{text}'))
+    corr_fig.update_layout(title='일간 수익률 상관계수', height=400)
+
+    ret, vol, _ = model.stats(weights)
+    frontier_fig = go.Figure()
+    frontier_fig.add_trace(go.Scatter(x=model.samples['volatility'] * 100, y=model.samples['return'] * 100, mode='markers',
+                                      name='무작위 포트폴리오 (공매도 없음)',
+                                      marker=dict(size=3, color=model.samples['sharpe'], colorscale='Viridis', opacity=0.5)))
+    frontier_fig.add_trace(go.Scatter(x=model.frontier['volatility'] * 100, y=model.frontier['return'] * 100, mode='lines',
+                                      name='효율적 투자선 (공매도 허용)', line=dict(color='black')))
+    asset_ret, asset_vol, _ = model.stats(np.eye(len(names)))
+    frontier_fig.add_trace(go.Scatter(x=asset_vol * 100, y=asset_ret * 100, mode='markers+text', text=names,
+                                      textposition='top center', name='개별 기업', marker=dict(size=9, color='gray')))
+    frontier_fig.add_trace(go.Scatter(x=[vol * 100], y=[ret * 100], mode='markers', name='내 포트폴리오',
+                                      marker=dict(size=14, color='red', symbol='star')))
+    frontier_fig.update_layout(title='효율적 투자선', xaxis_title='연 변동성 (%)', yaxis_title='연 수익률 (%)', height=500)
+    return value_fig, corr_fig, frontier_fig
+
+# 실시간 차트를 다시 그리는 간격 (초). 페이지 전체가 아니라 차트 부분만 다시 실행됨
+LIVE_REFRESH_SECONDS = 2
+
+@st.cache_resource
+def get_live_feed():
+    """대표 기업의 시세를 받아 종목별 고정 크기 버퍼에 쌓는 백그라운드 피드를 시작합니다 (서버당 하나).
+
+    실시간 차트를 보는 세션이 없으면 피드가 스스로 조회를 멈춥니다 (LiveFeed.touch 참고).
+    """
+    tickers = [COMPANIES[name]["ticker"] for name in FEATURED]
+    start_prices = {}
+    for t in tickers:
+        stored = get_store().read(t)
+        if not stored.empty:
+            start_prices[t] = float(stored['Close'].iloc[-1])
+    return LiveFeed(tickers, default_quote_source(start_prices)).start()
+
+@st.fragment(run_every=LIVE_REFRESH_SECONDS)
+def live_chart(ticker_symbol, company_name, chart_width):
+    """버퍼에 새로 들어온 시세만 이어 붙여 실시간 차트를 다시 그립니다."""
+    feed = get_live_feed()
+    feed.touch()  # 이 화면이 보는 동안만 시세를 조회함
+    if ticker_symbol not in feed.buffers:
+        st.info("실시간 시세는 대표 기업에서만 볼 수 있습니다: " + ", ".join(FEATURED))
+        return
+    buffer = feed.buffers[ticker_symbol]
+    state = st.session_state.setdefault(f"live_{ticker_symbol}", {"count": 0, "times": np.empty(0), "prices": np.empty(0)})
+    count, times, prices, _ = buffer.snapshot(since=state["count"])
+    state["count"] = count
+    state["times"] = np.concatenate((state["times"], times))[-buffer.capacity:]
+    state["prices"] = np.concatenate((state["prices"], prices))[-buffer.capacity:]
+
+    if len(state["prices"]) == 0:
+        st.info("시세를 기다리는 중입니다...")
+        if feed.last_error:
+            st.caption(f"최근 오류: {feed.last_error}")
+        return
+
+    idx = downsample_indices(state["prices"], points_for_width(chart_width))
+    x = pd.to_datetime(state["times"][idx], unit='s', utc=True).tz_convert('Asia/Seoul').floor('ms').tz_localize(None)
+    last, first = state["prices"][-1], state["prices"][0]
+    st.metric(f"{company_name} 현재가", f"{last:,.0f} KRW", f"{(last / first - 1) * 100:+.2f}%")
+    fig = go.Figure(go.Scatter(x=x, y=state["prices"][idx], mode='lines', line=dict(color='crimson')))
+    fig.update_layout(title=f'{company_name} 실시간 시세 (최근 {len(state["prices"])}건)', xaxis_title='시각',
+                      yaxis_title='가격 (KRW)', height=350)
+    st.plotly_chart(fig, use_container_width=True)
+
 # --- 앱 UI ---
+prefetcher = start_prefetch()
 st.title("📈 나만의 K-기업 투자 지도 🗺️")
 st.markdown("관심 있는 한국 기업의 주가와 본사 위치를 한눈에 살펴보세요!")
 
 # --- 사이드바 ---
 st.sidebar.header("🏢 기업 선택")
+search_query = st.sidebar.text_input("기업 검색 (이름, 종목코드, 초성)", placeholder="예: 삼성, 005930, ㅅㅅ")
+if search_query:
+    company_options = [companies_df["name"].iat[row] for row in company_search.search(search_query)]
+    if not company_options:
+        st.sidebar.caption("검색 결과가 없어 대표 기업을 보여 줍니다.")
+else:
+    company_options = []
 selected_company_name = st.sidebar.selectbox(
     "분석할 기업을 선택하세요:",
-    list(COMPANIES.keys())
+    company_options or FEATURED
 )
 
+period = st.sidebar.selectbox("조회 기간", list(PERIOD_LABELS), format_func=PERIOD_LABELS.get)
+chart_renderer = st.sidebar.radio("차트 방식", ["Plotly (인터랙티브)", "Matplotlib (이미지)"])
+live_mode = st.sidebar.toggle("⚡ 실시간 시세", help=f"{LIVE_REFRESH_SECONDS}초마다 차트만 새로 그립니다.")
+chart_width = st.sidebar.select_slider("차트 너비 (px)", CHART_WIDTHS, value=1200,
+                                       help="너비에 맞춰 화면에 보내는 점 수를 줄입니다 (1픽셀당 2개).")
+
 selected_company_info = COMPANIES[selected_company_name]
 ticker = selected_company_info["ticker"]
 
+with st.sidebar.expander("⏱️ 주가 미리 불러오기", expanded=False):
+    st.dataframe(prefetcher.report(), hide_index=True, use_container_width=True)
+    if not prefetcher.done():
+        st.caption("아직 받는 중인 종목이 있습니다. 새로 고치면 진행 상황이 갱신됩니다.")
+
 # --- 메인 화면 ---
 # 선택된 기업 정보 표시
 st.header(f"{selected_company_name} ({ticker})")
@@ -93,13 +276,26 @@ st.header(f"{selected_company_name} ({ticker})")
 col1, col2 = st.columns([2, 1]) # 주가 차트가 더 넓게
 
 with col1:
-    st.subheader("📊 주가 정보 (최근 1년)")
-    stock_data = get_stock_data(ticker)
+    st.subheader(f"📊 주가 정보 (최근 {PERIOD_LABELS[period]})")
+    stock_data = get_stock_data(ticker, period)
 
     if not stock_data.empty:
-        chart_fig = plot_stock_chart(stock_data, selected_company_name)
-        if chart_fig:
-            st.pyplot(chart_fig)
+        if chart_renderer.startswith("Plotly"):
+            first_day = pd.Timestamp(stock_data.index[0]).date()
+            last_day = pd.Timestamp(stock_data.index[-1]).date()
+            if first_day < last_day:
+                zoom_start, zoom_end = st.slider("확대 구간", min_value=first_day, max_value=last_day,
+                                                 value=(first_day, last_day), format="YYYY-MM-DD")
+            else:
+                zoom_start, zoom_end = first_day, last_day
+            st.plotly_chart(stock_chart_figure(ticker, selected_company_name, period, get_store().version(ticker),
+                                               zoom_start.isoformat(), zoom_end.isoformat(), chart_width),
+                            use_container_width=True)
+        else:
+            chart_fig = plot_stock_chart(stock_data, selected_company_name, PERIOD_LABELS[period])
+            if chart_fig:
+                st.pyplot(chart_fig)
+                plt.close(chart_fig)  # 서버에 pyplot Figure가 쌓이지 않도록 바로 닫음
 
         # 간단한 통계 정보
         st.markdown("---")
@@ -108,9 +304,19 @@ with col1:
         lowest_price_1y = stock_data['Low'].min()
         st.markdown(f"""
         - **최근 종가:** `{latest_price:,.0f} KRW`
-        - **지난 1년 최고가:** `{highest_price_1y:,.0f} KRW`
-        - **지난 1년 최저가:** `{lowest_price_1y:,.0f} KRW`
+        - **지난 {PERIOD_LABELS[period]} 최고가:** `{highest_price_1y:,.0f} KRW`
+        - **지난 {PERIOD_LABELS[period]} 최저가:** `{lowest_price_1y:,.0f} KRW`
         """)
+
+        # 기술적 지표 (최근 값)
+        indicators = get_indicators(ticker, period)
+        if indicators is not None:
+            last = indicators.iloc[-1]
+            i1, i2, i3, i4 = st.columns(4)
+            i1.metric("RSI(14)", f"{last['RSI']:.1f}")
+            i2.metric("MACD 히스토그램", f"{last['MACD_hist']:,.0f}")
+            i3.metric("20일 변동성(연율)", f"{last['Volatility'] * 100:.1f}%")
+            i4.metric("고점 대비 낙폭", f"{last['Drawdown'] * 100:.1f}%")
     else:
         st.warning(f"{selected_company_name}의 주가 데이터를 가져올 수 없습니다.")
 
@@ -122,10 +328,18 @@ with col2:
     map_center_lon = selected_company_info["lon"]
     # 또는 map_center_lat, map_center_lon = 36.5, 127.5 # 한국 중심 근처
 
-    m = folium.Map(location=[map_center_lat, map_center_lon], zoom_start=7) # 전체적으로 보이도록 zoom 조절
+    m = folium.Map(location=[map_center_lat, map_center_lon], zoom_start=MAP_ZOOM) # 전체적으로 보이도록 zoom 조절
 
-    # 모든 기업 마커 추가
-    for name, info in COMPANIES.items():
+    # 화면 범위 안의 기업만 마커로 추가 (처음에는 지도 크기와 줌으로 범위를 어림잡음)
+    half_lon = MAP_WIDTH / 2 * 360 / (256 * 2 ** MAP_ZOOM)
+    half_lat = MAP_HEIGHT / 2 * 360 / (256 * 2 ** MAP_ZOOM)
+    view = st.session_state.get("company_map_bounds") or (map_center_lat - half_lat, map_center_lon - half_lon,
+                                                           map_center_lat + half_lat, map_center_lon + half_lon)
+    visible = [companies_df["name"].iat[row] for row in company_grid.query(*view)]
+    visible = list(dict.fromkeys([selected_company_name] + visible))[:MAX_MAP_MARKERS]
+    markers = folium.FeatureGroup(name="기업")
+    for name in visible:
+        info = COMPANIES[name]
         popup_html = f"""
         <b>{name}</b> ({info['ticker']})<br>
         <img src='{info.get('logo', '')}' alt='logo' width='50' onerror="this.style.display='none'"><br>
@@ -137,16 +351,26 @@ with col2:
                 popup=folium.Popup(popup_html, max_width=200),
                 tooltip=f"{name} (선택됨)",
                 icon=folium.Icon(color="red", icon="star") # 선택된 기업은 빨간색 별표
-            ).add_to(m)
+            ).add_to(markers)
         else:
             folium.Marker(
                 [info["lat"], info["lon"]],
                 popup=folium.Popup(popup_html, max_width=200),
                 tooltip=name,
                 icon=folium.Icon(color="blue", icon="info-sign")
-            ).add_to(m)
+            ).add_to(markers)
 
-    st_folium(m, width=700, height=400)
+    # 마커는 feature_group_to_add로 넘겨 지도를 새로 그리지 않고 마커만 바꿈
+    map_state = st_folium(m, width=MAP_WIDTH, height=MAP_HEIGHT, feature_group_to_add=markers,
+                          returned_objects=["bounds"], key="company_map")
+    bounds = (map_state or {}).get("bounds") or {}
+    south_west, north_east = bounds.get("_southWest") or {}, bounds.get("_northEast") or {}
+    new_view = (south_west.get("lat"), south_west.get("lng"), north_east.get("lat"), north_east.get("lng"))
+    if None not in new_view:
+        if new_view != st.session_state.get("company_map_bounds"):
+            st.session_state.company_map_bounds = new_view
+            st.rerun()
+    st.caption(f"지도 범위 안의 기업 {len(visible)}곳 표시 (전체 {len(COMPANIES)}곳)")
 
     # 재미용 투자 의견
     st.markdown("---")
@@ -156,11 +380,63 @@ with col2:
     st.caption("주의: 이 의견은 실제 투자 조언이 아니며, 재미를 위해 제공됩니다.")
 
 
+# --- 실시간 시세 ---
+if live_mode:
+    st.markdown("---")
+    st.subheader("⚡ 실시간 시세")
+    live_chart(ticker, selected_company_name, chart_width)
+
+# --- 포트폴리오 분석 ---
+st.markdown("---")
+st.subheader("💼 포트폴리오 분석")
+if st.toggle("대표 기업을 묶어 포트폴리오로 보기", key="portfolio_mode"):
+    names = FEATURED
+    tickers = [COMPANIES[name]["ticker"] for name in names]
+    for t in tickers:
+        get_stock_data(t, period)  # 빠진 기간만 받아 저장소를 최신으로 맞춤
+    versions = [get_store().version(t) for t in tickers]
+    full = portfolio_model(tickers, period, versions)
+
+    if len(full.closes) < 3:
+        st.warning("포트폴리오를 계산할 만큼 겹치는 주가 데이터가 없습니다.")
+    else:
+        first_day = pd.Timestamp(full.closes.index[0]).date()
+        last_day = pd.Timestamp(full.closes.index[-1]).date()
+        start_day, end_day = st.slider("분석 기간", min_value=first_day, max_value=last_day,
+                                       value=(first_day, last_day), format="YYYY-MM-DD", key="portfolio_range")
+        model = portfolio_model(tickers, period, versions, start_day.isoformat(), end_day.isoformat())
+
+        st.caption("기업별 비중 (합이 1이 되도록 자동으로 맞춥니다)")
+        weight_cols = st.columns(len(names))
+        raw = np.array([col.number_input(name, min_value=0.0, value=1.0, step=0.5, key=f"weight_{ticker}")
+                        for col, name, ticker in zip(weight_cols, names, tickers)])
+        weights = raw / raw.sum() if raw.sum() > 0 else np.full(len(names), 1 / len(names))
+
+        if len(model.closes) < 3:
+            st.warning("선택한 기간이 너무 짧습니다.")
+        else:
+            ret, vol, sharpe = model.stats(weights)
+            p1, p2, p3 = st.columns(3)
+            p1.metric("연 수익률", f"{ret * 100:.1f}%")
+            p2.metric("연 변동성", f"{vol * 100:.1f}%")
+            p3.metric("샤프 비율", f"{sharpe:.2f}")
+
+            value_fig, corr_fig, frontier_fig = portfolio_figures(model, weights, names)
+            st.plotly_chart(value_fig, use_container_width=True)
+            f1, f2 = st.columns(2)
+            with f1:
+                st.plotly_chart(frontier_fig, use_container_width=True)
+            with f2:
+                st.plotly_chart(corr_fig, use_container_width=True)
+            best = model.best_sampled()
+            st.caption("무작위 포트폴리오 중 샤프 비율 최고 비중: "
+                       + ", ".join(f"{name} {w * 100:.0f}%" for name, w in zip(names, best)))
+
 # --- 추가 정보 ---
 st.markdown("---")
 st.subheader("ℹ️ 정보")
 st.markdown("""
-- 이 앱은 `Streamlit`, `yfinance`, `Matplotlib`, `koreanize-matplotlib`, `Folium`을 사용하여 제작되었습니다.
+- 이 앱은 `Streamlit`, `yfinance`, `Plotly`, `Matplotlib`, `koreanize-matplotlib`, `Folium`을 사용하여 제작되었습니다.
 - 주가 데이터는 Yahoo Finance에서 제공받으며, 실시간 데이터가 아닐 수 있습니다.
 - 본사 위치 및 로고는 예시이며, 실제와 다를 수 있습니다.
 - 모든 투자 결정은 개인의 판단과 책임 하에 이루어져야 합니다.
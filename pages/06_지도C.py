@@ -7,6 +7,10 @@ import requests
 import polyline
 from datetime import datetime, time, date, timedelta
 import time as time_module
+from concurrent.futures import ThreadPoolExecutor
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+from maps_data import (MapsClient, address_key, geocode_cache, latlng_key, snap_to_grid, route_cache, round_coord,
+                       route_key, compact_route, expand_route, travel_matrix, solve_tour, tour_cost)
 
 # --- Streamlit 페이지 설정 ---
 st.set_page_config(
@@ -135,16 +139,44 @@ def delete_location_from_sheet(worksheet, location_to_delete):
         st.error(f"Google Sheet 데이터 삭제 중 오류: {e}")
         return False
 
-# --- Google Maps Directions API 함수 ---
+# --- Google Maps API 함수 ---
+# 경로 찾기 이동 수단: API mode → (이름, 아이콘, 지도 선 색, 선 굵기)
+TRAVEL_MODES = {
+    "driving": ("자동차", "🚗", "red", 5),
+    "walking": ("도보", "🚶", "blue", 4),
+    "transit": ("대중교통", "🚌", "green", 4),
+    "bicycling": ("자전거", "🚲", "orange", 4),
+}
+
+@st.cache_resource
+def get_maps_client():
+    """연결을 재사용하는 Google Maps 클라이언트 (모든 세션이 함께 씀)."""
+    return MapsClient(GOOGLE_MAPS_API_KEY)
+
+@st.cache_resource
+def get_geocode_cache():
+    """지오코딩 결과를 보관하는 디스크 캐시 (모든 세션과 재시작 후에도 함께 씀)."""
+    return geocode_cache()
+
+@st.cache_resource
+def get_route_cache():
+    """길찾기 결과를 보관하는 디스크 캐시 (같은 두 지점과 옵션이면 다시 부르지 않음)."""
+    return route_cache()
+
 def get_directions(origin_lat, origin_lng, dest_lat, dest_lng, mode="driving", **kwargs):
     if not GOOGLE_MAPS_API_KEY:
         return {"error_message": "Google Maps API 키가 설정되지 않았습니다."}
-    base_url = "https://maps.googleapis.com/maps/api/directions/json"
+    # 같은 두 지점/옵션/출발 시각 구간의 경로는 캐시에서 바로 반환
+    origin_lat, origin_lng = round_coord(origin_lat, origin_lng)
+    dest_lat, dest_lng = round_coord(dest_lat, dest_lng)
+    cache_key, cache_ttl = route_key((origin_lat, origin_lng), (dest_lat, dest_lng), mode, kwargs)
+    cached = get_route_cache().get(cache_key)
+    if cached is not None:
+        return expand_route(cached)
     params = {
         "origin": f"{origin_lat},{origin_lng}",
         "destination": f"{dest_lat},{dest_lng}",
         "mode": mode,
-        "key": GOOGLE_MAPS_API_KEY,
         "language": "ko",
         "region": "kr"
     }
@@ -154,9 +186,7 @@ def get_directions(origin_lat, origin_lng, dest_lat, dest_lng, mode="driving", *
         params.update(kwargs)
         
     try:
-        response = requests.get(base_url, params=params)
-        response.raise_for_status()  # HTTP 오류 검출
-        data = response.json()
+        data = get_maps_client().get_json("directions", params)
         
         if data["status"] == "OK" and data["routes"]:
             route = data["routes"][0]
@@ -179,7 +209,7 @@ def get_directions(origin_lat, origin_lng, dest_lat, dest_lng, mode="driving", *
                 f"&destination={dest_lat},{dest_lng}&travelmode={api_mode}"
             )
             
-            return {
+            route_info = {
                 "duration": leg["duration"]["text"],
                 "duration_value": leg["duration"]["value"],  # 초 단위
                 "distance": leg["distance"]["text"],
@@ -190,6 +220,8 @@ def get_directions(origin_lat, origin_lng, dest_lat, dest_lng, mode="driving", *
                 "polyline": decoded_polyline,
                 "url": map_url
             }
+            get_route_cache().put(cache_key, compact_route(route_info, route_polyline), ttl=cache_ttl)
+            return route_info
         else:
             error_msg = data.get("status", "알 수 없는 오류")
             if data.get("error_message"):
@@ -200,19 +232,64 @@ def get_directions(origin_lat, origin_lng, dest_lat, dest_lng, mode="driving", *
     except Exception as e:
         return {"error_message": f"처리 오류: {str(e)}"}
 
+def get_directions_many(origin_loc, dest_loc, mode_options):
+    """여러 이동 수단의 경로를 동시에 요청해 {mode: 결과}로 모읍니다 (가장 느린 요청 하나만큼만 기다림).
+
+    mode_options는 {mode: 그 수단에 보낼 추가 파라미터}입니다.
+    """
+    ctx = get_script_run_ctx()
+    with ThreadPoolExecutor(max_workers=len(mode_options), thread_name_prefix="directions",
+                            initializer=add_script_run_ctx, initargs=(None, ctx)) as pool:
+        futures = {
+            mode: pool.submit(get_directions, origin_loc["lat"], origin_loc["lon"],
+                              dest_loc["lat"], dest_loc["lon"], mode=mode, **options)
+            for mode, options in mode_options.items()
+        }
+    return {mode: future.result() for mode, future in futures.items()}
+
+def plan_trip(stops, mode, start_index=0, round_trip=True):
+    """저장된 지점들을 모두 도는 방문 순서를 구합니다.
+
+    지점 사이 이동 시간 행렬을 Distance Matrix API로 나눠 받고 (받아 둔 칸은 캐시에서),
+    API를 쓸 수 없으면 직선거리로 어림한 행렬을 씁니다. 순서는 최근접 이웃 + 2-opt로 근사합니다.
+    """
+    client = get_maps_client() if GOOGLE_MAPS_API_KEY else None
+    durations, distances, source = travel_matrix([(stop["lat"], stop["lon"]) for stop in stops], mode,
+                                                 client=client, cache=get_route_cache() if client else None)
+    started = time_module.perf_counter()
+    order, total_seconds = solve_tour(durations, start_index, round_trip)
+    solve_seconds = time_module.perf_counter() - started
+    visits = order + [order[0]] if round_trip else order
+    legs = [{
+        "순서": k + 1,
+        "출발": stops[a]["label"],
+        "도착": stops[b]["label"],
+        "이동 시간(분)": round(durations[a, b] / 60, 1),
+        "거리(km)": round(distances[a, b] / 1000, 2),
+    } for k, (a, b) in enumerate(zip(visits[:-1], visits[1:]))]
+    given_order = [start_index] + [i for i in range(len(stops)) if i != start_index]
+    return {
+        "mode": mode,
+        "stops": [stops[i] for i in order],
+        "round_trip": round_trip,
+        "legs": legs,
+        "total_seconds": total_seconds,
+        "total_meters": float(sum(distances[a, b] for a, b in zip(visits[:-1], visits[1:]))),
+        "given_seconds": tour_cost(durations, given_order, round_trip),
+        "source": source,
+        "solve_seconds": solve_seconds,
+    }
+
 def get_place_details(place_id):
     if not GOOGLE_MAPS_API_KEY:
         return {"error_message": "Google Maps API 키가 설정되지 않았습니다."}
-    base_url = "https://maps.googleapis.com/maps/api/place/details/json"
     params = {
         "place_id": place_id,
-        "key": GOOGLE_MAPS_API_KEY,
         "language": "ko",
         "fields": "name,formatted_address,geometry,rating,formatted_phone_number,opening_hours,website,photos"
     }
     try:
-        response = requests.get(base_url, params=params)
-        data = response.json()
+        data = get_maps_client().get_json("place/details", params)
         if data["status"] == "OK" and "result" in data:
             return data["result"]
         else:
@@ -234,25 +311,60 @@ def get_place_photo_url(photo_reference, max_width=400):
 def geocode_address(address):
     if not GOOGLE_MAPS_API_KEY:
         return {"error_message": "Google Maps API 키가 설정되지 않았습니다."}
-    base_url = "https://maps.googleapis.com/maps/api/geocode/json"
+    # 전에 누군가 찾아본 주소면 API를 부르지 않고 캐시에서 바로 반환
+    cache_key = address_key(address)
+    cached = get_geocode_cache().get(cache_key)
+    if cached is not None:
+        return cached
     params = {
         "address": address,
-        "key": GOOGLE_MAPS_API_KEY,
         "language": "ko",
         "region": "kr"
     }
     try:
-        response = requests.get(base_url, params=params)
-        data = response.json()
+        data = get_maps_client().get_json("geocode", params)
         if data["status"] == "OK" and data["results"]:
             result = data["results"][0]
             location = result["geometry"]["location"]
-            return {
+            geocoded = {
                 "lat": location["lat"],
                 "lng": location["lng"],
                 "formatted_address": result["formatted_address"],
                 "place_id": result.get("place_id")
             }
+            get_geocode_cache().put(cache_key, geocoded)
+            return geocoded
+        else:
+            error_msg = data.get("status", "알 수 없는 오류")
+            if data.get("error_message"):
+                error_msg = data["error_message"]
+            return {"error_message": f"{error_msg}"}
+    except Exception as e:
+        return {"error_message": f"API 호출 오류: {str(e)}"}
+
+def reverse_geocode(lat, lng):
+    if not GOOGLE_MAPS_API_KEY:
+        return {"error_message": "Google Maps API 키가 설정되지 않았습니다."}
+    # 약 20 m 격자 칸마다 한 번만 조회 (칸의 대표 좌표로 요청해 같은 칸은 같은 결과)
+    cache_key = latlng_key(lat, lng)
+    cached = get_geocode_cache().get(cache_key)
+    if cached is not None:
+        return cached
+    _, (grid_lat, grid_lng) = snap_to_grid(lat, lng)
+    params = {
+        "latlng": f"{grid_lat},{grid_lng}",
+        "language": "ko"
+    }
+    try:
+        data = get_maps_client().get_json("geocode", params)
+        if data["status"] == "OK" and data["results"]:
+            result = data["results"][0]
+            address = {
+                "formatted_address": result["formatted_address"],
+                "place_id": result.get("place_id")
+            }
+            get_geocode_cache().put(cache_key, address)
+            return address
         else:
             error_msg = data.get("status", "알 수 없는 오류")
             if data.get("error_message"):
@@ -289,6 +401,8 @@ def initialize_session_state():
         st.session_state.route_destination_label = None
     if "route_results" not in st.session_state:
         st.session_state.route_results = None
+    if "trip_plan" not in st.session_state:
+        st.session_state.trip_plan = None
     if "calculating_route" not in st.session_state:
         st.session_state.calculating_route = False
     if "search_address" not in st.session_state:
@@ -331,7 +445,7 @@ if st.session_state.worksheet and not st.session_state.data_loaded_from_sheet:
             st.session_state.zoom_start = default_zoom_start
 
 # --- 탭 기반 인터페이스 ---
-tab1, tab2, tab3 = st.tabs(["🗺️ 지도 및 마커", "🚗 경로 찾기", "ℹ️ API 설정 도움말"])
+tab1, tab2, tab_trip, tab3 = st.tabs(["🗺️ 지도 및 마커", "🚗 경로 찾기", "🧭 방문 순서", "ℹ️ API 설정 도움말"])
 
 with tab1:
     # --- 레이아웃 설정 ---
@@ -397,23 +511,36 @@ with tab1:
 
         # 경로 폴리라인 추가
         if st.session_state.route_results:
-            walking_info = st.session_state.route_results.get("walking", {})
-            if walking_info and "polyline" in walking_info and walking_info["polyline"] and "error_message" not in walking_info:
-                folium.PolyLine(
-                    locations=walking_info["polyline"],
-                    weight=4,
-                    color='blue',
-                    opacity=0.7,
-                    tooltip="도보 경로"
-                ).add_to(m)
-            driving_info = st.session_state.route_results.get("driving", {})
-            if driving_info and "polyline" in driving_info and driving_info["polyline"] and "error_message" not in driving_info:
-                folium.PolyLine(
-                    locations=driving_info["polyline"],
-                    weight=5,
-                    color='red',
-                    opacity=0.7,
-                    tooltip="자동차 경로"
+            for mode, (mode_name, _, line_color, line_weight) in TRAVEL_MODES.items():
+                mode_info = st.session_state.route_results.get(mode, {})
+                if mode_info and mode_info.get("polyline") and "error_message" not in mode_info:
+                    folium.PolyLine(
+                        locations=mode_info["polyline"],
+                        weight=line_weight,
+                        color=line_color,
+                        opacity=0.7,
+                        tooltip=f"{mode_name} 경로"
+                    ).add_to(m)
+
+        # 방문 순서 경로 (지점 사이를 순서대로 잇는 점선)
+        if st.session_state.trip_plan:
+            trip_stops = st.session_state.trip_plan["stops"]
+            trip_line = [[stop["lat"], stop["lon"]] for stop in trip_stops]
+            if st.session_state.trip_plan["round_trip"]:
+                trip_line.append(trip_line[0])
+            folium.PolyLine(
+                locations=trip_line,
+                weight=3,
+                color='purple',
+                opacity=0.8,
+                dash_array='8',
+                tooltip="방문 순서"
+            ).add_to(m)
+            for k, stop in enumerate(trip_stops):
+                folium.Marker(
+                    [stop["lat"], stop["lon"]],
+                    icon=folium.DivIcon(html=f'<div style="font-weight:bold;color:purple;font-size:14px;">{k + 1}</div>',
+                                        icon_anchor=(-8, 24))
                 ).add_to(m)
 
         # 마커 추가
@@ -480,6 +607,16 @@ with tab1:
         if st.session_state.last_clicked_coord:
             lat, lng = st.session_state.last_clicked_coord["lat"], st.session_state.last_clicked_coord["lng"]
             st.info(f"선택 위치: {lat:.5f}, {lng:.5f}")
+            if GOOGLE_MAPS_API_KEY:
+                # 역지오코딩은 유료 요청이라 클릭마다 부르지 않고, 캐시에 있으면 보여 주고 없으면 버튼을 눌렀을 때만 조회
+                clicked_address = get_geocode_cache().get(latlng_key(lat, lng))
+                if clicked_address is None and st.button("📫 주소 확인", use_container_width=True):
+                    clicked_address = reverse_geocode(lat, lng)
+                if clicked_address is not None:
+                    if "error_message" in clicked_address:
+                        st.caption(clicked_address["error_message"])
+                    else:
+                        st.caption(clicked_address["formatted_address"])
             with st.form("label_form_corrected_routes", clear_on_submit=True):
                 label = st.text_input("장소 이름", value=f"마커 {len(st.session_state.locations) + 1}")
                 submit_btn = st.form_submit_button("✅ 마커 저장", use_container_width=True)
@@ -543,6 +680,7 @@ with tab1:
                             if st.session_state.route_destination_label == deleted_label:
                                 st.session_state.route_destination_label = None
                             st.session_state.locations.remove(loc)
+                            st.session_state.trip_plan = None
                             st.toast(f"'{deleted_label}' 삭제 완료!", icon="🚮")
                             st.session_state.last_operation = "marker_deleted"
                             st.session_state.operation_time = datetime.now()
@@ -563,6 +701,7 @@ with tab1:
                         st.session_state.route_origin_label = None
                         st.session_state.route_destination_label = None
                         st.session_state.route_results = None
+                        st.session_state.trip_plan = None
                         st.success("모든 마커가 삭제되었습니다.")
                         st.session_state.last_operation = "all_markers_deleted"
                         st.session_state.operation_time = datetime.now()
@@ -618,11 +757,11 @@ with tab2:
                     st.rerun()
         with col2:
             st.markdown("#### 경로 옵션")
-            travel_mode = st.radio(
+            travel_modes = st.multiselect(
                 "이동 수단 선택:",
-                options=["자동차 + 도보", "자동차만", "도보만"],
-                index=0,
-                horizontal=True
+                options=list(TRAVEL_MODES),
+                default=["driving", "walking"],
+                format_func=lambda mode: f"{TRAVEL_MODES[mode][1]} {TRAVEL_MODES[mode][0]}"
             )
             alternatives = st.checkbox("대체 경로 검색", value=True)
             traffic_model = st.selectbox(
@@ -655,6 +794,9 @@ with tab2:
                 if not origin_loc or not dest_loc:
                     st.error("출발지 또는 도착지 위치 정보를 찾을 수 없습니다.")
                     st.session_state.calculating_route = False
+                elif not travel_modes:
+                    st.warning("이동 수단을 하나 이상 선택해주세요.")
+                    st.session_state.calculating_route = False
                 else:
                     # 사용자 선택 옵션 처리
                     api_options = {}
@@ -669,9 +811,6 @@ with tab2:
                         "낙관적 예측": "optimistic",
                         "비관적 예측": "pessimistic"
                     }
-                    if travel_mode in ["자동차 + 도보", "자동차만"] and traffic_model in traffic_model_map:
-                        api_options["traffic_model"] = traffic_model_map[traffic_model]
-                        api_options["departure_time"] = "now"
                     
                     # 회피 옵션 매핑
                     avoid_map = {
@@ -683,7 +822,8 @@ with tab2:
                     if avoid_list:
                         api_options["avoid"] = "|".join(avoid_list)
                     
-                    # 출발 시간 설정
+                    # 출발 시간 설정 (자동차와 대중교통만 사용)
+                    departure_value = "now"
                     if departure_time == "직접 지정":
                         try:
                             departure_datetime = datetime.combine(
@@ -691,40 +831,27 @@ with tab2:
                                 st.session_state.departure_time_input
                             )
                             # UNIX timestamp 변환 (초 단위)
-                            timestamp = int(time_module.mktime(departure_datetime.timetuple()))
-                            api_options["departure_time"] = timestamp
+                            departure_value = int(time_module.mktime(departure_datetime.timetuple()))
                         except Exception as e:
                             st.warning(f"출발 시간 설정 오류: {e}")
-                            if "traffic_model" in api_options:
-                                api_options["departure_time"] = "now"
-                    elif "traffic_model" in api_options:  # 교통 모델이 지정된 경우 출발 시간 필요
-                        api_options["departure_time"] = "now"
-                        
-                    results = {}
                     
-                    # 모드에 따른 API 호출
-                    if travel_mode in ["자동차 + 도보", "도보만"]:
-                        walking_api_options = api_options.copy()
-                        # 도보 모드에서는 traffic_model과 departure_time 제거 (지원되지 않음)
-                        walking_api_options.pop("traffic_model", None)
-                        walking_api_options.pop("departure_time", None)
-                        
-                        walking_result = get_directions(
-                            origin_loc["lat"], origin_loc["lon"],
-                            dest_loc["lat"], dest_loc["lon"],
-                            mode="walking",
-                            **walking_api_options
-                        )
-                        results["walking"] = walking_result
-                        
-                    if travel_mode in ["자동차 + 도보", "자동차만"]:
-                        driving_result = get_directions(
-                            origin_loc["lat"], origin_loc["lon"],
-                            dest_loc["lat"], dest_loc["lon"],
-                            mode="driving",
-                            **api_options
-                        )
-                        results["driving"] = driving_result
+                    # 이동 수단별 옵션: 교통 모델은 자동차만, 출발 시간은 자동차/대중교통만, 회피 옵션은 대중교통 제외
+                    mode_options = {}
+                    for mode in travel_modes:
+                        mode_api_options = api_options.copy()
+                        if mode == "driving":
+                            if traffic_model in traffic_model_map:
+                                mode_api_options["traffic_model"] = traffic_model_map[traffic_model]
+                            mode_api_options["departure_time"] = departure_value
+                        elif mode == "transit":
+                            mode_api_options.pop("avoid", None)
+                            mode_api_options["departure_time"] = departure_value
+                        mode_options[mode] = mode_api_options
+                    
+                    # 모든 이동 수단을 동시에 요청
+                    started = time_module.perf_counter()
+                    results = get_directions_many(origin_loc, dest_loc, mode_options)
+                    results["elapsed_seconds"] = time_module.perf_counter() - started
                         
                     # 지도 URL 생성
                     map_url_combined = f"https://www.google.com/maps/dir/?api=1&origin={origin_loc['lat']},{origin_loc['lon']}&destination={dest_loc['lat']},{dest_loc['lon']}"
@@ -740,59 +867,104 @@ with tab2:
         if st.session_state.route_results:
             st.markdown("---")
             st.subheader("🔍 경로 검색 결과")
-            walking_info = st.session_state.route_results.get("walking")
-            driving_info = st.session_state.route_results.get("driving")
-            if walking_info and driving_info:
-                col_walking, col_driving = st.columns(2)
-            else:
-                col_walking = col_driving = st
-            if walking_info:
-                with col_walking:
-                    if "error_message" in walking_info:
-                        st.warning(f"🚶 도보 경로 오류: {walking_info['error_message']}")
-                    elif walking_info.get("duration"):
-                        st.markdown(f"### 🚶 도보 경로")
-                        st.markdown(f"**예상 시간:** {walking_info.get('duration', '정보 없음')}")
-                        st.markdown(f"**거리:** {walking_info.get('distance', '정보 없음')}")
-                        if "steps" in walking_info and walking_info["steps"]:
-                            with st.expander("도보 경로 상세 안내"):
-                                for i, step in enumerate(walking_info["steps"]):
+            result_modes = [mode for mode in TRAVEL_MODES if mode in st.session_state.route_results]
+            result_cols = st.columns(len(result_modes)) if len(result_modes) > 1 else [st] * len(result_modes)
+            for mode, col_mode in zip(result_modes, result_cols):
+                mode_name, mode_icon, _, _ = TRAVEL_MODES[mode]
+                mode_info = st.session_state.route_results[mode]
+                with col_mode:
+                    if "error_message" in mode_info:
+                        st.warning(f"{mode_icon} {mode_name} 경로 오류: {mode_info['error_message']}")
+                    elif mode_info.get("duration"):
+                        st.markdown(f"### {mode_icon} {mode_name} 경로")
+                        st.markdown(f"**예상 시간:** {mode_info.get('duration', '정보 없음')}")
+                        st.markdown(f"**거리:** {mode_info.get('distance', '정보 없음')}")
+                        if "steps" in mode_info and mode_info["steps"]:
+                            with st.expander(f"{mode_name} 경로 상세 안내"):
+                                for i, step in enumerate(mode_info["steps"]):
                                     instruction = step.get('html_instructions', '')
                                     # HTML 태그 처리
                                     instruction = instruction.replace('<b>', '**').replace('</b>', '**')
                                     instruction = instruction.replace('<div style="font-size:0.9em">', '\n').replace('</div>', '')
                                     st.markdown(f"{i+1}. {instruction}")
                                     st.caption(f"{step.get('distance', {}).get('text', '')} ({step.get('duration', {}).get('text', '')})")
-                        if walking_info.get('url'):
-                            st.markdown(f"[Google Maps에서 도보 경로 보기]({walking_info.get('url')})")
+                        if mode_info.get('url'):
+                            st.markdown(f"[Google Maps에서 {mode_name} 경로 보기]({mode_info.get('url')})")
                     else:
-                        st.warning("🚶 도보 경로 정보를 가져올 수 없습니다.")
-            if driving_info:
-                with col_driving:
-                    if "error_message" in driving_info:
-                        st.warning(f"🚗 자동차 경로 오류: {driving_info['error_message']}")
-                    elif driving_info.get("duration"):
-                        st.markdown(f"### 🚗 자동차 경로")
-                        st.markdown(f"**예상 시간:** {driving_info.get('duration', '정보 없음')}")
-                        st.markdown(f"**거리:** {driving_info.get('distance', '정보 없음')}")
-                        if "steps" in driving_info and driving_info["steps"]:
-                            with st.expander("자동차 경로 상세 안내"):
-                                for i, step in enumerate(driving_info["steps"]):
-                                    instruction = step.get('html_instructions', '')
-                                    # HTML 태그 처리
-                                    instruction = instruction.replace('<b>', '**').replace('</b>', '**')
-                                    instruction = instruction.replace('<div style="font-size:0.9em">', '\n').replace('</div>', '')
-                                    st.markdown(f"{i+1}. {instruction}")
-                                    st.caption(f"{step.get('distance', {}).get('text', '')} ({step.get('duration', {}).get('text', '')})")
-                        if driving_info.get('url'):
-                            st.markdown(f"[Google Maps에서 자동차 경로 보기]({driving_info.get('url')})")
-                    else:
-                        st.warning("🚗 자동차 경로 정보를 가져올 수 없습니다.")
+                        st.warning(f"{mode_icon} {mode_name} 경로 정보를 가져올 수 없습니다.")
+            if st.session_state.route_results.get("elapsed_seconds") is not None:
+                st.caption(f"{len(result_modes)}개 이동 수단을 동시에 요청해 "
+                           f"{st.session_state.route_results['elapsed_seconds']:.2f}초 만에 계산했습니다.")
             combined_map_url = st.session_state.route_results.get("map_url_combined")
             if combined_map_url:
                 st.markdown("---")
                 st.markdown(f"🗺️ [통합 경로 지도 보기 (Google Maps)]({combined_map_url})")
 
+with tab_trip:
+    st.subheader("🧭 여러 장소 방문 순서 계획")
+    if len(st.session_state.locations) < 3:
+        st.info("방문 순서를 계산하려면 지도에 마커를 3개 이상 저장해주세요.")
+    else:
+        if not GOOGLE_MAPS_API_KEY:
+            st.warning("Google Maps API 키가 없어 직선거리로 어림한 이동 시간으로 계산합니다.")
+        trip_col1, trip_col2 = st.columns(2)
+        with trip_col1:
+            location_labels = [loc["label"] for loc in st.session_state.locations]
+            trip_labels = st.multiselect("방문할 장소:", options=location_labels, default=location_labels, key="trip_stops")
+            trip_start = st.selectbox("출발 장소:", options=trip_labels, key="trip_start")
+        with trip_col2:
+            trip_mode = st.selectbox(
+                "이동 수단:",
+                options=list(TRAVEL_MODES),
+                format_func=lambda mode: f"{TRAVEL_MODES[mode][1]} {TRAVEL_MODES[mode][0]}",
+                key="trip_mode"
+            )
+            trip_round = st.checkbox("출발 장소로 돌아오기", value=True, key="trip_round")
+
+        trip_btn_col1, trip_btn_col2 = st.columns(2)
+        with trip_btn_col1:
+            if st.button("🧭 방문 순서 계산", use_container_width=True, key="calc_trip_btn"):
+                if len(trip_labels) < 3 or trip_start is None:
+                    st.warning("방문할 장소를 3개 이상 선택해주세요.")
+                else:
+                    trip_stops = [loc for loc in st.session_state.locations if loc["label"] in trip_labels]
+                    start_index = next(i for i, loc in enumerate(trip_stops) if loc["label"] == trip_start)
+                    with st.spinner("장소 사이 이동 시간을 계산하는 중입니다..."):
+                        st.session_state.trip_plan = plan_trip(trip_stops, trip_mode, start_index, trip_round)
+                    st.session_state.last_operation = "trip_planned"
+                    st.session_state.operation_time = datetime.now()
+                    st.rerun()
+        with trip_btn_col2:
+            if st.button("🗑️ 방문 순서 해제", use_container_width=True, key="clear_trip_btn"):
+                st.session_state.trip_plan = None
+                st.rerun()
+
+        trip_plan = st.session_state.trip_plan
+        if trip_plan:
+            st.markdown("---")
+            mode_name, mode_icon, _, _ = TRAVEL_MODES[trip_plan["mode"]]
+            metric_col1, metric_col2, metric_col3 = st.columns(3)
+            metric_col1.metric(f"{mode_icon} 총 이동 시간", f"{trip_plan['total_seconds'] / 60:.0f}분")
+            metric_col2.metric("총 거리", f"{trip_plan['total_meters'] / 1000:.1f} km")
+            saved = trip_plan["given_seconds"] - trip_plan["total_seconds"]
+            metric_col3.metric("선택한 순서 대비 단축", f"{max(saved, 0) / 60:.0f}분")
+            st.dataframe(trip_plan["legs"], hide_index=True, use_container_width=True)
+            source_text = {"api": "Google Distance Matrix", "estimate": "직선거리 어림값",
+                           "mixed": "Google Distance Matrix (일부 구간은 직선거리 어림값)"}[trip_plan["source"]]
+            st.caption(f"이동 시간 출처: {source_text} · 순서 계산 {trip_plan['solve_seconds'] * 1000:.0f} ms "
+                       f"({len(trip_plan['stops'])}곳, 최근접 이웃 + 2-opt)")
+            # Google Maps 길찾기 링크는 경유지를 최대 9곳까지 받음
+            route_stops = trip_plan["stops"] + ([trip_plan["stops"][0]] if trip_plan["round_trip"] else [])
+            if len(route_stops) <= 11:
+                waypoints = "|".join(f"{stop['lat']},{stop['lon']}" for stop in route_stops[1:-1])
+                trip_url = (
+                    f"https://www.google.com/maps/dir/?api=1"
+                    f"&origin={route_stops[0]['lat']},{route_stops[0]['lon']}"
+                    f"&destination={route_stops[-1]['lat']},{route_stops[-1]['lon']}"
+                    f"&waypoints={waypoints}&travelmode={trip_plan['mode']}"
+                )
+                st.markdown(f"🗺️ [Google Maps에서 방문 경로 보기]({trip_url})")
+
 with tab3:
     st.subheader("ℹ️ Google Maps API 설정 도움말")
     st.markdown("""
@@ -805,6 +977,7 @@ with tab3:
     4. 다음 API들을 검색하고 활성화합니다:
        - Maps JavaScript API
        - Directions API
+       - Distance Matrix API
        - Geocoding API
        - Places API
     5. '사용자 인증 정보'로 이동하여 'API 키 만들기'를 클릭합니다.
@@ -889,15 +1062,19 @@ if st.sidebar.checkbox("디버그 모드", value=False):
         st.sidebar.write(f"출발지: {st.session_state.route_origin_label}")
         st.sidebar.write(f"도착지: {st.session_state.route_destination_label}")
         if st.session_state.route_results:
-            if "walking" in st.session_state.route_results:
-                walk_info = st.session_state.route_results["walking"]
-                if "error_message" in walk_info:
-                    st.sidebar.write("도보 경로 오류:", walk_info["error_message"])
-                else:
-                    st.sidebar.write("도보 거리:", walk_info.get("distance"))
-            if "driving" in st.session_state.route_results:
-                drive_info = st.session_state.route_results["driving"]
-                if "error_message" in drive_info:
-                    st.sidebar.write("자동차 경로 오류:", drive_info["error_message"])
+            for mode, (mode_name, _, _, _) in TRAVEL_MODES.items():
+                if mode not in st.session_state.route_results:
+                    continue
+                mode_info = st.session_state.route_results[mode]
+                if "error_message" in mode_info:
+                    st.sidebar.write(f"{mode_name} 경로 오류:", mode_info["error_message"])
                 else:
-                    st.sidebar.write("자동차 거리:", drive_info.get("distance"))
+                    st.sidebar.write(f"{mode_name} 거리:", mode_info.get("distance"))
+    if st.sidebar.checkbox("API 호출 통계"):
+        api_metrics = get_maps_client().metrics()
+        if api_metrics.empty:
+            st.sidebar.write("아직 호출한 API가 없습니다.")
+        else:
+            st.sidebar.dataframe(api_metrics, hide_index=True)
+        st.sidebar.write("지오코딩 캐시:", get_geocode_cache().stats())
+        st.sidebar.write("경로 캐시:", get_route_cache().stats())
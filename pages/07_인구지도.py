@@ -0,0 +1,110 @@
+import glob
+import os
+import streamlit as st
+import folium
+from streamlit_folium import st_folium
+from population_data import PopulationStore, LEVEL_SIGUNGU, LEVEL_EMD, load_dataset
+from boundary_data import BoundaryLayers, pick_zoom_level
+
+st.set_page_config(layout="wide", page_title="인구 지표 지도", page_icon="🗺️")
+st.title("🗺️ 인구 지표 지도")
+
+# 경계 파일: 단계별 GeoJSON을 boundaries/ 폴더에 넣으면 처음 한 번 줌 단계별로 단순화해 캐시에 저장
+# (예: 시군구 경계는 SIG_CD, 행정동 경계는 adm_cd2 속성에 행정구역코드가 있는 파일)
+BOUNDARY_FILES = {
+    LEVEL_SIGUNGU: os.path.join("boundaries", "시군구.geojson"),
+    LEVEL_EMD: os.path.join("boundaries", "읍면동.geojson"),
+}
+LEVEL_NAMES = {LEVEL_SIGUNGU: "시군구", LEVEL_EMD: "읍면동"}
+METRICS = ["고령인구비율(%)", "노령화지수", "총부양비", "노년부양비", "유소년부양비", "총인구"]
+DEFAULT_ZOOM = 7
+
+mf_paths = sorted(glob.glob("*_연령별인구현황_월간_남녀구분.csv"))
+total_paths = sorted(glob.glob("*_연령별인구현황_월간_남녀합계.csv"))
+available_levels = [level for level, path in BOUNDARY_FILES.items() if os.path.exists(path)]
+if not mf_paths or not total_paths:
+    st.error("연령별 인구현황 CSV(남녀구분, 남녀합계)를 찾을 수 없습니다.")
+    st.stop()
+if not available_levels:
+    st.info("경계 파일이 없습니다. " + ", ".join(BOUNDARY_FILES.values()) + " 중 하나 이상을 추가해 주세요.")
+    st.stop()
+
+store = PopulationStore()
+store.sync(mf_paths + total_paths)
+latest_month = store.months("남녀구분")[-1]
+
+@st.cache_resource(max_entries=len(BOUNDARY_FILES), show_spinner="경계 데이터를 준비하는 중...")
+def load_boundaries(path, mtime):
+    """줌 단계별로 단순화된 경계를 불러옵니다 (원본이 바뀌면 다시 만듦)."""
+    return BoundaryLayers.from_geojson(path)
+
+# 인구 데이터는 population_data.load_dataset이 프로세스에 하나만 들고 있어 01 페이지와 같은 객체를 씀
+with st.spinner("인구 데이터를 불러오는 중..."):
+    dataset = load_dataset(store, latest_month)
+index = dataset.index
+
+col_level, col_sido, col_metric = st.columns(3)
+with col_level:
+    level = st.radio("행정구역 단위", available_levels, format_func=LEVEL_NAMES.get, horizontal=True)
+with col_sido:
+    # 읍면동은 전국을 한 번에 그리면 너무 무거우므로 시도를 꼭 고르도록 함
+    sido_options = index.children() if level == LEVEL_EMD else [None] + index.children()
+    sido = st.selectbox("시도 범위", sido_options, format_func=lambda c: "전국" if c is None else index.short_name(c))
+with col_metric:
+    metric = st.selectbox("지표", METRICS)
+
+boundary_path = BOUNDARY_FILES[level]
+layers = load_boundaries(boundary_path, os.path.getmtime(boundary_path))
+
+mask = (index.level == level) & (dataset.indicators["총인구"].to_numpy() > 0)
+if sido is not None:
+    mask &= index.codes // 10**8 == sido // 10**8
+rows = mask.nonzero()[0]
+values = dataset.indicators[metric].to_numpy()[rows]
+codes = index.codes[rows].tolist()
+properties = {code: {"name": index.names[row], "value": round(float(value), 1)}
+              for code, row, value in zip(codes, rows.tolist(), values)}
+
+# 범위나 지표를 바꾸면 지도 위치를 새로 맞추고, 그 외에는 사용자가 움직인 위치/줌을 유지
+view_key = (level, sido)
+if st.session_state.get("choropleth_view_key") != view_key:
+    st.session_state.choropleth_view_key = view_key
+    st.session_state.choropleth_zoom = DEFAULT_ZOOM if sido is None else DEFAULT_ZOOM + 2
+    st.session_state.choropleth_center = None
+zoom = st.session_state.choropleth_zoom
+
+# 현재 줌 단계의 단순화된 경계에서 선택한 지역만 GeoJSON으로 만들어 보냄
+geojson = layers.feature_collection(zoom, codes, properties)
+bounds = layers.bounds(codes)
+if not geojson["features"] or bounds is None:
+    st.warning("선택한 범위에 경계와 인구 데이터가 모두 있는 지역이 없습니다.")
+    st.stop()
+
+center = st.session_state.choropleth_center or [(bounds[0][0] + bounds[1][0]) / 2, (bounds[0][1] + bounds[1][1]) / 2]
+m = folium.Map(location=center, zoom_start=zoom)
+choropleth = folium.Choropleth(
+    geo_data=geojson,
+    data=dict(zip(map(str, codes), values.tolist())),
+    key_on="feature.properties.code",
+    fill_color="YlOrRd",
+    fill_opacity=0.7,
+    line_weight=0.5,
+    legend_name=metric,
+    nan_fill_color="lightgray",
+)
+# 툴팁은 단계구분도의 GeoJSON 층에 바로 붙임 (같은 경계를 두 번 보내지 않도록)
+folium.GeoJsonTooltip(fields=["name", "value"], aliases=["지역", metric]).add_to(choropleth.geojson)
+choropleth.add_to(m)
+
+map_state = st_folium(m, height=650, use_container_width=True, returned_objects=["zoom", "center"],
+                      key="choropleth_map")
+
+# 줌이 바뀌어 쓸 단순화 단계가 달라지면 그 단계의 경계로 다시 그림
+if map_state and map_state.get("zoom"):
+    new_zoom = int(map_state["zoom"])
+    if pick_zoom_level(new_zoom) != pick_zoom_level(zoom):
+        st.session_state.choropleth_zoom = new_zoom
+        st.session_state.choropleth_center = [map_state["center"]["lat"], map_state["center"]["lng"]]
+        st.rerun()
+
+st.caption(f"{LEVEL_NAMES[level]} {len(geojson['features'])}곳 · 경계 단순화 단계: 줌 {pick_zoom_level(zoom)}")
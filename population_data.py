@@ -0,0 +1,675 @@
+"""행정안전부 연령별 인구현황 CSV를 빠르게 불러오기 위한 데이터 유틸리티.
+
+PopulationStore가 CSV를 조각 단위로 읽어 int32 컬럼으로 정리한 뒤 달별 Arrow IPC 파티션
+(.cache/population/store-v*/{종류}/month=YYYYMM/part-{해시}.arrow)에 나눠 저장하고,
+이후에는 필요한 달의 파티션만 메모리 맵으로 열어 바로 사용합니다.
+새 달 파일이나 바뀐 파일만 다시 넣으며, 한 달 치 배열/지역 인덱스/누적합은 load_dataset()이 프로세스에 하나만 만들어 둡니다.
+"""
+import codecs
+import csv
+import glob
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+import pyarrow.dataset as ds
+
+# 캐시 파일 저장 위치 (저장소 루트의 .cache/population)
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "population")
+CSV_ENCODING = "cp949"
+REGION_COL = "행정구역"
+CODE_COL = "행정구역코드"
+NAME_COL = "행정구역명"
+# CSV를 조각으로 읽을 때 조각 하나의 크기 (바이트)
+CSV_BLOCK_SIZE = 4 << 20
+# 캐시 파일 형식이 바뀌면 올려서 예전 캐시를 무효화
+CACHE_VERSION = 3
+
+# 행정구역코드 단계 (시도 2자리 + 시군구 3자리 + 읍면동 3자리 + 00)
+LEVEL_SIDO, LEVEL_SIGUNGU, LEVEL_EMD = 1, 2, 3
+
+
+def file_hash(path, chunk_size=1 << 20):
+    """파일 내용의 SHA-256 해시를 반환합니다."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_header(path):
+    """CSV 첫 줄(컬럼 이름)만 읽어 앞뒤 공백을 정리해 반환합니다."""
+    with open(path, encoding=CSV_ENCODING, newline="") as f:
+        return [col.strip() for col in next(csv.reader(f))]
+
+
+def normalize_batch(batch, columns):
+    """CSV에서 읽은 문자열 조각을 정리된 Arrow Table로 바꿉니다.
+
+    행정구역은 이름과 10자리 코드로 나누고, 인구 수 컬럼은 모두 이어 붙여
+    콤마 제거와 int32 변환을 한 번에 처리한 뒤 컬럼별로 다시 잘라 냅니다 (복사 없음).
+    """
+    n_rows = batch.num_rows
+    region = batch.column(0)
+
+    # "서울특별시 종로구 (1111000000)" → 이름과 10자리 코드로 분리 (적재할 때 한 번만)
+    parts = pc.extract_regex(region, r"^(?P<name>.*?)\s*\((?P<code>\d{10})\)\s*$")
+    codes = pc.cast(pc.struct_field(parts, "code"), pa.int64())
+    names = pc.utf8_trim_whitespace(pc.struct_field(parts, "name"))
+
+    counts = pc.cast(pc.replace_substring(pa.concat_arrays(batch.columns[1:]), ",", ""), pa.int32())
+    count_arrays = [counts.slice(i * n_rows, n_rows) for i in range(batch.num_columns - 1)]
+    return pa.Table.from_arrays([region, codes, names] + count_arrays,
+                                names=[REGION_COL, CODE_COL, NAME_COL] + columns[1:])
+
+
+def iter_csv_blocks(path, block_size):
+    """CSV 본문(헤더 제외)을 줄 경계에서 끊은 약 block_size 바이트 조각으로 읽어 UTF-8로 돌려줍니다.
+
+    cp949는 증분 디코더로 조각마다 변환하므로 파일 전체를 한 번에 디코딩하지 않습니다.
+    (cp949의 두 번째 바이트는 0x41 이상이라 줄바꿈 바이트와 겹치지 않습니다.)
+    """
+    decoder = codecs.getincrementaldecoder(CSV_ENCODING)()
+    with open(path, "rb") as f:
+        f.readline()
+        rest = b""
+        while True:
+            raw = f.read(block_size)
+            if not raw:
+                break
+            data = rest + raw
+            cut = data.rfind(b"\n") + 1
+            rest = data[cut:]
+            if cut:
+                yield decoder.decode(data[:cut]).encode("utf-8")
+        tail = decoder.decode(rest, final=True)
+        if tail.strip():
+            yield tail.encode("utf-8")
+
+
+def iter_population_csv(path, block_size=None):
+    """CSV를 block_size 바이트 단위 조각으로 읽어 정리된 Arrow Table 조각을 차례로 돌려줍니다.
+
+    조각마다 따로 파싱하고 버리므로 파일 크기와 상관없이
+    한 번에 메모리에 올라가는 양은 조각 하나 분량으로 제한됩니다.
+    """
+    columns = read_header(path)
+    # 1,000 미만 값은 따옴표/콤마가 없어서 조각마다 타입 추론이 달라질 수 있으므로 모두 문자열로 읽음
+    convert_options = pacsv.ConvertOptions(column_types={col: pa.string() for col in columns})
+    for block in iter_csv_blocks(path, block_size or CSV_BLOCK_SIZE):
+        read_options = pacsv.ReadOptions(column_names=columns, block_size=len(block) + 1)
+        table = pacsv.read_csv(pa.BufferReader(block), read_options=read_options, convert_options=convert_options)
+        for batch in table.to_batches():
+            yield normalize_batch(batch, columns)
+
+
+def read_population_csv(path):
+    """원본 CSV 전체를 읽어 정리된 DataFrame으로 반환합니다 (인구 수 컬럼은 int32)."""
+    return pa.concat_tables(iter_population_csv(path)).to_pandas()
+
+
+def age_columns(columns, sex):
+    """특정 성별(남/여/계)의 0세~100세 이상 컬럼 이름 목록을 반환합니다."""
+    return [col for col in columns if "세" in col and col.split("_")[-2:-1] == [sex]]
+
+
+def age_labels(columns):
+    """연령 컬럼 이름에서 '0세', '1세', ... 같은 레이블만 뽑아 반환합니다."""
+    return [col.split("_")[-1] for col in columns]
+
+
+def age_matrix(df, sexes=("남", "여")):
+    """인구 수를 (지역 × 연령 × 성별) 모양의 연속된 int32 배열로 반환합니다.
+
+    남녀구분 파일은 sexes=("남", "여"), 남녀합계 파일은 sexes=("계",)로 호출합니다.
+    """
+    cols = [col for sex in sexes for col in age_columns(df.columns, sex)]
+    n_ages = len(cols) // len(sexes)
+    flat = df[cols].to_numpy(dtype=np.int32)
+    return np.ascontiguousarray(flat.reshape(len(df), len(sexes), n_ages).transpose(0, 2, 1))
+
+
+class RegionIndex:
+    """행정구역코드로 시도/시군구/읍면동 계층을 찾는 인덱스입니다.
+
+    데이터를 불러온 뒤 한 번만 만들어 두면 코드 → 행 번호, 상위/하위 지역 조회가
+    모두 dict/배열 조회로 끝나므로 선택할 때마다 문자열을 스캔할 필요가 없습니다.
+    """
+
+    def __init__(self, codes, names):
+        self.codes = np.asarray(codes, dtype=np.int64)
+        self.names = list(names)
+        self.level = np.where(self.codes % 10**8 == 0, LEVEL_SIDO,
+                              np.where(self.codes % 10**5 == 0, LEVEL_SIGUNGU, LEVEL_EMD)).astype(np.int8)
+        self.row_of = {int(code): i for i, code in enumerate(self.codes)}
+
+        # 상위 지역: 읍면동 → (일반구 →) 시군구 → 시도 순서로 존재하는 코드를 찾음
+        # 끝자리만 0으로 바꾼 코드(10**6 단위)는 일반구의 상위 시일 때만 받아들임. 증평군(4374500000)과
+        # 영동군(4374000000)처럼 우연히 앞자리가 같은 이웃 시군구를 상위로 잡지 않도록, 후보가 '시'이고
+        # 후보의 전체 이름이 이 지역 이름의 앞부분일 때만 씀
+        self.parent = np.full(len(self.codes), -1, dtype=np.int32)
+        self.child_rows = {-1: []}
+        for i, code in enumerate(self.codes.tolist()):
+            for candidate, city_only in ((code // 10**5 * 10**5, False), (code // 10**6 * 10**6, True),
+                                         (code // 10**8 * 10**8, False)):
+                if candidate == code or candidate not in self.row_of:
+                    continue
+                if city_only and not self._is_city_of(candidate, i):
+                    continue
+                self.parent[i] = self.row_of[candidate]
+                break
+            self.child_rows.setdefault(int(self.parent[i]), []).append(i)
+
+        # 깊이 우선 순서로 행을 나열하면 어떤 지역의 하위 지역 전체가 연속 구간이 됨
+        # span_start/span_end는 그 구간의 위치 (자기 자신 포함)
+        n = len(self.codes)
+        self.order = np.empty(n, dtype=np.int32)
+        self.span_start = np.empty(n, dtype=np.int32)
+        self.span_end = np.empty(n, dtype=np.int32)
+        self.is_leaf = np.array([i not in self.child_rows for i in range(n)])
+        pos = 0
+        stack = [(i, False) for i in reversed(self.child_rows[-1])]
+        while stack:
+            i, done = stack.pop()
+            if done:
+                self.span_end[i] = pos
+                continue
+            self.order[pos] = i
+            self.span_start[i] = pos
+            pos += 1
+            stack.append((i, True))
+            stack.extend((child, False) for child in reversed(self.child_rows.get(i, [])))
+
+    def _is_city_of(self, candidate, row):
+        """candidate가 '시'이고 그 전체 이름이 row 지역 이름의 앞부분이면 True (일반구의 상위 시)."""
+        city_name = self.names[self.row_of[candidate]]
+        return city_name.endswith("시") and self.names[row].startswith(city_name + " ")
+
+    @classmethod
+    def from_frame(cls, df):
+        """PopulationStore.load_month()나 read_population_csv()로 불러온 DataFrame에서 인덱스를 만듭니다."""
+        return cls(df[CODE_COL].to_numpy(), df[NAME_COL].tolist())
+
+    def row(self, code):
+        """행정구역코드에 해당하는 행 번호를 반환합니다. 없으면 None."""
+        return self.row_of.get(int(code))
+
+    def children(self, code=None):
+        """바로 아래 단계의 지역 코드 목록을 반환합니다. code가 None이면 시도 목록입니다."""
+        parent_row = -1 if code is None else self.row_of[int(code)]
+        return [int(self.codes[i]) for i in self.child_rows.get(parent_row, [])]
+
+    def label(self, code):
+        """'서울특별시 중구'처럼 상위 지역까지 포함한 전체 이름을 반환합니다."""
+        return self.names[self.row_of[int(code)]]
+
+    def short_name(self, code):
+        """'중구'처럼 마지막 단계 이름만 반환합니다."""
+        return self.label(code).split()[-1]
+
+    def spans(self, codes):
+        """지역 코드들의 깊이 우선 순서 구간 (시작, 끝) 배열을 반환합니다."""
+        rows = np.array([self.row_of[int(code)] for code in codes], dtype=np.int64)
+        return self.span_start[rows], self.span_end[rows]
+
+
+def leaf_prefix_sums(index, ages):
+    """말단 지역(읍면동 등) 인구를 깊이 우선 순서로 누적한 배열을 반환합니다.
+
+    결과의 첫 축 길이는 행 수 + 1이며, 어떤 지역의 말단 합계는
+    prefix[span_end] - prefix[span_start] 한 번의 뺄셈으로 구할 수 있습니다.
+    """
+    leaf_ages = ages[index.order].astype(np.int64)
+    leaf_ages[~index.is_leaf[index.order]] = 0
+    prefix = np.zeros((len(leaf_ages) + 1,) + ages.shape[1:], dtype=np.int64)
+    np.cumsum(leaf_ages, axis=0, out=prefix[1:])
+    return prefix
+
+
+def aggregate_regions(index, prefix, codes):
+    """지역별로 하위 말단 지역 인구를 합산해 (지역 수 × 연령 × 성별) 배열로 반환합니다."""
+    starts, ends = index.spans(codes)
+    return prefix[ends] - prefix[starts]
+
+
+def aggregate_union(index, prefix, codes):
+    """여러 지역을 하나로 합친 인구 (연령 × 성별)를 반환합니다. 겹치는 지역은 한 번만 더합니다."""
+    starts, ends = index.spans(codes)
+    sort = np.argsort(starts, kind="stable")
+    starts, ends = starts[sort], ends[sort]
+    # 앞 구간에 포함되는 구간(상위 지역을 이미 고른 경우)은 제외
+    keep = ends > np.concatenate(([-1], np.maximum.accumulate(ends)[:-1]))
+    return (prefix[ends[keep]] - prefix[starts[keep]]).sum(axis=0)
+
+
+# 인구 지표 계산에 쓰는 연령 구간 (생산가능인구 15~64세 기준)
+YOUNG_AGES = (0, 15)
+WORKING_AGES = (15, 65)
+OLD_AGES = (65, None)
+
+
+class AgeRollup:
+    """연령 축 누적합으로 임의의 연령 구간 인구를 모든 지역에 대해 한 번에 구합니다.
+
+    ages는 (지역 × 연령 × 성별) 배열이며, 연령 축의 마지막 칸은 '100세 이상'입니다.
+    누적합을 한 번 만들어 두면 어떤 연령 구간이든 지역마다 뺄셈 한 번으로 계산됩니다.
+    """
+
+    def __init__(self, ages):
+        self.n_ages = ages.shape[1]
+        self.cum = np.zeros((ages.shape[0], self.n_ages + 1) + ages.shape[2:], dtype=np.int64)
+        np.cumsum(ages, axis=1, out=self.cum[:, 1:])
+
+    def range_sum(self, lo, hi=None, rows=None):
+        """[lo, hi) 세 인구 합계를 (지역 × 성별)로 반환합니다. hi가 None이면 끝까지."""
+        cum = self.cum if rows is None else self.cum[rows]
+        hi = self.n_ages if hi is None else min(hi, self.n_ages)
+        return cum[:, hi] - cum[:, lo]
+
+    def bucket_edges(self, width):
+        """width세 단위 구간 경계를 반환합니다. '100세 이상'은 항상 별도 구간입니다."""
+        last = self.n_ages - 1
+        return np.concatenate((np.arange(0, last, width), [last, self.n_ages]))
+
+    def bucket_labels(self, width):
+        """'0-4세', '5-9세', ..., '100세 이상' 같은 구간 이름을 반환합니다."""
+        edges = self.bucket_edges(width).tolist()
+        labels = [f"{lo}세" if hi - lo == 1 else f"{lo}-{hi - 1}세" for lo, hi in zip(edges[:-2], edges[1:-1])]
+        return labels + [f"{edges[-2]}세 이상"]
+
+    def buckets(self, width, rows=None):
+        """width세 단위로 묶은 인구를 (지역 × 구간 × 성별) 배열로 반환합니다."""
+        cum = self.cum if rows is None else self.cum[rows]
+        edges = self.bucket_edges(width)
+        return cum[:, edges[1:]] - cum[:, edges[:-1]]
+
+    def indicators(self):
+        """모든 지역의 연령 구조 지표를 DataFrame으로 반환합니다 (행 순서는 원본과 동일)."""
+        young = self.range_sum(*YOUNG_AGES).reshape(len(self.cum), -1).sum(axis=1)
+        working = self.range_sum(*WORKING_AGES).reshape(len(self.cum), -1).sum(axis=1)
+        old = self.range_sum(*OLD_AGES).reshape(len(self.cum), -1).sum(axis=1)
+        total = young + working + old
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return pd.DataFrame({
+                "총인구": total,
+                "유소년인구(0-14세)": young,
+                "생산가능인구(15-64세)": working,
+                "고령인구(65세 이상)": old,
+                "고령인구비율(%)": np.where(total > 0, old / total * 100, np.nan),
+                "유소년부양비": np.where(working > 0, young / working * 100, np.nan),
+                "노년부양비": np.where(working > 0, old / working * 100, np.nan),
+                "총부양비": np.where(working > 0, (young + old) / working * 100, np.nan),
+                "노령화지수": np.where(young > 0, old / young * 100, np.nan),
+            })
+
+
+def join_rows(codes, other_codes):
+    """codes의 각 행이 other_codes의 몇 번째 행인지 반환합니다 (없으면 -1).
+
+    두 파일의 행 순서가 달라도 행정구역코드 기준으로 한 번에 맞춥니다 (정렬 + 이진 탐색).
+    """
+    codes = np.asarray(codes)
+    other_codes = np.asarray(other_codes)
+    if len(other_codes) == 0:
+        return np.full(len(codes), -1)
+    order = np.argsort(other_codes, kind="stable")
+    pos = np.searchsorted(other_codes[order], codes).clip(max=len(other_codes) - 1)
+    return np.where(other_codes[order[pos]] == codes, order[pos], -1)
+
+
+def check_sex_totals(mf_df, total_df):
+    """남녀구분 파일의 남 + 여가 남녀합계 파일의 계와 같은지 행정구역코드 기준으로 확인합니다.
+
+    반환값의 derivable이 True이면 남녀합계의 모든 지역이 남녀구분에 있고 값도 모두 같으므로
+    남녀합계 파일 없이 남 + 여로 계산해도 됩니다.
+    """
+    total_rows = join_rows(mf_df[CODE_COL].to_numpy(), total_df[CODE_COL].to_numpy())
+    matched = total_rows >= 0
+
+    mf_sum = age_matrix(mf_df, ("남", "여")).sum(axis=2)[matched]
+    total = age_matrix(total_df, ("계",))[total_rows[matched], :, 0]
+    row_ok = (mf_sum == total).all(axis=1)
+    if {"남_총인구수", "여_총인구수", "계_총인구수"} <= set(mf_df.columns) | set(total_df.columns):
+        mf_headcount = mf_df["남_총인구수"].to_numpy(np.int64) + mf_df["여_총인구수"].to_numpy(np.int64)
+        row_ok &= mf_headcount[matched] == total_df["계_총인구수"].to_numpy(np.int64)[total_rows[matched]]
+
+    missing = np.ones(len(total_df), dtype=bool)
+    missing[total_rows[matched]] = False
+    mismatched_codes = mf_df[CODE_COL].to_numpy()[matched][~row_ok]
+    missing_codes = total_df[CODE_COL].to_numpy()[missing]
+    return {
+        "total_rows": total_rows,
+        "mismatched_codes": mismatched_codes.tolist(),
+        "missing_codes": missing_codes.tolist(),
+        "derivable": len(mismatched_codes) == 0 and len(missing_codes) == 0,
+    }
+
+
+class ArrowChunkWriter:
+    """DataFrame 조각을 받아 Arrow IPC 파일 하나에 이어 씁니다.
+
+    다른 세션이 쓰는 도중의 파일을 읽지 않도록 임시 파일에 쓰고, close()할 때 원래 이름으로 교체합니다.
+    임시 파일 이름에는 프로세스와 스레드 번호가 들어가므로 같은 파일을 여러 곳에서 동시에 써도 겹치지 않습니다.
+    with 문 안에서 오류가 나면 임시 파일은 지웁니다.
+    """
+
+    def __init__(self, target):
+        self.target = target
+        self.tmp_path = tmp_path_for(target)
+        self.schema = None
+        self._sink = None
+        self._writer = None
+
+    def write(self, table):
+        """Arrow Table 조각 하나를 이어 씁니다."""
+        if self._writer is None:
+            os.makedirs(os.path.dirname(self.target), exist_ok=True)
+            self.schema = table.schema
+            self._sink = pa.OSFile(self.tmp_path, "wb")
+            self._writer = pa.ipc.new_file(self._sink, self.schema)
+        self._writer.write_table(table)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._sink.close()
+            os.replace(self.tmp_path, self.target)
+
+    def abort(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._sink.close()
+            os.remove(self.tmp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def tmp_path_for(target):
+    """target을 쓰는 동안 쓸 임시 파일 경로 (프로세스 + 스레드마다 다름; Streamlit 세션은 같은 프로세스의 스레드)."""
+    return f"{target}.{os.getpid()}-{threading.get_ident()}.tmp"
+
+
+def read_cached_table(cache_path):
+    """Arrow 캐시 파일을 메모리 맵으로 열어 Table로 반환합니다."""
+    with pa.memory_map(cache_path, "r") as source:
+        return pa.ipc.open_file(source).read_all()
+
+
+# --- 월별 시계열 저장소 ---
+MONTH_COL_PATTERN = re.compile(r"^(\d{4})년(\d{2})월_(.+)$")
+STORE_DIR = os.path.join(CACHE_DIR, f"store-v{CACHE_VERSION}")
+# 여러 세션(스레드)이 처음 캐시를 만들 때 같은 CSV를 동시에 넣지 않도록 프로세스 전체에서 함께 쓰는 잠금
+_sync_lock = threading.Lock()
+
+
+def dataset_kind(path):
+    """파일 이름에서 데이터 종류('남녀구분' 또는 '남녀합계')를 알아냅니다."""
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return stem.rsplit("_", 1)[-1]
+
+
+def split_months(table):
+    """'2025년04월_남_0세' 형식의 컬럼을 월별로 나눠 {202504: Arrow Table} 형태로 반환합니다.
+
+    월별 Table의 컬럼은 '남_0세'처럼 월 접두어를 뗀 이름이라 달이 바뀌어도 스키마가 같습니다.
+    여러 달을 한 번에 내려받은 파일도 그대로 처리됩니다.
+    """
+    by_month = {}
+    for pos, col in enumerate(table.column_names):
+        match = MONTH_COL_PATTERN.match(col)
+        if match:
+            month = int(match.group(1) + match.group(2))
+            by_month.setdefault(month, []).append((pos, match.group(3)))
+
+    key_positions = [table.schema.get_field_index(CODE_COL), table.schema.get_field_index(NAME_COL)]
+    return {
+        month: table.select(key_positions + [pos for pos, _ in cols])
+                    .rename_columns([CODE_COL, NAME_COL] + [name for _, name in cols])
+        for month, cols in sorted(by_month.items())
+    }
+
+
+class PopulationStore:
+    """월별로 파티션을 나눈 인구 데이터 저장소입니다.
+
+    {root}/{종류}/month=YYYYMM/part-{해시}.arrow 구조로 저장하므로
+    새 달 파일이 오면 그 달 파티션만 추가되고, 조회할 때는 필요한 달과 컬럼만 읽습니다.
+    """
+
+    def __init__(self, root=STORE_DIR):
+        self.root = root
+        self.manifest_path = os.path.join(root, "_ingested.json")
+
+    def _read_manifest(self):
+        try:
+            with open(self.manifest_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_manifest(self, manifest):
+        os.makedirs(self.root, exist_ok=True)
+        tmp_path = tmp_path_for(self.manifest_path)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.manifest_path)
+
+    def partition_dir(self, kind, month):
+        return os.path.join(self.root, kind, f"month={month}")
+
+    def append_csv(self, path, block_size=None):
+        """CSV 한 개를 조각 단위로 읽어 들어 있는 모든 달을 저장소에 추가하고, 추가된 달 목록을 반환합니다.
+
+        달마다 파티션 파일을 열어 두고 조각이 올 때마다 이어 쓰므로
+        여러 해에 걸친 큰 파일도 메모리 사용량이 조각 크기 이상으로 늘지 않습니다.
+        같은 달의 예전 파티션 파일은 새 파일로 교체됩니다.
+        """
+        digest = file_hash(path)
+        kind = dataset_kind(path)
+        writers = {}
+        try:
+            for chunk in iter_population_csv(path, block_size):
+                for month, month_table in split_months(chunk).items():
+                    if month not in writers:
+                        target = os.path.join(self.partition_dir(kind, month), f"part-{digest[:16]}.arrow")
+                        writers[month] = ArrowChunkWriter(target)
+                    writers[month].write(month_table)
+        except Exception:
+            for writer in writers.values():
+                writer.abort()
+            raise
+
+        for month, writer in writers.items():
+            writer.close()
+            for old in glob.glob(os.path.join(self.partition_dir(kind, month), "part-*.arrow")):
+                if old != writer.target:
+                    os.remove(old)
+        return sorted(writers)
+
+    def sync(self, paths):
+        """아직 저장소에 들어가지 않았거나 바뀐 CSV만 추가합니다 (크기/수정 시각으로 먼저 확인).
+
+        한 번에 한 스레드만 넣으며, 기다린 스레드는 먼저 넣은 결과를 보고 건너뜁니다.
+        """
+        with _sync_lock:
+            manifest = self._read_manifest()
+            changed = False
+            for path in paths:
+                stat = os.stat(path)
+                key = os.path.abspath(path)
+                entry = manifest.get(key)
+                if entry and entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime:
+                    continue
+                manifest[key] = {"size": stat.st_size, "mtime": stat.st_mtime, "months": self.append_csv(path)}
+                changed = True
+            if changed:
+                self._write_manifest(manifest)
+
+    def months(self, kind):
+        """저장소에 있는 달 목록을 오름차순으로 반환합니다."""
+        parts = glob.glob(os.path.join(self.root, kind, "month=*", "part-*.arrow"))
+        return sorted({int(os.path.basename(os.path.dirname(p)).split("=", 1)[1]) for p in parts})
+
+    def version(self, kind):
+        """저장소 내용이 바뀌면 달라지는 문자열 (그림 캐시 키용)을 반환합니다."""
+        parts = glob.glob(os.path.join(self.root, kind, "month=*", "part-*.arrow"))
+        return "|".join(sorted(os.path.relpath(p, self.root) for p in parts))
+
+    def _part_path(self, kind, month):
+        return sorted(glob.glob(os.path.join(self.partition_dir(kind, month), "part-*.arrow")))[-1]
+
+    def data_key(self, kind, month):
+        """한 달 치 파티션을 가리키는 캐시 키 ('종류/달/파일 이름')를 반환합니다 (파일을 열지 않음)."""
+        return f"{kind}/{month}/{os.path.basename(self._part_path(kind, month))}"
+
+    def load_month(self, kind, month):
+        """한 달 치 파티션을 메모리 맵으로 열어 DataFrame으로 반환합니다."""
+        part_path = self._part_path(kind, month)
+        df = read_cached_table(part_path).to_pandas()
+        df.attrs["data_key"] = f"{kind}/{month}/{os.path.basename(part_path)}"
+        return df
+
+    def read(self, kind, columns, codes=None, months=None):
+        """여러 달에 걸쳐 필요한 컬럼만 읽어 month 컬럼이 붙은 DataFrame으로 반환합니다.
+
+        codes/months 조건은 파티션과 행 필터로 넘어가므로 해당하지 않는 달은 열지 않습니다.
+        """
+        dataset = ds.dataset(os.path.join(self.root, kind), format="ipc", partitioning="hive")
+        condition = None
+        if months is not None:
+            condition = ds.field("month").isin(list(months))
+        if codes is not None:
+            code_condition = ds.field(CODE_COL).isin([int(c) for c in codes])
+            condition = code_condition if condition is None else condition & code_condition
+        table = dataset.to_table(columns=["month", CODE_COL, *columns], filter=condition)
+        return table.to_pandas().sort_values(["month", CODE_COL], ignore_index=True)
+
+    def region_series(self, kind, code, sexes=("남", "여"), months=None):
+        """한 지역의 월별 연령 인구를 (달 목록, (달 × 연령 × 성별) 배열)로 반환합니다."""
+        schema = ds.dataset(os.path.join(self.root, kind), format="ipc", partitioning="hive").schema
+        columns = [col for sex in sexes for col in age_columns(schema.names, sex)]
+        df = self.read(kind, columns, codes=[code], months=months)
+        return df["month"].tolist(), age_matrix(df, sexes)
+
+
+class PopulationDataset:
+    """한 달 치 인구 데이터를 화면에서 바로 쓰는 형태(배열, 지역 인덱스, 누적합, 지표)로 모은 객체입니다.
+
+    서버 프로세스마다 하나만 만들어 모든 세션이 함께 읽도록 하려는 것이라 (st.cache_resource)
+    원본 DataFrame은 배열로 바꾼 뒤 버리고, 배열은 읽기 전용으로 잠가 세션끼리 서로 바꾸지 못하게 합니다.
+    """
+
+    def __init__(self, store, month):
+        self.month = month
+        mf_df = store.load_month("남녀구분", month)
+        self.data_key = mf_df.attrs["data_key"]
+        self.ages = age_matrix(mf_df, ("남", "여"))
+        self.index = RegionIndex.from_frame(mf_df)
+        self.prefix = leaf_prefix_sums(self.index, self.ages)
+        self.rollup = AgeRollup(self.ages)
+        self.indicators = self.rollup.indicators()
+
+        # 남녀합계가 남 + 여와 같으면 남녀합계 파일은 들고 있지 않고 남녀구분 데이터를 함께 씀
+        total_months = store.months("남녀합계")
+        self.sex_check = None
+        if month in total_months:
+            self.sex_check = check_sex_totals(mf_df, store.load_month("남녀합계", month))
+        if self.sex_check is not None and self.sex_check["derivable"]:
+            self.total_data_key = self.data_key
+            self.total_index = self.index
+            self.total_rollup = self.rollup
+        else:
+            total_df = store.load_month("남녀합계", total_months[-1])
+            self.total_data_key = total_df.attrs["data_key"]
+            self.total_index = RegionIndex.from_frame(total_df)
+            self.total_rollup = AgeRollup(age_matrix(total_df, ("계",)))
+
+        for array in (self.ages, self.prefix, self.rollup.cum, self.total_rollup.cum):
+            array.flags.writeable = False
+        for index in (self.index, self.total_index):
+            for array in (index.codes, index.level, index.parent, index.order, index.span_start, index.span_end):
+                array.flags.writeable = False
+
+
+# 서버 프로세스 안에서 함께 쓰는 데이터셋 수 (달이 바뀌면 예전 달은 내려감)
+DATASET_CACHE_SIZE = 2
+_datasets = OrderedDict()
+_datasets_lock = threading.Lock()
+
+
+def load_dataset(store, month):
+    """한 달 치 PopulationDataset을 프로세스에 하나만 만들어 모든 페이지와 세션이 같은 객체를 씁니다.
+
+    남녀구분 파티션이나 남녀합계 저장소가 바뀌면 키가 달라져 새로 만들고, 최근 DATASET_CACHE_SIZE개만 남깁니다.
+    """
+    key = (os.path.abspath(store.root), month, store.data_key("남녀구분", month), store.version("남녀합계"))
+    with _datasets_lock:
+        if key in _datasets:
+            _datasets.move_to_end(key)
+            return _datasets[key]
+        dataset = PopulationDataset(store, month)
+        _datasets[key] = dataset
+        while len(_datasets) > DATASET_CACHE_SIZE:
+            _datasets.popitem(last=False)
+        return dataset
+
+
+# --- 벤치마크 ---
+def _clean_numeric_loop(df, cols):
+    """예전 페이지에서 쓰던 컬럼별 문자열 치환 방식 (벤치마크 비교용)."""
+    for col in cols:
+        if not pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = df[col].str.replace(",", "").astype(int)
+    return df
+
+
+def benchmark_parsers(path, repeat=5):
+    """컬럼별 루프 방식과 일괄 파서의 파싱 시간(초, 최솟값)을 비교합니다."""
+    sexes = ("계",) if "합계" in os.path.basename(path) else ("남", "여")
+
+    def loop_parser():
+        df = pd.read_csv(path, encoding=CSV_ENCODING)
+        df.columns = df.columns.str.strip()
+        cols = [col for col in df.columns if "세" in col]
+        return _clean_numeric_loop(df, cols)
+
+    def bulk_parser():
+        return age_matrix(read_population_csv(path), sexes)
+
+    timings = {}
+    for name, fn in (("loop", loop_parser), ("bulk", bulk_parser)):
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - start)
+        timings[name] = best
+    return timings
+
+
+if __name__ == "__main__":
+    # 사용법: python population_data.py [CSV 경로 ...]
+    paths = sys.argv[1:] or sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), "*연령별인구현황*.csv")))
+    for csv_path in paths:
+        result = benchmark_parsers(csv_path)
+        print(f"{os.path.basename(csv_path)}: loop {result['loop'] * 1000:.1f} ms, "
+              f"bulk {result['bulk'] * 1000:.1f} ms ({result['loop'] / result['bulk']:.1f}x)")
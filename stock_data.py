@@ -0,0 +1,1001 @@
+"""주가(OHLCV) 데이터를 종목별 SQLite 파일에 저장해 두고, 없는 기간만 새로 받아오는 유틸리티.
+
+처음 조회할 때만 Yahoo Finance에서 받아 .cache/stocks/{종목}.sqlite에 저장하고,
+이후에는 마지막으로 받아 둔 날짜 이후 구간만 추가로 받습니다. 이미 받은 구간은 디스크에서 바로 읽습니다.
+STOCK_FIXTURE_DIR 환경 변수를 지정하면 Yahoo Finance 대신 녹화된 CSV를 재생하므로 오프라인에서도 동작합니다.
+"""
+import asyncio
+import bisect
+import datetime as dt
+import difflib
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# 캐시 파일 저장 위치 (저장소 루트의 .cache/stocks)
+STORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "stocks")
+# 설정하면 녹화된 CSV({종목}.csv)를 재생하는 FixtureProvider를 씀
+FIXTURE_DIR_ENV = "STOCK_FIXTURE_DIR"
+OHLCV_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+# 최근 봉을 다시 확인하기까지의 시간 (초). 지난 봉은 바뀌지 않으므로 다시 받지 않음
+REFRESH_SECONDS = 3600
+# 그날 봉이 확정되는 시각 (UTC). 가장 늦게 끝나는 미국 장(16:00 ET = 21:00 UTC)보다 조금 뒤로 잡음
+SESSION_CLOSE_UTC = dt.time(22, 0)
+# 미리 불러오기에서 동시에 받을 최대 종목 수 (Yahoo Finance 요청 제한 고려)
+PREFETCH_WORKERS = 4
+# yfinance period 문자열 → 시작일 계산용 기간
+PERIODS = {
+    "1mo": pd.DateOffset(months=1),
+    "3mo": pd.DateOffset(months=3),
+    "6mo": pd.DateOffset(months=6),
+    "1y": pd.DateOffset(years=1),
+    "2y": pd.DateOffset(years=2),
+    "5y": pd.DateOffset(years=5),
+    "10y": pd.DateOffset(years=10),
+}
+
+
+def period_start(period, today=None):
+    """'3mo', '1y' 같은 기간 문자열을 시작 날짜로 바꿉니다."""
+    today = today or dt.date.today()
+    return (pd.Timestamp(today) - PERIODS[period]).date()
+
+
+def empty_bars():
+    """컬럼만 있는 빈 OHLCV DataFrame을 반환합니다."""
+    return pd.DataFrame(columns=OHLCV_COLUMNS, index=pd.DatetimeIndex([], name="Date"), dtype="float64")
+
+
+def clean_bars(df):
+    """제공자가 준 DataFrame을 날짜(시간대 없음) 인덱스 + OHLCV 컬럼 형태로 맞춥니다."""
+    if df is None or df.empty:
+        return empty_bars()
+    df = df[[col for col in OHLCV_COLUMNS if col in df.columns]].dropna(how="all")
+    index = pd.DatetimeIndex(df.index)
+    if index.tz is not None:
+        index = index.tz_localize(None)
+    df.index = index.normalize().rename("Date")
+    return df[~df.index.duplicated(keep="last")].sort_index()
+
+
+class YFinanceProvider:
+    """Yahoo Finance에서 여러 종목을 한 번에 받아옵니다."""
+
+    def fetch(self, tickers, start, end):
+        """[start, end) 기간의 일봉을 {종목: DataFrame}으로 반환합니다."""
+        import yfinance as yf
+
+        tickers = list(tickers)
+        if len(tickers) == 1:
+            data = yf.Ticker(tickers[0]).history(start=start, end=end, auto_adjust=True)
+            return {tickers[0]: clean_bars(data)}
+        data = yf.download(tickers, start=start, end=end, group_by="ticker", auto_adjust=True,
+                           progress=False, threads=True)
+        return {ticker: clean_bars(data[ticker]) if ticker in data.columns.get_level_values(0) else empty_bars()
+                for ticker in tickers}
+
+
+class FixtureProvider:
+    """녹화된 CSV({fixture_dir}/{종목}.csv)를 재생하는 가짜 제공자입니다 (네트워크 없이 테스트용).
+
+    calls에는 받은 요청이 (종목 목록, 시작, 끝) 형태로 남으므로 없는 구간만 요청했는지 확인할 수 있습니다.
+    """
+
+    def __init__(self, fixture_dir):
+        self.fixture_dir = fixture_dir
+        self.calls = []
+
+    def fixture_path(self, ticker):
+        return os.path.join(self.fixture_dir, f"{safe_name(ticker)}.csv")
+
+    def fetch(self, tickers, start, end):
+        tickers = list(tickers)
+        self.calls.append((tickers, start, end))
+        result = {}
+        for ticker in tickers:
+            path = self.fixture_path(ticker)
+            if not os.path.exists(path):
+                result[ticker] = empty_bars()
+                continue
+            bars = clean_bars(pd.read_csv(path, index_col="Date", parse_dates=["Date"]))
+            result[ticker] = bars[(bars.index >= pd.Timestamp(start)) & (bars.index < pd.Timestamp(end))]
+        return result
+
+
+class RecordingProvider:
+    """다른 제공자가 받아 온 데이터를 FixtureProvider 형식의 CSV로 함께 저장합니다 (픽스처 녹화용)."""
+
+    def __init__(self, inner, fixture_dir):
+        self.inner = inner
+        self.fixture_dir = fixture_dir
+
+    def fetch(self, tickers, start, end):
+        result = self.inner.fetch(tickers, start, end)
+        os.makedirs(self.fixture_dir, exist_ok=True)
+        for ticker, bars in result.items():
+            path = os.path.join(self.fixture_dir, f"{safe_name(ticker)}.csv")
+            if os.path.exists(path):
+                bars = pd.concat([clean_bars(pd.read_csv(path, index_col="Date", parse_dates=["Date"])), bars])
+                bars = bars[~bars.index.duplicated(keep="last")].sort_index()
+            bars.to_csv(path, index_label="Date")
+        return result
+
+
+def default_provider():
+    """STOCK_FIXTURE_DIR가 있으면 FixtureProvider, 없으면 YFinanceProvider를 반환합니다."""
+    fixture_dir = os.environ.get(FIXTURE_DIR_ENV)
+    return FixtureProvider(fixture_dir) if fixture_dir else YFinanceProvider()
+
+
+def safe_name(ticker):
+    """종목 코드를 파일 이름으로 쓸 수 있게 바꿉니다 (예: 005930.KS → 005930.KS, ^KS11 → _KS11)."""
+    return re.sub(r"[^0-9A-Za-z._-]", "_", ticker)
+
+
+def session_close(day):
+    """day 봉이 확정되는 시각을 유닉스 시간(초)으로 반환합니다."""
+    return dt.datetime.combine(day, SESSION_CLOSE_UTC, tzinfo=dt.timezone.utc).timestamp()
+
+
+def missing_ranges(covered, start, end):
+    """이미 받은 구간 covered=(시작, 끝) 또는 None 기준으로 [start, end) 중 빠진 구간 목록을 반환합니다."""
+    if start >= end:
+        return []
+    if covered is None:
+        return [(start, end)]
+    covered_start, covered_end = covered
+    ranges = []
+    if start < covered_start:
+        ranges.append((start, min(end, covered_start)))
+    if end > covered_end:
+        ranges.append((max(start, covered_end), end))
+    return ranges
+
+
+class OHLCVStore:
+    """종목마다 SQLite 파일 하나에 일봉을 저장하는 로컬 저장소입니다.
+
+    파일마다 bars(date, open, high, low, close, volume) 표와, 이미 받아 온 기간을 적어 둔 meta 표가 있습니다.
+    받아 온 기간은 실제로 받은 첫 봉부터 마지막 봉까지만 넓히므로 실패해서 빈 응답이 와도 그 구간은 다음에 다시 받습니다.
+    받아 온 기간 밖의 날짜를 요청할 때만 제공자에게 그 구간을 요청하고, 봉이 없던 구간(휴장일 등)도
+    잠시 기억해 두므로 같은 요청을 반복하면 모두 디스크에서 처리됩니다.
+    지난 봉은 계속 보관하고, 장 마감 전에 받아 둔 마지막 봉만 마감이 지나거나 max_age초가 지나면
+    그 봉부터 다시 받아 확정값으로 고치고 새 봉을 이어 붙입니다.
+    clock은 현재 시각(유닉스 시간)을 돌려주는 함수입니다 (테스트에서 시계를 바꿀 때 씀).
+    """
+
+    def __init__(self, root=STORE_DIR, provider=None, max_age=REFRESH_SECONDS, clock=time.time):
+        self.root = root
+        self.provider = provider or default_provider()
+        self.max_age = max_age
+        self.clock = clock
+        # 같은 종목을 여러 스레드가 동시에 갱신하지 않도록 종목별 잠금 (미리 불러오기와 화면 요청이 겹칠 때)
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+        # 요청했지만 봉이 없던 구간 {종목: [(시작, 끝, 확인 시각, 확정 여부)]} (_note_no_bars 참고)
+        self._no_bars = {}
+
+    def _lock(self, ticker):
+        with self._locks_guard:
+            return self._locks.setdefault(ticker, threading.Lock())
+
+    def db_path(self, ticker):
+        return os.path.join(self.root, f"{safe_name(ticker)}.sqlite")
+
+    def _connect(self, ticker):
+        os.makedirs(self.root, exist_ok=True)
+        conn = sqlite3.connect(self.db_path(ticker))
+        conn.execute("CREATE TABLE IF NOT EXISTS bars (date TEXT PRIMARY KEY, open REAL, high REAL, low REAL, "
+                     "close REAL, volume REAL)")
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        return conn
+
+    def _meta(self, ticker):
+        if not os.path.exists(self.db_path(ticker)):
+            return {}
+        with self._connect(ticker) as conn:
+            meta = dict(conn.execute("SELECT key, value FROM meta"))
+            meta["last_bar"] = conn.execute("SELECT MAX(date) FROM bars").fetchone()[0]
+        return meta
+
+    def covered(self, ticker):
+        """이미 받아 온 기간 (시작, 끝)을 반환합니다. 끝 날짜는 포함하지 않으며, 받은 적 없으면 None."""
+        meta = self._meta(ticker)
+        if "covered_start" not in meta or "covered_end" not in meta:
+            return None
+        return dt.date.fromisoformat(meta["covered_start"]), dt.date.fromisoformat(meta["covered_end"])
+
+    def version(self, ticker):
+        """저장된 데이터가 바뀌면 달라지는 문자열 (화면 캐시 키용)을 반환합니다."""
+        meta = self._meta(ticker)
+        return "|".join(str(meta.get(key)) for key in ("covered_start", "covered_end", "last_bar", "fetched_at"))
+
+    def stale_range(self, ticker, end, now=None):
+        """마지막 봉을 다시 받아야 하면 그 구간 (마지막 봉 날짜, 끝)을, 아니면 None을 반환합니다.
+
+        받아 온 기간의 마지막 날 장 마감 전에 받았으면(장중 값이거나 그날 봉이 아직 없었음)
+        마감이 지났거나 받은 지 max_age초가 지났을 때 해당합니다.
+        날짜가 바뀐 뒤에도 마지막 봉부터 다시 받으므로 어제 장중에 받아 둔 봉도 확정값으로 고쳐집니다.
+        """
+        meta = self._meta(ticker)
+        if not meta.get("last_bar") or "fetched_at" not in meta:
+            return None
+        last_bar = dt.date.fromisoformat(meta["last_bar"][:10])
+        if end <= last_bar:
+            return None  # 마지막 봉보다 앞 기간만 요청하면 다시 받을 필요 없음
+        covered_end = dt.date.fromisoformat(meta["covered_end"])
+        fetched_at = float(meta["fetched_at"])
+        close = session_close(covered_end - dt.timedelta(days=1))
+        if fetched_at >= close:
+            return None  # 마감 뒤에 받았으면 받아 온 기간의 봉은 모두 확정값
+        now = self.clock() if now is None else now
+        if now < close and now - fetched_at < self.max_age:
+            return None
+        return last_bar, max(end, covered_end)
+
+    def write(self, ticker, bars, start, end):
+        """[start, end)를 요청해 받아 온 일봉을 저장합니다 (같은 날짜는 덮어씀).
+
+        받아 온 기간은 받은 첫 봉부터 마지막 봉 다음 날까지만 넓히며, 봉이 하나도 없으면 아무것도 바꾸지 않습니다
+        (yfinance는 실패해도 빈 표나 NaN만 있는 표를 돌려주므로 그 구간을 받은 것으로 치면 다시 받지 못함).
+        받아 온 기간의 끝쪽(마지막 봉)까지 받았으면 받은 시각(fetched_at)도 기록합니다.
+        """
+        bars = bars.dropna(how="all")
+        if bars.empty:
+            return
+        covered = self.covered(ticker)
+        reaches_tail = covered is None or end >= covered[1]
+        start, end = bars.index[0].date(), bars.index[-1].date() + dt.timedelta(days=1)
+        if covered is not None:
+            start, end = min(start, covered[0]), max(end, covered[1])
+        rows = [(day.strftime("%Y-%m-%d"), *values)
+                for day, values in zip(bars.index, bars.reindex(columns=OHLCV_COLUMNS).itertuples(index=False))]
+        meta = [("covered_start", start.isoformat()), ("covered_end", end.isoformat())]
+        if reaches_tail:
+            meta.append(("fetched_at", repr(self.clock())))
+        with self._connect(ticker) as conn:
+            conn.executemany("INSERT OR REPLACE INTO bars VALUES (?, ?, ?, ?, ?, ?)", rows)
+            conn.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)", meta)
+
+    def read(self, ticker, start=None, end=None):
+        """저장된 일봉을 [start, end) 범위로 읽어 DataFrame으로 반환합니다 (제공자를 부르지 않음)."""
+        if not os.path.exists(self.db_path(ticker)):
+            return empty_bars()
+        query = "SELECT date, open, high, low, close, volume FROM bars WHERE date >= ? AND date < ? ORDER BY date"
+        params = ((start or dt.date.min).isoformat(), (end or dt.date.max).isoformat())
+        with self._connect(ticker) as conn:
+            df = pd.read_sql_query(query, conn, params=params, parse_dates=["date"])
+        df.columns = ["Date"] + OHLCV_COLUMNS
+        return df.set_index("Date")
+
+    def _note_no_bars(self, ticker, bars, start, end, now):
+        """[start, end)를 요청해 받은 bars 기준으로 봉이 없던 앞뒤 구간을 기억해 둡니다 (update가 다시 요청하지 않도록).
+
+        봉이 있는 응답의 앞뒤 빈 구간 중 이미 장이 끝난 날짜만 있는 구간은 휴장일이므로 확정으로 두고,
+        빈 응답(실패일 수 있음)이나 아직 봉이 생길 수 있는 구간은 max_age초 동안만 다시 요청하지 않습니다.
+        """
+        bars = bars.dropna(how="all")
+        if bars.empty:
+            pieces = [(start, end, False)]
+        else:
+            first, after_last = bars.index[0].date(), bars.index[-1].date() + dt.timedelta(days=1)
+            pieces = [(start, first, True), (after_last, end, session_close(end - dt.timedelta(days=1)) <= now)]
+        kept = [piece for piece in self._no_bars.get(ticker, []) if piece[3] or now - piece[2] < self.max_age]
+        kept += [(piece_start, piece_end, now, settled) for piece_start, piece_end, settled in pieces
+                 if piece_start < piece_end]
+        self._no_bars[ticker] = kept
+
+    def _known_empty(self, ticker, gap, now):
+        """gap이 최근에(또는 확정적으로) 봉이 없다고 확인한 구간 안에 있으면 True."""
+        return any(piece_start <= gap[0] and gap[1] <= piece_end and (settled or now - checked_at < self.max_age)
+                   for piece_start, piece_end, checked_at, settled in self._no_bars.get(ticker, []))
+
+    def update(self, tickers, start, end=None):
+        """여러 종목에 대해 [start, end) 중 아직 받지 않은 구간과 오래된 최근 봉만 받아 저장합니다.
+
+        빠진 구간이 같은 종목끼리 묶어 제공자를 한 번씩만 부르며, 실제로 요청한 (종목 목록, 시작, 끝) 목록을 반환합니다.
+        end를 생략하면 오늘까지(내일 전까지)입니다.
+        """
+        now = self.clock()
+        end = end or dt.date.fromtimestamp(now) + dt.timedelta(days=1)
+        locks = [self._lock(ticker) for ticker in sorted(set(tickers))]
+        for lock in locks:
+            lock.acquire()
+        try:
+            batches = {}
+            for ticker in tickers:
+                covered = self.covered(ticker)
+                gaps = missing_ranges(covered, start, end)
+                stale = self.stale_range(ticker, end, now)
+                if stale is not None:
+                    # 뒤쪽 빈 구간은 마지막 봉부터 다시 받는 구간에 합침
+                    gaps = [gap for gap in gaps if gap[1] <= stale[0]] + [stale]
+                for gap in gaps:
+                    # 한 번도 봉을 받지 못한 종목은 실패였을 수 있으므로 빈 구간 기록과 상관없이 다시 요청
+                    if covered is None or not self._known_empty(ticker, gap, now):
+                        batches.setdefault(gap, []).append(ticker)
+
+            requests = []
+            for (gap_start, gap_end), batch in batches.items():
+                fetched = self.provider.fetch(batch, gap_start, gap_end)
+                for ticker in batch:
+                    bars = fetched.get(ticker, empty_bars())
+                    self.write(ticker, bars, gap_start, gap_end)
+                    self._note_no_bars(ticker, bars, gap_start, gap_end, now)
+                requests.append((batch, gap_start, gap_end))
+            return requests
+        finally:
+            for lock in locks:
+                lock.release()
+
+    def bars(self, ticker, start, end=None):
+        """[start, end) 일봉을 반환합니다. 빠진 구간이 있으면 먼저 받아 저장합니다."""
+        self.update([ticker], start, end)
+        return self.read(ticker, start, end)
+
+    def bars_many(self, tickers, start, end=None):
+        """여러 종목을 한 번에 갱신한 뒤 {종목: DataFrame}으로 반환합니다."""
+        self.update(tickers, start, end)
+        return {ticker: self.read(ticker, start, end) for ticker in tickers}
+
+
+class Prefetcher:
+    """여러 종목을 스레드 풀에서 동시에 받아 캐시를 미리 채우고, 종목별 소요 시간을 기록합니다.
+
+    fetch(종목)은 보통 저장소를 갱신하고 st.cache_data 캐시를 채우는 함수라서, 다 받고 나면 화면에서 종목을 바꿀 때
+    캐시에서 바로 나옵니다. 실패하면 예외를 그대로 올려야 report()에 원인이 남습니다 (작업 스레드에서는 st.error가 보이지 않음).
+    만들자마자 백그라운드에서 시작하며 화면을 막지 않습니다.
+    """
+
+    def __init__(self, fetch, tickers, max_workers=PREFETCH_WORKERS):
+        self.tickers = list(tickers)
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="stock-prefetch")
+        self.futures = {ticker: executor.submit(self._timed_fetch, fetch, ticker) for ticker in self.tickers}
+        executor.shutdown(wait=False)
+
+    @staticmethod
+    def _timed_fetch(fetch, ticker):
+        started = time.perf_counter()
+        try:
+            result = fetch(ticker)
+            error = None
+        except Exception as e:
+            result, error = None, str(e)
+        return {"seconds": time.perf_counter() - started, "rows": None if result is None else len(result), "error": error}
+
+    def done(self):
+        return all(future.done() for future in self.futures.values())
+
+    def wait(self, timeout=None):
+        """모든 종목을 받을 때까지 기다립니다 (timeout초가 지나면 그냥 돌아옴)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for future in self.futures.values():
+            remaining = None if deadline is None else max(0, deadline - time.monotonic())
+            try:
+                future.result(timeout=remaining)
+            except Exception:
+                return
+
+    def report(self):
+        """종목별 상태, 소요 시간, 오류 내용을 DataFrame으로 반환합니다."""
+        rows = []
+        for ticker, future in self.futures.items():
+            if not future.done():
+                rows.append({"종목": ticker, "상태": "받는 중", "소요 시간(초)": None, "행 수": None, "오류 내용": None})
+                continue
+            info = future.result()
+            status = "오류" if info["error"] else ("데이터 없음" if not info["rows"] else "완료")
+            rows.append({"종목": ticker, "상태": status, "소요 시간(초)": round(info["seconds"], 2), "행 수": info["rows"],
+                         "오류 내용": info["error"]})
+        return pd.DataFrame(rows)
+
+
+# --- 차트용 다운샘플링 ---
+# 차트 너비 1픽셀에 보낼 점 수 (이보다 많으면 화면에서 구분되지 않음)
+POINTS_PER_PIXEL = 2
+
+
+def points_for_width(width_px, points_per_pixel=POINTS_PER_PIXEL):
+    """차트 너비(픽셀)에 맞는 최대 점 수를 반환합니다."""
+    return max(3, int(width_px * points_per_pixel))
+
+
+def minmax_indices(values, n_buckets):
+    """값을 n_buckets개 구간으로 나눠 구간마다 최솟값/최댓값 위치만 남긴 정렬된 인덱스를 반환합니다.
+
+    선 그래프의 모양(봉우리와 골짜기)은 그대로 두고 점 수만 최대 2 × n_buckets + 2개로 줄입니다.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n = len(values)
+    if n <= 2 * n_buckets + 2:
+        return np.arange(n)
+    size = -(-n // n_buckets)
+    padded = np.full(n_buckets * size, np.nan)
+    padded[:n] = values
+    blocks = padded.reshape(n_buckets, size)
+    has_value = ~np.isnan(blocks).all(axis=1)
+    filled = np.where(np.isnan(blocks), np.inf, blocks)
+    lows = filled.argmin(axis=1)
+    highs = np.where(np.isnan(blocks), -np.inf, blocks).argmax(axis=1)
+    offsets = np.arange(n_buckets) * size
+    picks = np.concatenate(([0, n - 1], (offsets + lows)[has_value], (offsets + highs)[has_value]))
+    return np.unique(picks[picks < n])
+
+
+def lttb_indices(y, n_out, x=None):
+    """Largest-Triangle-Three-Buckets로 n_out개 점의 인덱스를 고릅니다 (처음/마지막 점 포함, 정렬됨).
+
+    구간마다 '이전에 고른 점'과 '다음 구간 평균점'으로 만든 삼각형 넓이가 가장 큰 점을 고르므로
+    min/max 방식보다 적은 점으로 선 모양을 잘 유지합니다.
+    다음 구간 평균은 누적합으로 한 번에 구하고, 앞 구간 결과에 의존하는 선택만 구간 단위로 반복합니다.
+    """
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.arange(n, dtype=np.float64) if x is None else np.asarray(x, dtype=np.float64)
+
+    # 처음/마지막 점을 뺀 나머지를 n_out - 2개 구간으로 나눔
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    valid = ~np.isnan(y)
+    cum_x = np.concatenate(([0.0], np.cumsum(np.where(valid, x, 0.0))))
+    cum_y = np.concatenate(([0.0], np.cumsum(np.where(valid, y, 0.0))))
+    cum_n = np.concatenate(([0], np.cumsum(valid)))
+    lo, hi = edges[1:-1], edges[2:]
+    count = np.maximum(cum_n[hi] - cum_n[lo], 1)
+    next_x = np.append((cum_x[hi] - cum_x[lo]) / count, x[-1])
+    next_y = np.append((cum_y[hi] - cum_y[lo]) / count, y[-1])
+
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, stop = edges[i], edges[i + 1]
+        ax, ay = x[a], y[a]
+        area = np.abs((ax - next_x[i]) * (y[start:stop] - ay) - (ax - x[start:stop]) * (next_y[i] - ay))
+        area[np.isnan(area)] = -1.0
+        a = start + int(area.argmax())
+        out[i + 1] = a
+    return out
+
+
+def downsample_indices(y, max_points, method="lttb"):
+    """max_points개 이하로 줄인 점의 인덱스를 반환합니다. method는 'lttb' 또는 'minmax'입니다."""
+    if len(y) <= max_points:
+        return np.arange(len(y))
+    if method == "minmax":
+        return minmax_indices(y, max(1, (max_points - 2) // 2))
+    return lttb_indices(y, max_points)
+
+
+# --- 기술적 지표 ---
+SMA_WINDOWS = (20, 60)
+EMA_SPANS = (12, 26)
+MACD_SIGNAL_SPAN = 9
+RSI_PERIOD = 14
+BOLLINGER_WINDOW = 20
+BOLLINGER_K = 2.0
+VOLATILITY_WINDOW = 20
+TRADING_DAYS = 252
+
+
+def rolling_windows(values, window):
+    """(날짜 × 종목) 배열의 길이 window 이동 창을 (날짜 - window + 1, 종목, window) 뷰로 반환합니다 (복사 없음)."""
+    return np.lib.stride_tricks.sliding_window_view(values, window, axis=0)
+
+
+def rolling_mean(values, window):
+    """이동 평균. 앞쪽 window - 1개와 창 안에 빈 값이 있는 자리는 NaN입니다."""
+    out = np.full(values.shape, np.nan)
+    if len(values) >= window:
+        out[window - 1:] = rolling_windows(values, window).mean(axis=-1)
+    return out
+
+
+def rolling_std(values, window):
+    """이동 표준편차 (ddof=0). 누적합 방식보다 느리지만 큰 값에서도 자리 손실이 없습니다."""
+    out = np.full(values.shape, np.nan)
+    if len(values) >= window:
+        out[window - 1:] = rolling_windows(values, window).std(axis=-1)
+    return out
+
+
+def ema(values, span=None, alpha=None):
+    """지수 이동 평균을 모든 종목(열)에 대해 한 번에 계산합니다.
+
+    점화식이라 NumPy만으로는 행마다 반복해야 하므로 pandas의 컴파일된 ewm을 행렬 전체에 한 번 적용합니다.
+    """
+    frame = pd.DataFrame(values)
+    return frame.ewm(span=span, alpha=alpha, adjust=False, ignore_na=True).mean().to_numpy()
+
+
+def compute_indicators(close):
+    """(날짜 × 종목) 종가 배열에서 지표들을 계산해 {지표 이름: (날짜 × 종목) 배열}로 반환합니다.
+
+    모든 연산이 배열 전체에 대한 벡터 연산이므로 종목 수와 상관없이 한 번에 계산됩니다.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    out = {}
+    for window in SMA_WINDOWS:
+        out[f"SMA{window}"] = rolling_mean(close, window)
+    for span in EMA_SPANS:
+        out[f"EMA{span}"] = ema(close, span=span)
+
+    macd = out[f"EMA{EMA_SPANS[0]}"] - out[f"EMA{EMA_SPANS[1]}"]
+    out["MACD"] = macd
+    out["MACD_signal"] = ema(macd, span=MACD_SIGNAL_SPAN)
+    out["MACD_hist"] = macd - out["MACD_signal"]
+
+    # RSI (Wilder 평활: alpha = 1 / 기간)
+    change = np.diff(close, axis=0, prepend=np.nan)
+    gain = ema(np.where(change > 0, change, np.where(np.isnan(change), np.nan, 0.0)), alpha=1 / RSI_PERIOD)
+    loss = ema(np.where(change < 0, -change, np.where(np.isnan(change), np.nan, 0.0)), alpha=1 / RSI_PERIOD)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rsi = 100 - 100 / (1 + gain / loss)
+    rsi[loss == 0] = 100.0
+    rsi[np.isnan(gain) | np.isnan(loss)] = np.nan
+    valid = np.cumsum(~np.isnan(change), axis=0) >= RSI_PERIOD
+    out["RSI"] = np.where(valid, rsi, np.nan)
+
+    mid = rolling_mean(close, BOLLINGER_WINDOW)
+    band = BOLLINGER_K * rolling_std(close, BOLLINGER_WINDOW)
+    out["BB_mid"], out["BB_upper"], out["BB_lower"] = mid, mid + band, mid - band
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        log_return = np.diff(np.log(close), axis=0, prepend=np.nan)
+    out["Volatility"] = rolling_std(log_return, VOLATILITY_WINDOW) * np.sqrt(TRADING_DAYS)
+
+    # 낙폭: 그때까지의 최고 종가 대비 하락률 (fmax는 앞쪽 NaN을 건너뜀)
+    out["Drawdown"] = close / np.fmax.accumulate(close, axis=0) - 1
+    return out
+
+
+class IndicatorEngine:
+    """여러 종목의 지표를 한 번에 계산하고 (종목, 첫 봉/마지막 봉 날짜, 마지막 종가) 기준으로 기억해 둡니다.
+
+    새 봉이 붙거나 장중 봉이 고쳐진 종목만 다시 계산하며, 종목마다 가장 최근 결과 하나만 보관합니다.
+    """
+
+    def __init__(self):
+        self._memo = {}
+        self._guard = threading.Lock()
+
+    @staticmethod
+    def memo_key(ticker, data):
+        return ticker, str(data.index[0]), str(data.index[-1]), float(data["Close"].iloc[-1])
+
+    def compute(self, frames):
+        """{종목: OHLCV DataFrame}을 받아 {종목: 지표 DataFrame}을 반환합니다 (인덱스는 원본과 같음)."""
+        frames = {ticker: data for ticker, data in frames.items() if not data.empty}
+        with self._guard:
+            results = {}
+            todo = {}
+            for ticker, data in frames.items():
+                cached = self._memo.get(ticker)
+                if cached is not None and cached[0] == self.memo_key(ticker, data):
+                    results[ticker] = cached[1]
+                else:
+                    todo[ticker] = data
+
+        if todo:
+            # 종목마다 자기 거래일 그대로 위쪽부터 채운 (봉 순서 × 종목) 행렬 하나로 한 번에 계산
+            # (날짜를 합치면 휴장일이 다른 종목 사이에 NaN 구멍이 생기므로 맞추지 않음; 지표는 앞 봉만 보므로 아래쪽 NaN은 영향 없음)
+            lengths = [len(data) for data in todo.values()]
+            close = np.full((max(lengths), len(todo)), np.nan)
+            for j, data in enumerate(todo.values()):
+                close[:lengths[j], j] = data["Close"].to_numpy(dtype=np.float64)
+            values = compute_indicators(close)
+            for j, (ticker, data) in enumerate(todo.items()):
+                table = pd.DataFrame({name: array[:lengths[j], j] for name, array in values.items()}, index=data.index)
+                results[ticker] = table
+                with self._guard:
+                    self._memo[ticker] = (self.memo_key(ticker, data), table)
+        return results
+
+
+# --- 포트폴리오 분석 ---
+FRONTIER_POINTS = 60
+RANDOM_PORTFOLIOS = 3000
+
+
+def close_matrix(frames):
+    """{종목: OHLCV DataFrame}을 모든 종목에 종가가 있는 날짜만 남긴 (날짜 × 종목) 종가 DataFrame으로 맞춥니다."""
+    closes = {ticker: data["Close"] for ticker, data in frames.items() if not data.empty}
+    if not closes:
+        return pd.DataFrame()
+    return pd.concat(closes, axis=1).sort_index().dropna()
+
+
+class PortfolioModel:
+    """종목 종가 행렬에서 수익률/공분산/상관계수와 효율적 투자선을 한 번에 계산해 둡니다.
+
+    평균과 공분산은 연율화한 값입니다. 효율적 투자선은 공매도를 허용한 Markowitz 해를 닫힌 식으로 구하고,
+    공매도 없는 경우는 무작위 비중 포트폴리오를 행렬 곱 한 번으로 평가해 함께 보여 줍니다.
+    """
+
+    def __init__(self, closes, risk_free=0.0, seed=0):
+        self.closes = closes
+        self.tickers = list(closes.columns)
+        self.risk_free = risk_free
+        prices = closes.to_numpy(dtype=np.float64)
+        self.returns = prices[1:] / prices[:-1] - 1
+        self.mean = self.returns.mean(axis=0) * TRADING_DAYS
+        self.cov = np.atleast_2d(np.cov(self.returns, rowvar=False)) * TRADING_DAYS
+        std = np.sqrt(np.diag(self.cov))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            self.corr = self.cov / np.outer(std, std)
+        self.frontier = self._frontier()
+        self.samples = self._random_portfolios(seed)
+
+    def stats(self, weights):
+        """비중 (N,) 또는 (K × N)에 대한 연 수익률, 연 변동성, 샤프 비율을 반환합니다."""
+        weights = np.asarray(weights, dtype=np.float64)
+        ret = weights @ self.mean
+        vol = np.sqrt(np.einsum("...n,nm,...m->...", weights, self.cov, weights))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sharpe = (ret - self.risk_free) / vol
+        return ret, vol, sharpe
+
+    def value(self, weights, initial=1.0):
+        """처음 비중대로 사서 그대로 들고 있을 때의 평가액 추이를 반환합니다."""
+        weights = np.asarray(weights, dtype=np.float64)
+        prices = self.closes.to_numpy(dtype=np.float64)
+        return pd.Series(prices / prices[0] @ weights * initial, index=self.closes.index)
+
+    def _frontier(self):
+        """목표 수익률마다 분산이 가장 작은 비중 (공매도 허용)을 닫힌 식으로 한 번에 구합니다."""
+        n = len(self.tickers)
+        if n < 2 or len(self.returns) < 2:
+            return {"return": np.array([]), "volatility": np.array([]), "weights": np.zeros((0, n))}
+        inv = np.linalg.pinv(self.cov)
+        ones = np.ones(n)
+        inv_ones, inv_mean = inv @ ones, inv @ self.mean
+        a, b, c = ones @ inv_ones, ones @ inv_mean, self.mean @ inv_mean
+        d = a * c - b * b
+        min_var_return = b / a
+        targets = np.linspace(min_var_return, max(self.mean.max(), min_var_return), FRONTIER_POINTS)
+        if d <= 1e-12:
+            targets = targets[:1]
+            weights = np.tile(inv_ones / a, (1, 1))
+        else:
+            lam = (c - b * targets) / d
+            gamma = (a * targets - b) / d
+            weights = lam[:, None] * inv_ones + gamma[:, None] * inv_mean
+        ret, vol, _ = self.stats(weights)
+        return {"return": ret, "volatility": vol, "weights": weights}
+
+    def _random_portfolios(self, seed):
+        """공매도 없는 무작위 비중 RANDOM_PORTFOLIOS개를 한 번에 평가합니다."""
+        n = len(self.tickers)
+        rng = np.random.default_rng(seed)
+        weights = rng.dirichlet(np.ones(n), size=RANDOM_PORTFOLIOS) if n else np.zeros((0, 0))
+        ret, vol, sharpe = self.stats(weights)
+        return {"return": ret, "volatility": vol, "sharpe": sharpe, "weights": weights}
+
+    def best_sampled(self):
+        """무작위 포트폴리오 중 샤프 비율이 가장 높은 비중을 반환합니다."""
+        sharpe = np.nan_to_num(self.samples["sharpe"], nan=-np.inf)
+        return self.samples["weights"][int(sharpe.argmax())]
+
+
+# --- 실시간 시세 ---
+# 종목별로 보관하는 최근 시세 개수 (고정 크기, 오래된 값부터 덮어씀)
+LIVE_BUFFER_SIZE = 3600
+# 시세를 새로 가져오는 간격 (초)
+LIVE_POLL_SECONDS = 1.0
+# Yahoo Finance 시세 조회 간격 (초). 1분봉이 갱신되는 주기에 맞추고 요청 제한에 걸리지 않도록 길게 잡음
+YFINANCE_QUOTE_SECONDS = 15.0
+# 화면이 이 시간(초) 동안 시세를 보지 않으면 조회를 멈춤 (다시 보면 이어서 조회)
+LIVE_IDLE_SECONDS = 30.0
+# 설정하면 실제 시세 대신 FakeQuoteSource를 씀 (테스트/오프라인용)
+FAKE_QUOTES_ENV = "STOCK_FAKE_QUOTES"
+
+
+class RingBuffer:
+    """시각/가격/거래량을 고정 크기 NumPy 배열에 돌려 쓰며 저장합니다 (리스트처럼 계속 늘어나지 않음)."""
+
+    def __init__(self, capacity=LIVE_BUFFER_SIZE):
+        self.capacity = capacity
+        self.times = np.full(capacity, np.nan)
+        self.prices = np.full(capacity, np.nan)
+        self.volumes = np.zeros(capacity)
+        self.count = 0  # 지금까지 들어온 전체 개수 (다음에 쓸 위치 = count % capacity)
+        self._lock = threading.Lock()
+
+    def push(self, timestamp, price, volume=0.0):
+        with self._lock:
+            pos = self.count % self.capacity
+            self.times[pos], self.prices[pos], self.volumes[pos] = timestamp, price, volume
+            self.count += 1
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def snapshot(self, since=0):
+        """오래된 것부터 순서대로 (전체 개수, 시각, 가격, 거래량) 복사본을 반환합니다.
+
+        since에 이전 snapshot의 전체 개수를 넘기면 그 뒤에 들어온 값만 돌려줍니다 (차트 증분 갱신용).
+        """
+        with self._lock:
+            count = self.count
+            n = min(count - since, len(self)) if since else len(self)
+            idx = (np.arange(count - n, count)) % self.capacity
+            return count, self.times[idx], self.prices[idx], self.volumes[idx]
+
+
+class FakeQuoteSource:
+    """실제 시세 대신 종목별 무작위 보행 가격을 만들어 주는 가짜 시세원입니다 (테스트/오프라인용)."""
+
+    interval = LIVE_POLL_SECONDS
+
+    def __init__(self, start_prices=None, volatility=0.0005, seed=0):
+        self.prices = dict(start_prices or {})
+        self.volatility = volatility
+        self.rng = np.random.default_rng(seed)
+
+    async def poll(self, tickers):
+        now = time.time()
+        moves = np.exp(self.rng.normal(0, self.volatility, len(tickers)))
+        volumes = self.rng.integers(1, 1000, len(tickers))
+        quotes = {}
+        for ticker, move, volume in zip(tickers, moves, volumes):
+            self.prices[ticker] = self.prices.get(ticker, 100_000.0) * move
+            quotes[ticker] = (now, self.prices[ticker], float(volume))
+        return quotes
+
+
+class YFinanceQuoteSource:
+    """Yahoo Finance의 당일 1분봉 마지막 값을 최근 체결가로 조회합니다 (블로킹 호출은 스레드에서 동시에 실행).
+
+    종목마다 yf.Ticker를 하나만 만들어 계속 쓰고, 조회마다 하루치 1분봉만 받습니다
+    (fast_info는 1년치 일봉을 받은 뒤 값을 기억해 버려 실시간 조회에 맞지 않음).
+    """
+
+    interval = YFINANCE_QUOTE_SECONDS
+
+    def __init__(self):
+        self._tickers = {}
+
+    def _ticker(self, ticker):
+        import yfinance as yf
+
+        if ticker not in self._tickers:
+            self._tickers[ticker] = yf.Ticker(ticker)
+        return self._tickers[ticker]
+
+    async def poll(self, tickers):
+        def last_price(ticker):
+            bars = self._ticker(ticker).history(period="1d", interval="1m")
+            if bars.empty:
+                raise ValueError(f"{ticker}: 시세 없음")
+            last = bars.iloc[-1]
+            return float(last["Close"]), float(last["Volume"] or 0)
+
+        now = time.time()
+        results = await asyncio.gather(*(asyncio.to_thread(last_price, t) for t in tickers), return_exceptions=True)
+        return {t: (now, *r) for t, r in zip(tickers, results) if not isinstance(r, BaseException)}
+
+
+def default_quote_source(start_prices=None):
+    """STOCK_FAKE_QUOTES나 STOCK_FIXTURE_DIR가 있으면 FakeQuoteSource, 없으면 YFinanceQuoteSource를 반환합니다."""
+    if os.environ.get(FAKE_QUOTES_ENV) or os.environ.get(FIXTURE_DIR_ENV):
+        return FakeQuoteSource(start_prices)
+    return YFinanceQuoteSource()
+
+
+class LiveFeed:
+    """백그라운드 스레드의 asyncio 루프에서 시세를 주기적으로 받아 종목별 RingBuffer에 넣습니다.
+
+    보는 화면이 touch()를 부르는 동안만 조회하고, idle_timeout초 동안 아무도 부르지 않으면
+    다음 touch()까지 멈춰 있습니다 (서버에 하나만 띄워 두어도 보는 사람이 없으면 요청하지 않음).
+    interval을 생략하면 시세원의 조회 간격을 씁니다.
+    """
+
+    def __init__(self, tickers, source=None, capacity=LIVE_BUFFER_SIZE, interval=None, idle_timeout=LIVE_IDLE_SECONDS):
+        self.tickers = list(tickers)
+        self.source = source or default_quote_source()
+        self.interval = interval or getattr(self.source, "interval", LIVE_POLL_SECONDS)
+        self.idle_timeout = idle_timeout
+        self.buffers = {ticker: RingBuffer(capacity) for ticker in self.tickers}
+        self.errors = 0
+        self.last_error = None
+        self.paused = False
+        self._last_seen = float("-inf")
+        self._wake = None
+        self._loop = asyncio.new_event_loop()
+        self._task = None
+        self._thread = threading.Thread(target=self._loop.run_forever, name="live-feed", daemon=True)
+
+    def touch(self):
+        """화면이 시세를 보고 있음을 알립니다 (멈춰 있었으면 바로 다시 조회를 시작)."""
+        self._last_seen = time.monotonic()
+        if self._wake is not None:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    async def _run(self):
+        self._wake = asyncio.Event()
+        while True:
+            if time.monotonic() - self._last_seen > self.idle_timeout:
+                self._wake.clear()
+                self.paused = True
+                await self._wake.wait()
+                self.paused = False
+            started = time.monotonic()
+            try:
+                quotes = await self.source.poll(self.tickers)
+                for ticker, (timestamp, price, volume) in quotes.items():
+                    self.buffers[ticker].push(timestamp, price, volume)
+            except Exception as e:
+                self.errors += 1
+                self.last_error = str(e)
+            await asyncio.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+
+    def start(self):
+        self.touch()
+        if not self._thread.is_alive():
+            self._thread.start()
+            self._task = asyncio.run_coroutine_threadsafe(self._run(), self._loop)
+        return self
+
+    def stop(self):
+        """조회를 끝내고 루프 스레드를 멈춥니다."""
+        if self._thread.is_alive():
+            asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop)
+            self._thread.join(timeout=5)
+
+    async def _shutdown(self):
+        # 조회 작업이 취소를 끝까지 처리한 뒤에 루프를 멈춤
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._loop.stop()
+
+    def running(self):
+        return self._thread.is_alive() and self._task is not None and not self._task.done()
+
+
+# --- 기업 목록 ---
+# 기업 목록 파일 (name, ticker, lat, lon, logo, featured 컬럼). 상장사 전체 목록으로 바꿔 넣어도 됨
+COMPANIES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "companies.csv")
+# 공간 인덱스 격자 한 칸의 크기 (도)
+GRID_CELL_DEG = 0.1
+# 한글 초성 (초성 검색용, 유니코드 순서)
+CHOSUNG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+
+
+def load_companies(path=COMPANIES_PATH):
+    """기업 목록 파일을 읽어 DataFrame으로 반환합니다 (featured가 1인 기업이 앞쪽)."""
+    df = pd.read_csv(path, dtype={"ticker": str, "logo": str}, keep_default_na=False)
+    df["lat"] = pd.to_numeric(df["lat"], errors="coerce")
+    df["lon"] = pd.to_numeric(df["lon"], errors="coerce")
+    df["featured"] = pd.to_numeric(df.get("featured", 0), errors="coerce").fillna(0).astype(bool)
+    df = df.drop_duplicates("name").sort_values("featured", ascending=False, kind="stable")
+    return df.reset_index(drop=True)
+
+
+def chosung(text):
+    """한글 음절을 초성으로 바꿉니다 (예: '삼성전자' → 'ㅅㅅㅈㅈ'). 한글이 아닌 글자는 그대로 둡니다."""
+    return "".join(CHOSUNG[(ord(ch) - 0xAC00) // 588] if "가" <= ch <= "힣" else ch for ch in text)
+
+
+class GridIndex:
+    """위경도 점들을 GRID_CELL_DEG 크기 격자 칸으로 나눠 둔 공간 인덱스입니다.
+
+    지도 화면 범위에 걸친 칸의 점만 후보로 꺼내므로 점이 수천 개여도 화면 안 마커만 빠르게 찾습니다.
+    """
+
+    def __init__(self, lats, lons, cell_size=GRID_CELL_DEG):
+        self.lats = np.asarray(lats, dtype=np.float64)
+        self.lons = np.asarray(lons, dtype=np.float64)
+        self.cell_size = cell_size
+        rows = np.flatnonzero(~np.isnan(self.lats) & ~np.isnan(self.lons))
+        cy = np.floor(self.lats[rows] / cell_size).astype(np.int64)
+        cx = np.floor(self.lons[rows] / cell_size).astype(np.int64)
+        order = np.lexsort((cx, cy))
+        rows, cy, cx = rows[order], cy[order], cx[order]
+        breaks = np.flatnonzero((np.diff(cy) != 0) | (np.diff(cx) != 0)) + 1
+        self.cells = {(int(cy[start]), int(cx[start])): chunk
+                      for start, chunk in zip(np.concatenate(([0], breaks)), np.split(rows, breaks)) if len(chunk)}
+
+    def query(self, south, west, north, east):
+        """범위 안에 있는 점의 행 번호를 오름차순으로 반환합니다."""
+        y0, y1 = int(np.floor(south / self.cell_size)), int(np.floor(north / self.cell_size))
+        x0, x1 = int(np.floor(west / self.cell_size)), int(np.floor(east / self.cell_size))
+        if (y1 - y0 + 1) * (x1 - x0 + 1) > len(self.cells):
+            # 아주 넓은 범위는 칸을 도는 것보다 있는 칸만 훑는 편이 빠름
+            keys = [key for key in self.cells if y0 <= key[0] <= y1 and x0 <= key[1] <= x1]
+        else:
+            keys = [(y, x) for y in range(y0, y1 + 1) for x in range(x0, x1 + 1) if (y, x) in self.cells]
+        if not keys:
+            return np.empty(0, dtype=np.int64)
+        rows = np.concatenate([self.cells[key] for key in keys])
+        lat, lon = self.lats[rows], self.lons[rows]
+        inside = (lat >= south) & (lat <= north) & (lon >= west) & (lon <= east)
+        return np.sort(rows[inside])
+
+
+class CompanySearch:
+    """기업 이름/종목코드/초성의 앞부분 검색과 비슷한 이름 검색을 제공합니다."""
+
+    def __init__(self, names, tickers):
+        self.names = list(names)
+        keys = []
+        for row, (name, ticker) in enumerate(zip(self.names, tickers)):
+            code = ticker.split(".")[0]
+            for key in {name.lower(), ticker.lower(), code.lower(), chosung(name)}:
+                keys.append((key, row))
+        keys.sort()
+        self.keys = [key for key, _ in keys]
+        self.rows = [row for _, row in keys]
+        self.lower_names = [name.lower() for name in self.names]
+
+    def search(self, query, limit=20):
+        """검색어에 맞는 행 번호를 앞부분 일치 → 부분 일치 → 비슷한 이름 순서로 최대 limit개 반환합니다."""
+        query = query.strip().lower()
+        if not query:
+            return []
+        found = {}
+        lo = bisect.bisect_left(self.keys, query)
+        hi = bisect.bisect_left(self.keys, query + "\uffff")
+        for row in self.rows[lo:hi]:
+            found.setdefault(row, None)
+        if len(found) < limit:
+            for row, name in enumerate(self.lower_names):
+                if query in name:
+                    found.setdefault(row, None)
+        if len(found) < limit:
+            for name in difflib.get_close_matches(query, self.lower_names, n=limit, cutoff=0.5):
+                found.setdefault(self.lower_names.index(name), None)
+        return list(found)[:limit]
+
+
+# --- 벤치마크 ---
+def _random_walk(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return 50_000 * np.exp(np.cumsum(rng.normal(0, 0.001, n)))
+
+
+def _stride_indices(y, max_points):
+    """일정 간격으로 건너뛰는 방식 (벤치마크 비교용, 봉우리를 놓칠 수 있음)."""
+    return np.linspace(0, len(y) - 1, max_points).astype(np.int64)
+
+
+def benchmark_downsamplers(n=1_000_000, width_px=1200, repeat=5):
+    """n개 점 시계열에서 다운샘플링 방식별 시간(초, 최솟값)과 원본 대비 최고/최저가 보존 여부를 비교합니다."""
+    y = _random_walk(n)
+    max_points = points_for_width(width_px)
+    methods = {
+        "stride": lambda: _stride_indices(y, max_points),
+        "minmax": lambda: downsample_indices(y, max_points, "minmax"),
+        "lttb": lambda: downsample_indices(y, max_points, "lttb"),
+    }
+    results = {}
+    for name, fn in methods.items():
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            idx = fn()
+            best = min(best, time.perf_counter() - start)
+        results[name] = {
+            "seconds": best,
+            "points": len(idx),
+            "keeps_extremes": bool(y[idx].max() == y.max() and y[idx].min() == y.min()),
+        }
+    return results
+
+
+if __name__ == "__main__":
+    # 사용법: python stock_data.py [점 개수] [차트 너비(px)]
+    n_points = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    width = int(sys.argv[2]) if len(sys.argv) > 2 else 1200
+    for method, info in benchmark_downsamplers(n_points, width).items():
+        print(f"{method}: {info['seconds'] * 1000:.1f} ms, {n_points:,} → {info['points']:,} points, "
+              f"extremes kept: {info['keeps_extremes']}")
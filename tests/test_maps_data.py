@@ -0,0 +1,276 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pytest
+import requests
+
+from maps_data import (EVICT_EVERY, MATRIX_MAX_ELEMENTS, MATRIX_MAX_SIDE, MapsClient, SQLiteCache, address_key,
+                       estimate_matrix, haversine_matrix, latlng_key, matrix_blocks, nearest_neighbor_tour,
+                       normalize_address, solve_tour, tour_cost, travel_matrix, two_opt)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """엔드포인트마다 정해 둔 응답을 차례로 돌려주는 스텁 (마지막 응답은 계속 반복)."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        endpoint = self.path.split("/maps/api/")[1].split("/json")[0]
+        server = self.server
+        with server.lock:
+            server.requests.append(endpoint)
+            script = server.scripts[endpoint]
+            status, body, delay = script.pop(0) if len(script) > 1 else script[0]
+        time.sleep(delay)
+        raw = body.encode() if isinstance(body, str) else json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+
+@pytest.fixture
+def stub():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.lock = threading.Lock()
+    server.requests = []
+    server.scripts = {}
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.base_url = f"http://127.0.0.1:{server.server_port}"
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def reply(status=200, body=None, delay=0.0):
+    return status, {"status": "OK", "results": []} if body is None else body, delay
+
+
+def make_client(stub, **kwargs):
+    sleeps = []
+    client = MapsClient("test-key", base_url=stub.base_url, sleep=sleeps.append, **kwargs)
+    return client, sleeps
+
+
+def stats(client, endpoint):
+    return client.metrics().set_index("엔드포인트").loc[endpoint]
+
+
+def test_retries_server_errors(stub):
+    stub.scripts["geocode"] = [reply(503, "busy"), reply(500, "oops"), reply()]
+    client, sleeps = make_client(stub)
+    assert client.get_json("geocode", {"address": "서울"})["status"] == "OK"
+    assert stub.requests == ["geocode"] * 3
+    assert len(sleeps) == 2
+    row = stats(client, "geocode")
+    assert (row["호출 수"], row["재시도"], row["오류"]) == (3, 2, 0)
+
+
+def test_retries_over_query_limit(stub):
+    stub.scripts["directions"] = [reply(body={"status": "OVER_QUERY_LIMIT"}), reply(body={"status": "OK", "routes": []})]
+    client, sleeps = make_client(stub)
+    assert client.get_json("directions", {"origin": "a", "destination": "b"})["status"] == "OK"
+    row = stats(client, "directions")
+    assert (row["호출 수"], row["재시도"], row["오류"]) == (2, 1, 0)
+
+
+def test_gives_up_after_backoff(stub):
+    stub.scripts["geocode"] = [reply(503, "busy")]
+    client, sleeps = make_client(stub, max_retries=2)
+    with pytest.raises(requests.HTTPError):
+        client.get_json("geocode", {"address": "서울"})
+    assert len(stub.requests) == 3
+    # 시도마다 대기 시간이 두 배로 늘어남 (흔들림 0.5~1배)
+    assert 0.25 <= sleeps[0] <= 0.5 and 0.5 <= sleeps[1] <= 1.0
+    row = stats(client, "geocode")
+    assert (row["호출 수"], row["재시도"], row["오류"]) == (3, 2, 1)
+
+    # API status 오류는 다시 시도한 뒤 마지막 응답을 그대로 돌려줌
+    stub.scripts["directions"] = [reply(body={"status": "OVER_QUERY_LIMIT"})]
+    assert client.get_json("directions", {})["status"] == "OVER_QUERY_LIMIT"
+    row = stats(client, "directions")
+    assert (row["호출 수"], row["재시도"], row["오류"]) == (3, 2, 1)
+
+
+def test_read_timeout_is_not_retried(stub):
+    stub.scripts["geocode"] = [reply(delay=1.0)]
+    client, sleeps = make_client(stub, timeout=(1, 0.2))
+    started = time.perf_counter()
+    with pytest.raises(requests.exceptions.Timeout):
+        client.get_json("geocode", {"address": "서울"})
+    assert time.perf_counter() - started < 1.0
+    assert sleeps == []
+    row = stats(client, "geocode")
+    assert (row["호출 수"], row["재시도"], row["오류"]) == (1, 0, 1)
+
+
+def test_metrics_track_each_endpoint(stub):
+    stub.scripts["geocode"] = [reply()]
+    stub.scripts["place/details"] = [reply(body={"status": "OK", "result": {}})]
+    client, _ = make_client(stub)
+    for _ in range(3):
+        client.get_json("geocode", {"address": "서울"})
+    client.get_json("place/details", {"place_id": "p"})
+    metrics = client.metrics().set_index("엔드포인트")
+    assert metrics["호출 수"].to_dict() == {"geocode": 3, "place/details": 1}
+    assert (metrics["p95(ms)"] >= metrics["p50(ms)"]).all()
+
+
+def test_cache_entry_expires_after_ttl(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "cache.sqlite"), ttl=100, max_entries=10)
+    cache.put("a", {"v": 1}, now=1000)
+    cache.put("b", {"v": 2}, ttl=10, now=1000)
+    assert cache.get("a", now=1099) == {"v": 1}
+    assert cache.get("a", now=1100) is None
+    assert cache.get("b", now=1009) == {"v": 2}
+    assert cache.get("b", now=1010) is None
+    assert (cache.hits, cache.misses) == (2, 2)
+    cache.evict(now=1100)
+    assert len(cache) == 0
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "cache.sqlite"), ttl=10_000, max_entries=3)
+    for i, key in enumerate("abcde"):
+        cache.put(key, i, now=1000 + i)
+    # a, b를 다시 읽으면 최근에 쓴 항목이 되어 남고, 한 번도 다시 읽지 않은 c, d가 먼저 지워짐
+    assert cache.get("a", now=2000) == 0
+    assert cache.get("b", now=2001) == 1
+    cache.evict(now=2002)
+    assert len(cache) == 3
+    assert [key for key in "abcde" if cache.get(key, now=2003) is not None] == ["a", "b", "e"]
+
+    # put을 EVICT_EVERY번 할 때마다 저절로 정리됨
+    cache = SQLiteCache(str(tmp_path / "auto.sqlite"), ttl=10_000, max_entries=3)
+    for i in range(EVICT_EVERY):
+        cache.put(f"k{i}", i, now=3000 + i)
+    assert len(cache) == 3
+    assert cache.get(f"k{EVICT_EVERY - 1}", now=4000) == EVICT_EVERY - 1
+
+
+def test_address_variants_share_one_key():
+    variants = ["서울 강남구 테헤란로 152", "  서울  강남구,테헤란로 152 ", "서울 강남구, 테헤란로　１５２", "서울\t강남구 테헤란로 152"]
+    assert len({address_key(v) for v in variants}) == 1
+    assert normalize_address("Gangnam-daero ＡＢＣ, Seoul") == "gangnam-daero abc seoul"
+    assert address_key("서울역") != address_key("서울역", language="en")
+
+
+def test_nearby_clicks_share_one_key():
+    # 약 20 m 격자 안의 클릭은 같은 키, 격자를 넘으면 다른 키
+    assert latlng_key(37.50001, 127.00001) == latlng_key(37.50004, 126.99998)
+    assert latlng_key(37.5, 127.0) != latlng_key(37.5003, 127.0)
+
+
+def random_points(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return list(zip(rng.uniform(37.4, 37.7, n), rng.uniform(126.8, 127.2, n)))
+
+
+class MatrixClient:
+    """Distance Matrix 응답을 직선거리로 만들어 주는 가짜 클라이언트 (요청한 칸을 기록)."""
+
+    def __init__(self):
+        self.cells = []
+
+    def get_json(self, endpoint, params):
+        assert endpoint == "distancematrix"
+        origins = [tuple(map(float, p.split(","))) for p in params["origins"].split("|")]
+        destinations = [tuple(map(float, p.split(","))) for p in params["destinations"].split("|")]
+        assert len(origins) <= MATRIX_MAX_SIDE and len(destinations) <= MATRIX_MAX_SIDE
+        assert len(origins) * len(destinations) <= MATRIX_MAX_ELEMENTS
+        rows = []
+        for a in origins:
+            elements = []
+            for b in destinations:
+                self.cells.append((a, b))
+                meters = float(haversine_matrix([a[0], b[0]], [a[1], b[1]])[0, 1])
+                elements.append({"status": "OK", "duration": {"value": meters / 10}, "distance": {"value": meters}})
+            rows.append({"elements": elements})
+        return {"status": "OK", "rows": rows}
+
+
+class NoCallClient:
+    def get_json(self, endpoint, params):
+        raise AssertionError("캐시에 있는 칸을 다시 요청함")
+
+
+def test_matrix_blocks_cover_missing_cells_within_limits():
+    rng = np.random.default_rng(0)
+    full = ~np.eye(40, dtype=bool)
+    added = np.zeros((40, 40), dtype=bool)  # 지점 하나를 추가했을 때: 그 지점의 행과 열만
+    added[39, :39] = added[:39, 39] = True
+    sparse = rng.random((40, 40)) < 0.05
+    for missing in (full, added, sparse):
+        covered = np.zeros_like(missing)
+        blocks = matrix_blocks(missing)
+        for origins, destinations in blocks:
+            assert len(origins) <= MATRIX_MAX_SIDE and len(destinations) <= MATRIX_MAX_SIDE
+            assert len(origins) * len(destinations) <= MATRIX_MAX_ELEMENTS
+            covered[np.ix_(origins, destinations)] = True
+        assert not (missing & ~covered).any()
+    # 지점 하나 추가는 행 하나 + 열 하나 분량의 요청만
+    assert sum(len(o) * len(d) for o, d in matrix_blocks(added)) == 2 * 39
+    assert matrix_blocks(np.zeros((5, 5), dtype=bool)) == []
+
+
+def test_travel_matrix_skips_cached_cells(tmp_path):
+    cache = SQLiteCache(str(tmp_path / "matrix.sqlite"), ttl=3600, max_entries=10_000)
+    points = random_points(12)
+    client = MatrixClient()
+    durations, distances, source = travel_matrix(points, client=client, cache=cache)
+    assert source == "api" and len(client.cells) == 12 * 11 + 12  # 처음에는 대각선을 포함한 직사각형 하나
+
+    # 모두 캐시에 있으면 API를 부르지 않음
+    again = travel_matrix(points, client=NoCallClient(), cache=cache)
+    assert again[2] == "api"
+    np.testing.assert_array_equal(again[0], durations)
+
+    # 지점 하나를 추가하면 새 칸만 요청
+    client = MatrixClient()
+    travel_matrix(points + random_points(1, seed=9), client=client, cache=cache)
+    assert len(client.cells) == 2 * 12
+
+
+def test_travel_matrix_estimates_without_client():
+    points = random_points(6)
+    durations, distances, source = travel_matrix(points, client=None)
+    assert source == "estimate"
+    expected_durations, expected_distances = estimate_matrix([(round(a, 4), round(b, 4)) for a, b in points])
+    np.testing.assert_allclose(distances, expected_distances)
+    np.testing.assert_allclose(durations, expected_durations)
+    assert (np.diag(distances) == 0).all() and (distances[~np.eye(6, dtype=bool)] > 0).all()
+
+
+def test_two_opt_leaves_no_improving_move():
+    points = np.array(random_points(30, seed=3))
+    cost = haversine_matrix(points[:, 0], points[:, 1])
+    tour = two_opt(cost, nearest_neighbor_tour(cost))
+    best = tour_cost(cost, tour)
+    assert best <= tour_cost(cost, nearest_neighbor_tour(cost))
+    for i in range(1, len(tour) - 1):
+        for j in range(i + 1, len(tour)):
+            candidate = tour.copy()
+            candidate[i:j + 1] = candidate[i:j + 1][::-1]
+            assert tour_cost(cost, candidate) >= best - 1e-6
+
+
+def test_open_path_starts_at_start_and_visits_every_stop_once():
+    points = np.array(random_points(50, seed=4))
+    cost = haversine_matrix(points[:, 0], points[:, 1])
+    cost[np.triu_indices(50, k=1)] *= 1.2  # 비대칭 행렬도 처리
+    order, total = solve_tour(cost, start=7, round_trip=False)
+    assert order[0] == 7
+    assert sorted(order) == list(range(50))
+    assert total == pytest.approx(tour_cost(cost, order, round_trip=False))
+    assert total <= tour_cost(cost, nearest_neighbor_tour(cost, 7), round_trip=False) + 1e-6
+
+    # 지점이 2개 이하일 때
+    assert solve_tour(cost[:2, :2], start=1, round_trip=False)[0] == [1, 0]
@@ -0,0 +1,77 @@
+import glob
+import os
+import threading
+
+import numpy as np
+import pytest
+
+from population_data import (PopulationStore, RegionIndex, age_matrix, aggregate_regions, leaf_prefix_sums,
+                             read_population_csv, tmp_path_for)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MF_PATHS = sorted(glob.glob(os.path.join(ROOT, "*_연령별인구현황_월간_남녀구분.csv")))
+
+
+@pytest.fixture(scope="module")
+def population():
+    if not MF_PATHS:
+        pytest.skip("남녀구분 CSV가 없습니다")
+    df = read_population_csv(MF_PATHS[-1])
+    index = RegionIndex.from_frame(df)
+    ages = age_matrix(df)
+    return index, ages, leaf_prefix_sums(index, ages)
+
+
+def test_leaf_aggregate_matches_own_total(population):
+    index, ages, prefix = population
+    aggregated = aggregate_regions(index, prefix, index.codes)
+    mismatched = [index.names[i] for i in np.flatnonzero((aggregated != ages).any(axis=(1, 2)))]
+    assert mismatched == []
+
+
+def test_sibling_sigungu_is_not_nested():
+    # 증평군(4374500000)은 영동군(4374000000) 아래가 아니라 충청북도 바로 아래
+    index = RegionIndex([4300000000, 4374000000, 4374500000, 4111000000, 4111100000],
+                        ["충청북도", "충청북도 영동군", "충청북도 증평군", "경기도 수원시", "경기도 수원시 장안구"])
+    assert index.children(4300000000) == [4374000000, 4374500000]
+    assert index.children(4374000000) == []
+    # 일반구는 같은 이름으로 시작하는 상위 시 아래에 둠
+    assert index.children(4111000000) == [4111100000]
+
+
+def test_jeungpyeong_under_chungbuk(population):
+    index, _, _ = population
+    assert 4374500000 in index.children(4300000000)
+    assert 4374500000 not in index.children(4374000000)
+
+
+def test_concurrent_sync(tmp_path):
+    # 여러 세션이 처음 캐시를 만들 때처럼 같은 프로세스의 스레드들이 동시에 sync
+    if not MF_PATHS:
+        pytest.skip("남녀구분 CSV가 없습니다")
+    errors = []
+
+    def sync():
+        try:
+            PopulationStore(str(tmp_path)).sync(MF_PATHS[-1:])
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=sync) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    store = PopulationStore(str(tmp_path))
+    assert store.months("남녀구분") == [202504]
+    assert glob.glob(os.path.join(str(tmp_path), "**", "*.tmp"), recursive=True) == []
+    assert len(store.load_month("남녀구분", 202504)) == len(read_population_csv(MF_PATHS[-1]))
+
+
+def test_tmp_paths_differ_per_thread():
+    paths = [tmp_path_for("part.arrow")]
+    thread = threading.Thread(target=lambda: paths.append(tmp_path_for("part.arrow")))
+    thread.start()
+    thread.join()
+    assert paths[0] != paths[1]
@@ -0,0 +1,267 @@
+import datetime as dt
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from stock_data import (OHLCV_COLUMNS, CompanySearch, FakeQuoteSource, FixtureProvider, GridIndex, IndicatorEngine,
+                        LiveFeed, OHLCVStore, Prefetcher, RingBuffer, chosung, empty_bars)
+
+
+# 녹화된 일봉 CSV 픽스처 (FixtureProvider 형식)
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "stocks")
+
+
+def utc(year, month, day, hour):
+    return dt.datetime(year, month, day, hour, tzinfo=dt.timezone.utc).timestamp()
+
+
+class Clock:
+    """테스트에서 움직일 수 있는 시계."""
+
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def write_fixture(fixture_dir, ticker, closes):
+    """{날짜: 종가}로 픽스처 CSV를 씁니다."""
+    index = pd.DatetimeIndex(list(closes), name="Date")
+    values = list(closes.values())
+    df = pd.DataFrame({"Open": values, "High": values, "Low": values, "Close": values, "Volume": 1000.0}, index=index)
+    df.to_csv(fixture_dir / f"{ticker}.csv", index_label="Date")
+
+
+def test_intraday_bar_is_corrected_after_date_rolls_over(tmp_path):
+    fixtures = tmp_path / "fixtures"
+    fixtures.mkdir()
+    provider = FixtureProvider(str(fixtures))
+    clock = Clock(utc(2024, 1, 3, 15))  # 1월 3일 장중 (마감 전)
+    store = OHLCVStore(root=str(tmp_path / "store"), provider=provider, clock=clock)
+
+    write_fixture(fixtures, "AAA", {"2024-01-02": 100.0, "2024-01-03": 101.0})
+    store.update(["AAA"], dt.date(2024, 1, 1))
+    assert store.read("AAA").loc["2024-01-03", "Close"] == 101.0
+
+    # 다음 날: 1월 3일 봉은 확정값으로 바뀌었고 1월 4일 봉이 새로 생김
+    write_fixture(fixtures, "AAA", {"2024-01-02": 100.0, "2024-01-03": 105.0, "2024-01-04": 106.0})
+    clock.now += 24 * 3600
+    requests = store.update(["AAA"], dt.date(2024, 1, 1))
+
+    assert requests == [(["AAA"], dt.date(2024, 1, 3), dt.date(2024, 1, 5))]
+    bars = store.read("AAA")
+    assert bars.loc["2024-01-03", "Close"] == 105.0
+    assert bars.loc["2024-01-04", "Close"] == 106.0
+
+
+def test_incremental_update_from_fixtures(tmp_path):
+    provider = FixtureProvider(FIXTURE_DIR)
+    clock = Clock(utc(2024, 3, 4, 23))  # 픽스처의 마지막 봉보다 뒤 (모두 확정된 봉)
+    store = OHLCVStore(root=str(tmp_path), provider=provider, clock=clock)
+    recorded = pd.read_csv(os.path.join(FIXTURE_DIR, "TEST.KS.csv"), index_col="Date", parse_dates=["Date"])
+
+    first = store.bars("TEST.KS", dt.date(2024, 1, 1), dt.date(2024, 1, 15))
+    assert provider.calls == [(["TEST.KS"], dt.date(2024, 1, 1), dt.date(2024, 1, 15))]
+    pd.testing.assert_frame_equal(first, recorded.loc["2024-01-01":"2024-01-14"], check_dtype=False, check_freq=False)
+
+    # 같은 기간을 다시 요청하면 디스크에서만 읽음
+    store.bars("TEST.KS", dt.date(2024, 1, 1), dt.date(2024, 1, 15))
+    assert len(provider.calls) == 1
+
+    # 기간을 앞뒤로 넓히면 빠진 구간만 받음 (받아 온 기간은 마지막 봉인 1월 12일 금요일 다음 날까지)
+    both = store.bars("TEST.KS", dt.date(2023, 12, 15), dt.date(2024, 2, 1))
+    assert provider.calls[1:] == [(["TEST.KS"], dt.date(2023, 12, 15), dt.date(2024, 1, 1)),
+                                  (["TEST.KS"], dt.date(2024, 1, 13), dt.date(2024, 2, 1))]
+    pd.testing.assert_frame_equal(both, recorded.loc["2023-12-15":"2024-01-31"], check_dtype=False, check_freq=False)
+    assert store.covered("TEST.KS") == (dt.date(2023, 12, 15), dt.date(2024, 2, 1))
+
+
+class FailingOnceProvider(FixtureProvider):
+    """첫 요청에는 yfinance가 실패했을 때처럼 빈 표를, 그 뒤로는 픽스처를 돌려줍니다."""
+
+    def fetch(self, tickers, start, end):
+        if not self.calls:
+            self.calls.append((list(tickers), start, end))
+            return {ticker: empty_bars() for ticker in tickers}
+        return super().fetch(tickers, start, end)
+
+
+def test_empty_response_does_not_mark_range_covered(tmp_path):
+    provider = FailingOnceProvider(FIXTURE_DIR)
+    store = OHLCVStore(root=str(tmp_path), provider=provider, clock=Clock(utc(2024, 3, 4, 23)))
+
+    assert store.bars("TEST.KS", dt.date(2024, 1, 1), dt.date(2024, 3, 1)).empty
+    assert store.covered("TEST.KS") is None
+
+    # 다음 요청에서 다시 받아 채움
+    bars = store.bars("TEST.KS", dt.date(2024, 1, 1), dt.date(2024, 3, 1))
+    assert len(provider.calls) == 2
+    assert len(bars) == 44 and bars.index[-1] == pd.Timestamp("2024-02-29")
+    assert store.covered("TEST.KS") == (dt.date(2024, 1, 1), dt.date(2024, 3, 1))
+
+
+def test_nan_only_bars_do_not_extend_coverage(tmp_path):
+    provider = FixtureProvider(FIXTURE_DIR)
+    store = OHLCVStore(root=str(tmp_path), provider=provider, clock=Clock(utc(2024, 3, 4, 23)))
+    store.bars("TEST.KS", dt.date(2024, 1, 1), dt.date(2024, 1, 15))
+
+    # yf.download는 실패한 종목에 NaN만 있는 열을 돌려줌
+    nan_bars = pd.DataFrame(np.nan, index=pd.bdate_range("2024-01-15", "2024-01-31", name="Date"), columns=OHLCV_COLUMNS)
+    store.write("TEST.KS", nan_bars, dt.date(2024, 1, 13), dt.date(2024, 2, 1))
+    assert store.covered("TEST.KS") == (dt.date(2024, 1, 1), dt.date(2024, 1, 13))
+    assert store.read("TEST.KS").index[-1] == pd.Timestamp("2024-01-12")
+
+
+def test_prefetcher_reports_errors(tmp_path):
+    store = OHLCVStore(root=str(tmp_path), provider=FixtureProvider(FIXTURE_DIR), clock=Clock(utc(2024, 3, 4, 23)))
+
+    def fetch(ticker):
+        if ticker == "BROKEN.KS":
+            raise ConnectionError("요청 제한")
+        return store.bars(ticker, dt.date(2024, 1, 1), dt.date(2024, 3, 1))
+
+    prefetcher = Prefetcher(fetch, ["TEST.KS", "BROKEN.KS", "NONE.KS"], max_workers=2)
+    prefetcher.wait(timeout=10)
+    report = prefetcher.report().set_index("종목")
+    assert report.loc["TEST.KS", "상태"] == "완료" and report.loc["TEST.KS", "행 수"] == 44
+    assert report.loc["BROKEN.KS", "상태"] == "오류" and report.loc["BROKEN.KS", "오류 내용"] == "요청 제한"
+    assert report.loc["NONE.KS", "상태"] == "데이터 없음"
+
+
+def test_bar_fetched_after_close_is_not_refetched(tmp_path):
+    fixtures = tmp_path / "fixtures"
+    fixtures.mkdir()
+    provider = FixtureProvider(str(fixtures))
+    clock = Clock(utc(2024, 1, 3, 23))  # 1월 3일 마감 뒤
+    store = OHLCVStore(root=str(tmp_path / "store"), provider=provider, clock=clock)
+
+    write_fixture(fixtures, "AAA", {"2024-01-02": 100.0, "2024-01-03": 101.0})
+    store.update(["AAA"], dt.date(2024, 1, 1), dt.date(2024, 1, 4))
+    clock.now += 2 * 3600
+    assert store.update(["AAA"], dt.date(2024, 1, 1), dt.date(2024, 1, 4)) == []
+
+
+def test_indicators_use_each_tickers_own_calendar():
+    # 거래일이 서로 다른 두 종목을 함께 계산해도 따로 계산한 것과 같아야 함 (날짜를 합친 NaN 구멍이 없어야 함)
+    a = pd.DataFrame({"Close": np.linspace(100, 150, 60)}, index=pd.bdate_range("2024-01-01", periods=60))
+    b = pd.DataFrame({"Close": np.linspace(50, 40, 40)}, index=pd.date_range("2024-01-06", periods=40, freq="7D"))
+    together = IndicatorEngine().compute({"A": a, "B": b})
+    for ticker, data in {"A": a, "B": b}.items():
+        alone = IndicatorEngine().compute({ticker: data})[ticker]
+        assert together[ticker].index.equals(data.index)
+        pd.testing.assert_frame_equal(together[ticker], alone)
+    assert together["A"]["SMA20"].iloc[19:].notna().all()
+
+
+def wait_until(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "시간 초과"
+        time.sleep(0.01)
+
+
+def test_ring_buffer_wraparound():
+    buffer = RingBuffer(capacity=4)
+    for i in range(10):
+        buffer.push(float(i), 100.0 + i, 1.0)
+    count, times, prices, _ = buffer.snapshot()
+    assert count == 10 and len(buffer) == 4
+    assert times.tolist() == [6.0, 7.0, 8.0, 9.0]
+    assert prices.tolist() == [106.0, 107.0, 108.0, 109.0]
+    # since: 이전 snapshot 이후 값만 (밀려난 값은 빼고)
+    assert buffer.snapshot(since=8)[1].tolist() == [8.0, 9.0]
+    assert buffer.snapshot(since=2)[1].tolist() == [6.0, 7.0, 8.0, 9.0]
+    assert buffer.snapshot(since=10)[1].tolist() == []
+
+
+def test_live_feed_snapshots_are_consistent():
+    feed = LiveFeed(["AAA", "BBB"], FakeQuoteSource({"AAA": 100.0}), capacity=8, interval=0.005).start()
+    try:
+        buffer = feed.buffers["AAA"]
+        seen_count, seen_times = 0, np.empty(0)
+        while seen_count < 30:
+            count, times, prices, volumes = buffer.snapshot(since=seen_count)
+            assert len(times) == len(prices) == len(volumes) == min(count - seen_count, 8)
+            assert not np.isnan(prices).any()
+            seen_times = np.concatenate((seen_times, times))[-8:]
+            seen_count = count
+            time.sleep(0.003)
+        # 이어 붙인 결과가 한 번에 읽은 최신 버퍼와 같아야 하고 시각 순서가 유지되어야 함
+        feed.stop()
+        count, times, _, _ = buffer.snapshot()
+        assert count >= seen_count and len(times) == 8
+        assert np.all(np.diff(times) >= 0)
+        if count == seen_count:
+            assert seen_times.tolist() == times.tolist()
+        assert len(feed.buffers["BBB"]) == 8
+    finally:
+        feed.stop()
+
+
+def test_live_feed_pauses_without_viewers():
+    feed = LiveFeed(["AAA"], FakeQuoteSource(), capacity=16, interval=0.005, idle_timeout=0.1).start()
+    try:
+        buffer = feed.buffers["AAA"]
+        wait_until(lambda: feed.paused)
+        paused_count = buffer.count
+        time.sleep(0.1)
+        assert buffer.count == paused_count
+        feed.touch()
+        wait_until(lambda: buffer.count > paused_count)
+    finally:
+        feed.stop()
+
+
+def synthetic_universe(n=3000, seed=1):
+    """KRX 상장사 규모의 가짜 기업 목록 (이름, 종목코드, 위경도; 좌표가 빈 기업도 섞음)."""
+    rng = np.random.default_rng(seed)
+    syllables = list("가나다라마바사아자차카타파하한국대성신동서남북산업전자화학제약건설금융")
+    names = list(dict.fromkeys("".join(rng.choice(syllables, rng.integers(2, 6))) + "산업" for _ in range(n * 2)))[:n]
+    tickers = [f"{i:06d}.KS" for i in range(n)]
+    lats = rng.uniform(33.0, 38.6, n)
+    lons = rng.uniform(124.6, 131.9, n)
+    lats[::50] = np.nan
+    return names, tickers, lats, lons
+
+
+def test_grid_index_matches_brute_force():
+    _, _, lats, lons = synthetic_universe()
+    grid = GridIndex(lats, lons)
+    rng = np.random.default_rng(2)
+    for _ in range(200):
+        south, west = rng.uniform(33, 38.5), rng.uniform(124.5, 131.5)
+        north, east = south + rng.uniform(0, 2), west + rng.uniform(0, 3)
+        expected = np.flatnonzero((lats >= south) & (lats <= north) & (lons >= west) & (lons <= east))
+        assert grid.query(south, west, north, east).tolist() == expected.tolist()
+    # 전국보다 넓은 범위 (있는 칸만 훑는 경로)와 빈 범위
+    assert len(grid.query(30, 120, 40, 135)) == int((~np.isnan(lats)).sum())
+    assert len(grid.query(0, 0, 1, 1)) == 0
+
+
+def test_company_search_over_large_universe():
+    names, tickers, _, _ = synthetic_universe()
+    search = CompanySearch(names, tickers)
+    target = 1234
+
+    # 이름 앞부분
+    prefix = names[target][:3]
+    hits = search.search(prefix, limit=len(names))
+    assert target in hits
+    starts = [row for row in hits if names[row].startswith(prefix)]
+    assert hits[:len(starts)] == starts
+
+    # 종목코드 (시장 접미사 없이도)
+    assert search.search("001234")[0] == target
+    assert search.search("001234.ks")[0] == target
+
+    # 초성
+    initials = chosung(names[target])
+    assert target in search.search(initials, limit=len(names))
+
+    # 오타 (한 글자 바꿈) → 비슷한 이름
+    typo = names[target][:-1] + ("다" if names[target][-1] != "다" else "라")
+    assert target in search.search(typo, limit=20)
+    assert search.search("") == []